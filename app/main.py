@@ -1,7 +1,9 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, stream_with_context
 from flask_cors import CORS
 import requests
 import json
+import csv
+import io
 from dotenv import load_dotenv
 import os
 from base58 import b58decode
@@ -9,7 +11,11 @@ from base58 import b58decode
 from datetime import datetime, timedelta
 import threading
 import time
-import queue
+import atexit
+import signal
+import sys
+import asyncio
+import httpx
 import uuid
 from cryptography.fernet import Fernet
 import smtplib
@@ -17,6 +23,8 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import bcrypt
 import secrets
+import logging
+import functools
 
 # Load environment variables
 load_dotenv()
@@ -54,8 +62,25 @@ except ImportError:
 from models.user import User
 from models.wallet import Wallet
 from models.trading_bot import TradingBot
-from models.trade import Trade
+from models.trade import Trade, EXPORT_FIELDS
+from models.trade_rollup import TradeRollup
 from database import init_db
+from services.price_hub import PriceHub
+from services.bot_engine import BotEngine
+from services.http_transport import http_transport
+from services.rpc_clients import RpcClientRegistry
+from services.balance_cache import BalanceCache
+from services.keypair_cache import KeypairCache
+from services.confirmation_tracker import ConfirmationTracker
+from services.trade_approvals import TradeApprovals
+from services.status_stream import StatusBroadcaster
+from services.trade_journal import TradeJournal, ignore_duplicates
+from services.parameter_sweep import SweepJobs, check_parameters, count_combinations, parameter_grid, sample_parameters
+from services.tick_recorder import TickRecorder, TickStore
+from services.ladder_state import LadderState
+from services.metrics import MetricsRegistry, MongoCommandMetrics
+from services import structured_log
+from pymongo import monitoring
 
 app = Flask(__name__, template_folder='../templates', static_folder='../static')
 CORS(
@@ -68,16 +93,105 @@ CORS(
 ) # Enable CORS for all routes, allowing credentials (cookies/session)
 app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-change-this-in-production')
 
-# Initialize database tables
-init_db()
+log = structured_log.get_logger("app")
+
+# Prometheus metrics served at /metrics
+metrics = MetricsRegistry()
+RUNNING_BOTS = metrics.gauge("trading_bots_running", "Ladder bots currently running on the bot engine",
+                             callback=lambda: bot_engine.running_count())
+# Where a tick's time goes: price_fetch (shared feed quote), decision (tick to buy/sell decision, sampled),
+# swap_build (re-quote + Jupiter /swap + decode), sign, send (sendTransaction) and confirm
+TICK_PHASE_SECONDS = metrics.histogram("trading_tick_phase_seconds", "Time spent per phase of handling a price tick",
+                                       labels=("phase",))
+UPSTREAM_SECONDS = metrics.histogram("upstream_request_duration_seconds", "Latency of Jupiter and Solana RPC requests",
+                                     labels=("service", "endpoint"))
+UPSTREAM_REQUESTS = metrics.counter("upstream_requests_total", "Jupiter and Solana RPC requests by outcome",
+                                    labels=("service", "endpoint", "outcome"))
+APPROVAL_WAIT_SECONDS = metrics.histogram("trade_approval_wait_seconds", "Time from a user-mode trade intent to the user's decision",
+                                          labels=("outcome",))
+MONGO_SECONDS = metrics.histogram("mongo_command_duration_seconds", "MongoDB command latency", labels=("command",))
+MONGO_FAILURES = metrics.counter("mongo_command_failures_total", "Failed MongoDB commands", labels=("command",))
+# Write-behind trade journal: trades waiting to be written and the time each batch write takes
+TRADE_JOURNAL_QUEUE = metrics.gauge("trade_journal_queue_depth", "Trades queued for the journal writer",
+                                    callback=lambda: trade_journal.stats()['queue_depth'])
+TRADE_JOURNAL_FLUSH_SECONDS = metrics.histogram("trade_journal_flush_duration_seconds", "Time to write one batch of trades by outcome",
+                                                labels=("outcome",))
+TRADE_JOURNAL_DROPPED = metrics.counter("trade_journal_dropped_total", "Trades dropped because the journal was full or a write after close failed",
+                                        callback=lambda: trade_journal.stats()['dropped'])
+# Decrypted keypair cache, read from the cache's own counters at scrape time
+KEYPAIR_CACHE_LOOKUPS = metrics.counter("keypair_cache_lookups_total", "Keypair cache lookups by result", labels=("result",),
+                                        callback=lambda: keypair_cache_lookups())
+KEYPAIR_CACHE_EVICTIONS = metrics.counter("keypair_cache_evictions_total", "Keypairs dropped from the cache (expired, evicted or wiped)",
+                                          callback=lambda: keypair_cache.stats()['evictions'])
+KEYPAIR_CACHE_ENTRIES = metrics.gauge("keypair_cache_entries", "Decrypted keypairs currently cached",
+                                      callback=lambda: keypair_cache.stats()['entries'])
+# A bot times its buy/sell decision on one tick in this many; timing every tick would cost
+# a noticeable share of the decision itself
+METRICS_TICK_SAMPLE = max(1, int(os.getenv('METRICS_TICK_SAMPLE', '100')))
+# Optional bearer token required to scrape /metrics
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+def keypair_cache_lookups():
+    """Keypair cache hits and misses by result label"""
+    stats = keypair_cache.stats()
+    return {("hit",): stats['hits'], ("miss",): stats['misses']}
+
+def observe_upstream(service, endpoint, seconds, ok):
+    """Record one upstream request's latency and outcome"""
+    UPSTREAM_SECONDS.observe(seconds, service, endpoint)
+    UPSTREAM_REQUESTS.inc(service, endpoint, "ok" if ok else "error")
+
+def jupiter_request(endpoint, method, url, **kwargs):
+    """Call Jupiter through the shared transport, recording it as endpoint ('quote' or 'swap') in the metrics"""
+    started = time.perf_counter()
+    ok = False
+    try:
+        response = http_transport.request(method, url, **kwargs)
+        ok = response.status_code == 200
+        return response
+    finally:
+        observe_upstream("jupiter", endpoint, time.perf_counter() - started, ok)
 
 # Constants
 # Using the Jupiter API endpoint for quotes (requires API key)
-JUPITER_QUOTE_API = "https://api.jup.ag/swap/v1/quote"
-JUPITER_SWAP_API = "https://api.jup.ag/swap/v1/swap"
+JUPITER_QUOTE_API = os.getenv('JUPITER_QUOTE_API', "https://api.jup.ag/swap/v1/quote")
+JUPITER_SWAP_API = os.getenv('JUPITER_SWAP_API', "https://api.jup.ag/swap/v1/swap")
 HELIUS_API_KEY = os.getenv('HELIUS_API_KEY')
 JUPITER_API_KEY = os.getenv('JUPITER_API_KEY')
 
+# Long-lived Solana RPC clients per network, sharing the pooled HTTP transport
+rpc_clients = RpcClientRegistry(
+    http_transport,
+    helius_api_key=HELIUS_API_KEY,
+    on_call=lambda network, method, seconds, ok: observe_upstream("solana_rpc", method, seconds, ok)
+)
+# Wallets per JSON-RPC batch in bulk balance refreshes (two requests per wallet)
+RPC_BATCH_WALLETS = int(os.getenv('RPC_BATCH_WALLETS', '50'))
+# Seconds between refreshes of every stored wallet balance (0 disables the job)
+BALANCE_REFRESH_INTERVAL = float(os.getenv('BALANCE_REFRESH_INTERVAL', '600'))
+
+# Per-wallet balance cache; invalidated after a successful swap or withdrawal by that wallet
+BALANCE_CACHE_TTL = float(os.getenv('BALANCE_CACHE_TTL', '15'))
+balance_cache = BalanceCache(
+    lambda wallet_address, network: get_wallet_balance(wallet_address, network),
+    ttl=BALANCE_CACHE_TTL
+)
+
+# Batched getSignatureStatuses polling for every submitted swap, across all users
+confirmation_tracker = ConfirmationTracker(
+    rpc_clients.call,
+    interval=float(os.getenv('CONFIRMATION_POLL_INTERVAL', '0.5')),
+    timeout=float(os.getenv('CONFIRMATION_TIMEOUT', '90'))
+)
+
+# Estimated fee taken from the profit of every sell (services.backtest uses the same)
+SELL_FEE = 0.02
+
+# Quotes from the price feed younger than this are sent straight to /swap instead of re-quoting
+QUOTE_MAX_AGE = float(os.getenv('QUOTE_MAX_AGE', '2'))
+# Largest factor a feed quote may be scaled up by to cover the trade amount (smaller trades always scale)
+QUOTE_MAX_RESCALE = float(os.getenv('QUOTE_MAX_RESCALE', '10'))
+
 # Mock data for demonstration
 # SOL mint address
 SOL_MINT = "So11111111111111111111111111111111111111112"
@@ -116,43 +230,92 @@ TOKEN_INFO = {
     "3NZ9JMVBmGAqocybic2c7LQCJScmgsAZ6vQqTDzcqmJh": {"symbol": "WBTC", "name": "Wrapped BTC (Wormhole)"},
 }
 
+# All ladder bots run as asyncio tasks on one event loop; blocking trade work goes to a worker pool
+bot_engine = BotEngine(max_workers=int(os.getenv('BOT_ENGINE_WORKERS', '32')))
+
+# Shared price feed: one Jupiter poller per pair, fanned out to every running bot
+PRICE_POLL_INTERVAL = float(os.getenv('PRICE_POLL_INTERVAL', '5'))
+# Every fetched price is kept on disk for backtests, sweeps and charts (TICK_RECORDING=0 turns it off)
+TICK_DATA_DIR = os.getenv('TICK_DATA_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ticks'))
+tick_recorder = TickRecorder(TICK_DATA_DIR) if os.getenv('TICK_RECORDING', '1') != '0' else None
+tick_store = TickStore(TICK_DATA_DIR)
+price_hub = PriceHub(
+    lambda input_mint, output_mint, amount: get_jupiter_price_async(input_mint, output_mint, amount),
+    interval=PRICE_POLL_INTERVAL,
+    on_tick=tick_recorder.record if tick_recorder is not None else None
+)
+# Quote size the bots' price feeds use (1 token in lamport-style units)
+PRICE_QUOTE_AMOUNT = 1000000000
+
+# Ready-to-sign keypairs for running bots; wiped when a bot stops or its user logs out
+keypair_cache = KeypairCache(
+    lambda user_id: load_wallet_secret(user_id),
+    lambda secret: keypair_from_secret(secret),
+    ttl=float(os.getenv('KEYPAIR_CACHE_TTL', '900')),
+    max_entries=int(os.getenv('KEYPAIR_CACHE_SIZE', '1000'))
+)
+
 # Global dictionary to store trading state for each user
 user_trading_states = {}
 
-# Global dictionary for pending trade approvals (per user)
-user_pending_approvals = {}
-user_approvals_locks = {}
-user_approvals_queues = {}
+# Pending trade approvals (per user), each backed by a future the waiting bot awaits
+trade_approvals = TradeApprovals()
+
+# Wakes a user's open status streams whenever their bot state changes
+status_broadcaster = StatusBroadcaster()
+# Seconds between keep-alive comments on an idle status stream
+SSE_KEEPALIVE = float(os.getenv('SSE_KEEPALIVE', '15'))
+# Seconds before a status stream is closed so the browser reconnects (frees the worker thread)
+SSE_MAX_STREAM_SECONDS = float(os.getenv('SSE_MAX_STREAM_SECONDS', '300'))
+def persist_trades(documents):
+    """Journal writer: insert a batch of trades, then bring their days' PnL rollups up to date"""
+    # A retried batch may already be in trades; rollups are recomputed from the trades, so rolling
+    # it up again after a partial failure does not count anything twice
+    ignore_duplicates(Trade.insert_many, documents)
+    TradeRollup.apply_trades(documents)
+
+# Every executed buy/sell is written to the trades collection in the background, in batches
+trade_journal = TradeJournal(
+    persist_trades,
+    max_queue=int(os.getenv('TRADE_JOURNAL_MAX_QUEUE', '100000')),
+    batch_size=int(os.getenv('TRADE_JOURNAL_BATCH_SIZE', '500')),
+    flush_interval=float(os.getenv('TRADE_JOURNAL_FLUSH_INTERVAL', '1')),
+    on_flush=lambda seconds, ok: TRADE_JOURNAL_FLUSH_SECONDS.observe(seconds, "ok" if ok else "error")
+)
+
+# Background ladder parameter sweeps; each one spreads over SWEEP_WORKERS processes (default: one per CPU)
+sweep_jobs = SweepJobs(
+    workers=int(os.getenv('SWEEP_WORKERS', '0')) or None,
+    max_combinations=int(os.getenv('SWEEP_MAX_COMBINATIONS', '100000'))
+)
+
+# Prefix for status ETags so versions from an earlier run of the process never match
+STATUS_EPOCH = secrets.token_hex(4)
 
 def get_user_trading_state(user_id):
     """Get or create trading state for a user"""
-    if user_id not in user_trading_states:
-        user_trading_states[user_id] = {
-            "is_running": False,
-            "last_action": None,  # 'buy' or 'sell'
-            "current_price": 0,
-            "dynamic_base_price": None,
-            "total_profit": 0,  # Track total profit
-            "position": 0,  # Track number of tokens held
-            "avg_purchase_price": 0,  # Track average purchase price
-            "parts": 0,  # Total number of parts
-            "part_size": 0,  # Size of each part
-            "remaining_parts": 0,  # Number of remaining parts to sell
-            "transaction_history": [],
-            "buy_parts": [],  # Array to track buy parts
-            "sell_parts": [],  # Array to track sell parts
-        }
-    return user_trading_states[user_id]
-
-def get_user_pending_approvals(user_id):
-    """Get or create pending approvals for a user"""
-    if user_id not in user_pending_approvals:
-        user_pending_approvals[user_id] = []
-    if user_id not in user_approvals_locks:
-        user_approvals_locks[user_id] = threading.Lock()
-    if user_id not in user_approvals_queues:
-        user_approvals_queues[user_id] = queue.Queue()
-    return user_pending_approvals[user_id], user_approvals_locks[user_id], user_approvals_queues[user_id]
+    trading_state = user_trading_states.get(user_id)
+    if trading_state is None:
+        trading_state = user_trading_states[user_id] = LadderState()
+    return trading_state
+
+def journal_trade(user_id, tx_record, network):
+    """Queue a bot transaction record for the trades collection (never blocks the bot)"""
+    trade = Trade(
+        user_id=user_id,
+        timestamp=tx_record['timestamp'],
+        action=tx_record['action'],
+        token_mint=tx_record['token'],
+        token_symbol=tx_record['token_symbol'],
+        price=tx_record['price'],
+        amount=tx_record['amount'],
+        pnl=tx_record['pnl'],
+        network=network,
+        status=tx_record['status'],
+        fee=tx_record.get('fee_deducted'),
+        value=tx_record.get('dollar_value')
+    )
+    trade_journal.record(trade.to_document())
 
 def send_otp_email(email, otp):
     """Send OTP to user's email using configurable SMTP"""
@@ -170,7 +333,7 @@ def send_otp_email(email, otp):
 
         # Check if we have the required environment variables
         if not smtp_username or not smtp_password or not sender_email:
-            print("SMTP configuration not complete in environment")
+            log.warning("SMTP configuration not complete in environment")
             return False
 
         # Create message
@@ -203,11 +366,11 @@ def send_otp_email(email, otp):
         server.sendmail(sender_email, email, text)
         server.quit()
 
-        print(f"OTP sent successfully to {email}")
+        log.info("OTP sent", email=email)
         return True
 
     except Exception as e:
-        print(f"Error sending OTP: {e}")
+        log.error("Error sending OTP", email=email, error=str(e))
         return False
 
 def generate_otp():
@@ -322,7 +485,9 @@ def api_login():
 @app.route('/api/logout', methods=['POST'])
 def api_logout():
     """Logout a user"""
-    session.pop('user_id', None)
+    user_id = session.pop('user_id', None)
+    if user_id:
+        keypair_cache.evict(user_id)
     return jsonify({"success": True, "message": "Logged out successfully"})
 
 # API routes for wallet and trading functionality
@@ -346,7 +511,7 @@ def get_wallet_info():
             "wallet_address": wallet.public_key
         })
     except Exception as e:
-        print(f"Error in get_wallet_info: {e}")
+        log.error("Error in get_wallet_info", error=str(e))
         return jsonify({
             "success": False,
             "message": f"Error getting wallet info: {str(e)}",
@@ -356,7 +521,7 @@ def get_wallet_info():
 @app.route('/api/wallet-balance')
 @require_login
 def get_wallet_balance_default():
-    """Get wallet balance for the logged-in user"""
+    """Get wallet balance for the logged-in user (pass ?fresh=true to bypass the balance cache)"""
     try:
         user_id = session['user_id']
         wallet = Wallet.find_by_user_id(user_id)
@@ -368,122 +533,176 @@ def get_wallet_balance_default():
                 "balances": []
             })
 
-        # Fetch real balance from Solana blockchain
-        response = get_wallet_balance(wallet.public_key, "mainnet")
-        # Update the wallet's balance in the database
+        # Fetch real balance from Solana blockchain, or reuse a recent one from the cache
+        fresh = request.args.get('fresh', '').lower() in ('1', 'true')
+        response = balance_cache.get(wallet.public_key, "mainnet", fresh=fresh)
+        # Update the wallet's balance in the database only when it was actually re-fetched
         # Response is now a dict, not a Response object
-        if isinstance(response, dict) and response.get("success"):
+        if isinstance(response, dict) and response.get("success") and not response.get("cached"):
             wallet.update_balance(response.get("balances", []))
         return response
     except Exception as e:
-        print(f"Error in get_wallet_balance_default: {e}")
+        log.error("Error in get_wallet_balance_default", error=str(e))
         return jsonify({
             "success": False,
             "message": f"Error getting wallet balance: {str(e)}",
             "balances": []
         })
 
-@app.route('/api/wallet-balance/<wallet_address>')
-@app.route('/api/wallet-balance/<wallet_address>/<network>')
-def get_wallet_balance(wallet_address, network="mainnet"):
-    """Function to get real wallet token balances from Solana blockchain"""
-    try:
-        # Validate wallet address format (basic check)
-        if len(wallet_address) < 32 or len(wallet_address) < 32:
-            return {
-                "success": False,
-                "message": "Invalid wallet address format",
-                "balances": []
-            }
-
-        if network.lower() == "devnet":
-            if HELIUS_API_KEY:
-                rpc_url = f"https://devnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
-            else:
-                rpc_url = "https://api.devnet.solana.com"
-        elif network.lower() == "testnet":
-            if helius_api_key:
-                rpc_url = f"https://testnet.helius-rpc.com/?api-key={helius_api_key}"
-            else:
-                rpc_url = "https://api.testnet.solana.com"
-        else:  # default to mainnet
-            if HELIUS_API_KEY:
-                rpc_url = f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
-            else:
-                rpc_url = "https://api.mainnet-beta.solana.com"
-
-        # For now, we'll use the RPC URL directly
-        # The original solana_client approach may be better for some operations
-        import json
-
-        headers = {
-            "Content-Type": "application/json"
-        }
-
-        # Get token accounts
-        payload = {
+def wallet_balance_requests(wallet_address, first_id=1):
+    """JSON-RPC requests for a wallet's SPL token accounts and SOL balance"""
+    return [
+        {
             "jsonrpc": "2.0",
-            "id": 1,
+            "id": first_id,
             "method": "getTokenAccountsByOwner",
             "params": [
                 wallet_address,
                 {"programId": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"},
                 {"encoding": "jsonParsed"}
             ]
-        }
-
-        response = requests.post(rpc_url, headers=headers, data=json.dumps(payload))
-        result = response.json()
-
-        balances = []
-
-        # Check if we got a proper response
-        if 'result' in result and 'value' in result['result']:
-            for token_account in result['result']['value']:
-                account_info = token_account['account']['data']['parsed']['info']
-                mint = account_info['mint']
-                amount = float(account_info['tokenAmount']['uiAmount'])
-
-                # Only add if amount is greater than 0 to avoid showing zero balances
-                if amount > 0:
-                    # Get token info from Jupiter or a token list
-                    token_symbol = TOKEN_INFO.get(mint, {}).get("symbol", mint[:8] + "...")
-                    token_name = TOKEN_INFO.get(mint, {}).get("name", "Unknown Token")
-
-                    balances.append({
-                        "token": token_symbol,
-                        "name": token_name,
-                        "balance": amount,
-                        "mint": mint,
-                        "decimals": account_info['tokenAmount']['decimals']
-                    })
-        elif 'error' in result:
-            print(f"Error from RPC for token accounts: {result['error']}")
-
-        # Add SOL separately (everyone has SOL account, even if 0 balance)
-        sol_payload = {
+        },
+        {
             "jsonrpc": "2.0",
-            "id": 2,
+            "id": first_id + 1,
             "method": "getBalance",
             "params": [wallet_address]
         }
+    ]
+
+def parse_wallet_balances(wallet_address, result, sol_result):
+    """Build the balances list from getTokenAccountsByOwner and getBalance responses"""
+    balances = []
+
+    # Check if we got a proper response
+    if 'result' in result and 'value' in result['result']:
+        for token_account in result['result']['value']:
+            account_info = token_account['account']['data']['parsed']['info']
+            mint = account_info['mint']
+            amount = float(account_info['tokenAmount']['uiAmount'])
 
-        sol_response = requests.post(rpc_url, headers=headers, data=json.dumps(sol_payload))
-        sol_result = sol_response.json()
+            # Only add if amount is greater than 0 to avoid showing zero balances
+            if amount > 0:
+                # Get token info from Jupiter or a token list
+                token_symbol = TOKEN_INFO.get(mint, {}).get("symbol", mint[:8] + "...")
+                token_name = TOKEN_INFO.get(mint, {}).get("name", "Unknown Token")
 
-        if 'result' in sol_result and 'value' in sol_result['result']:
-            sol_amount = sol_result['result']['value'] / 10**9  # Convert lamports to SOL
-            # Add SOL to balances if there's a balance
-            if sol_amount > 0:
                 balances.append({
-                    "token": "SOL",
-                    "name": "Solana",
-                    "balance": sol_amount,
-                    "mint": "So11111111111111111111111111111111111111112",
-                    "decimals": 9
+                    "token": token_symbol,
+                    "name": token_name,
+                    "balance": amount,
+                    "mint": mint,
+                    "decimals": account_info['tokenAmount']['decimals']
                 })
-        else:
-            print(f"SOL balance query failed for {wallet_address}: {sol_result}")
+    elif 'error' in result:
+        log.warning("RPC error for token accounts", wallet=wallet_address, error=result['error'])
+
+    # Add SOL separately (everyone has SOL account, even if 0 balance)
+    if 'result' in sol_result and 'value' in sol_result['result']:
+        sol_amount = sol_result['result']['value'] / 10**9  # Convert lamports to SOL
+        # Add SOL to balances if there's a balance
+        if sol_amount > 0:
+            balances.append({
+                "token": "SOL",
+                "name": "Solana",
+                "balance": sol_amount,
+                "mint": "So11111111111111111111111111111111111111112",
+                "decimals": 9
+            })
+    else:
+        log.warning("SOL balance query failed", wallet=wallet_address, response=sol_result)
+
+    return balances
+
+def get_wallet_balances_bulk(wallet_addresses, network="mainnet", chunk_size=None):
+    """
+    Fetch balances for many wallets using chunked JSON-RPC batches
+    (two requests per wallet, chunk_size wallets per HTTP call).
+    Returns {wallet_address: same dict as get_wallet_balance}.
+    """
+    chunk_size = chunk_size or RPC_BATCH_WALLETS
+    results = {}
+    addresses = list(dict.fromkeys(wallet_addresses))  # De-duplicate, keep order
+
+    for start in range(0, len(addresses), chunk_size):
+        chunk = addresses[start:start + chunk_size]
+        payloads = []
+        for index, wallet_address in enumerate(chunk):
+            payloads.extend(wallet_balance_requests(wallet_address, first_id=index * 2 + 1))
+
+        try:
+            responses = rpc_clients.call_batch(network, payloads)
+        except Exception as e:
+            log.error("Error in bulk wallet balance chunk", network=network, wallets=len(chunk), error=str(e))
+            for wallet_address in chunk:
+                results[wallet_address] = {
+                    "success": False,
+                    "message": f"Error connecting to wallet: {str(e)}",
+                    "balances": []
+                }
+            continue
+
+        for index, wallet_address in enumerate(chunk):
+            # One malformed account (e.g. a null uiAmount) must not cost the other wallets their refresh
+            try:
+                token_result, sol_result = responses[index * 2], responses[index * 2 + 1]
+                results[wallet_address] = {
+                    "success": True,
+                    "balances": parse_wallet_balances(wallet_address, token_result, sol_result)
+                }
+            except Exception as e:
+                log.error("Error parsing bulk wallet balance", wallet=wallet_address, network=network, error=str(e))
+                results[wallet_address] = {
+                    "success": False,
+                    "message": f"Error reading wallet balance: {str(e)}",
+                    "balances": []
+                }
+
+    return results
+
+def refresh_all_wallet_balances(network="mainnet"):
+    """Reconciliation job: refresh every stored wallet's balance in a few batched RPC calls"""
+    wallets = Wallet.find_all()
+    results = get_wallet_balances_bulk([wallet.public_key for wallet in wallets], network)
+
+    refreshed = 0
+    for wallet in wallets:
+        response = results.get(wallet.public_key)
+        if response and response.get("success"):
+            try:
+                wallet.update_balance(response.get("balances", []))
+                refreshed += 1
+            except Exception as e:
+                log.error("Error storing refreshed wallet balance", wallet=wallet.public_key, error=str(e))
+    return refreshed
+
+def run_balance_refresh(interval):
+    """Background reconciliation: refresh every stored wallet's balance once per interval"""
+    while True:
+        time.sleep(interval)
+        started = time.perf_counter()
+        try:
+            refreshed = refresh_all_wallet_balances()
+            log.info("Wallet balances refreshed", wallets=refreshed, seconds=round(time.perf_counter() - started, 3))
+        except Exception as e:
+            log.error("Error refreshing wallet balances", error=str(e))
+
+@app.route('/api/wallet-balance/<wallet_address>')
+@app.route('/api/wallet-balance/<wallet_address>/<network>')
+def get_wallet_balance(wallet_address, network="mainnet"):
+    """Function to get real wallet token balances from Solana blockchain"""
+    try:
+        # Validate wallet address format (basic check)
+        if len(wallet_address) < 32 or len(wallet_address) < 32:
+            return {
+                "success": False,
+                "message": "Invalid wallet address format",
+                "balances": []
+            }
+
+        # Token accounts and SOL balance in a single batched round trip
+        token_result, sol_result = rpc_clients.call_batch(network, wallet_balance_requests(wallet_address))
+        balances = parse_wallet_balances(wallet_address, token_result, sol_result)
 
         return {
             "success": True,
@@ -491,7 +710,7 @@ def get_wallet_balance(wallet_address, network="mainnet"):
         }
 
     except Exception as e:
-        print(f"Error in get_wallet_balance: {e}")
+        log.error("Error in get_wallet_balance", wallet=wallet_address, error=str(e))
         return {
             "success": False,
             "message": f"Error connecting to wallet: {str(e)}",
@@ -511,19 +730,10 @@ def get_price():
         "x-api-key": JUPITER_API_KEY
     }
 
-    params = {
-        'inputMint': input_mint,
-        'outputMint': output_mint,
-        'amount': str(amount),  # Convert to string as required
-        'swapMode': 'ExactIn',
-        'slippageBps': 50,
-        'restrictIntermediateTokens': 'true',
-        'maxAccounts': 64,
-        'instructionVersion': 'V1'
-    }
+    params = jupiter_quote_params(input_mint, output_mint, amount)
 
     try:
-        response = requests.get(JUPITER_QUOTE_API, params=params, headers=headers)
+        response = jupiter_request("quote", "GET", JUPITER_QUOTE_API, params=params, headers=headers)
         if response.status_code == 200:
             quote_data = response.json()
             # Check if quote contains necessary data
@@ -547,7 +757,7 @@ def get_price():
             error_text = response.text if response.text else f"HTTP {response.status_code}"
             return jsonify({"price": 0.0, "success": False, "message": f"API Error: {response.status_code} - {error_text}"})
     except Exception as e:
-        print(f"Error fetching price: {e}")
+        log.error("Error fetching price", error=str(e))
         # On error, return a default price and indicate failure
         return jsonify({"price": 0.0, "success": False, "message": str(e)})
 
@@ -587,16 +797,27 @@ def start_trading():
     if network not in ['mainnet', 'devnet', 'testnet']:
         return jsonify({"error": "Network must be 'mainnet', 'devnet', or 'testnet'"}), 400
 
-    # Stop any existing trading thread for this user
-    trading_state['is_running'] = False
-
-    # Start new trading thread - the algorithm will fetch current price and use it as base
-    trading_thread = threading.Thread(
-        target=trading_algorithm,
-        args=(user_id, 0, up_percentage, down_percentage, selected_token, trade_amount, parts, network, trading_mode)  # Pass 0 as placeholder for base_price
+    # Stop any existing bot for this user
+    trading_state.is_running = False
+
+    # Open the RPC connection now so the first swap doesn't pay for the handshake
+    if network == "mainnet":
+        warm_up_thread = threading.Thread(target=rpc_clients.warm_up, args=(network,))
+        warm_up_thread.daemon = True
+        warm_up_thread.start()
+
+    # Approvals the previous bot was waiting on can no longer be acted on
+    trade_approvals.cancel_user(user_id)
+
+    # Start new bot on the engine (it supersedes any previous bot for this user)
+    # - the algorithm will fetch current price and use it as base
+    bot_engine.start_bot(
+        user_id,
+        lambda generation: trading_algorithm(
+            user_id, 0, up_percentage, down_percentage, selected_token, trade_amount, parts, network, trading_mode,  # Pass 0 as placeholder for base_price
+            generation=generation
+        )
     )
-    trading_thread.daemon = True
-    trading_thread.start()
 
     return jsonify({"message": "Trading started"})
 
@@ -606,27 +827,101 @@ def stop_trading():
     """Stop the trading algorithm for the logged-in user"""
     user_id = session['user_id']
     trading_state = get_user_trading_state(user_id)
-    trading_state['is_running'] = False
+    trading_state.is_running = False
+    bot_engine.stop_bot(user_id)
+    trade_approvals.cancel_user(user_id)
+    keypair_cache.evict(user_id)
+    status_broadcaster.publish(user_id)
     return jsonify({"message": "Trading stopped"})
 
 @app.route('/api/trading-status')
 @require_login
 def get_trading_status():
-    """Get current trading status for the logged-in user"""
+    """
+    Get current trading status for the logged-in user.
+    The response carries an ETag of the state version: If-None-Match with the current
+    version returns 304, and ?since=<version> returns only the fields that changed
+    and the transaction records added since that version.
+    """
     user_id = session['user_id']
     trading_state = get_user_trading_state(user_id)
-    
-    # Ensure dynamic base price is present in response
-    status = trading_state.copy()
-    # If dynamic_base_price is not set, default to the original base price concept
-    if 'dynamic_base_price' not in status or status['dynamic_base_price'] is None:
-        status['dynamic_base_price'] = status.get('original_base_price', 0)
+    version = status_broadcaster.version(user_id)
+    etag = f"{STATUS_EPOCH}-{version}"
 
-    # Add buy and sell parts counts to the status
-    status['buy_parts_count'] = len(status.get('buy_parts', []))
-    status['sell_parts_count'] = len(status.get('sell_parts', []))
+    # Nothing changed since the client's copy - skip building and serializing the state
+    if etag in request.if_none_match and status_broadcaster.snapshot(user_id, version) is not None:
+        response = Response(status=304)
+    else:
+        status = trading_state.snapshot(include_history=False)
+        history = trading_state.transaction_history
+        status_broadcaster.remember(user_id, version, (status, status['transaction_seq']))
+
+        base = None
+        since = request.args.get('since', '')
+        if since.startswith(f"{STATUS_EPOCH}-") and since[len(STATUS_EPOCH) + 1:].isdigit():
+            base = status_broadcaster.snapshot(user_id, int(since[len(STATUS_EPOCH) + 1:]))
+
+        if base is not None:
+            base_status, base_seq = base
+            response = jsonify({
+                "version": etag,
+                "delta": True,
+                "changed": {key: value for key, value in status.items() if key not in base_status or base_status[key] != value},
+                "new_transactions": [tx for tx in history if tx.get('seq', 0) > base_seq]
+            })
+        else:
+            # Unknown, expired or missing base version - send everything
+            response = jsonify(dict(status, transaction_history=history, version=etag, delta=False))
+
+    response.set_etag(etag)
+    # Browsers revalidate with If-None-Match on every poll and reuse the cached body on 304
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/trading-status/stream')
+@require_login
+def stream_trading_status():
+    """
+    Server-Sent Events stream of the logged-in user's trading status. An event is sent
+    when the bot's state changes (price tick, trade, part counts, start/stop);
+    transaction_history is only included when it changed since the last event.
+    """
+    user_id = session['user_id']
+    try:
+        # EventSource resends the last event id on reconnect; skip the event it already has
+        last_version = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_version = -1
 
-    return jsonify(status)
+    def generate():
+        status_broadcaster.stream_opened()
+        try:
+            yield "retry: 3000\n\n"
+            version = last_version
+            last_seq = None
+            deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+
+            while time.monotonic() < deadline:
+                current_version = status_broadcaster.wait(user_id, version, SSE_KEEPALIVE)
+                if current_version == version:
+                    yield ": keepalive\n\n"
+                    continue
+                version = current_version
+
+                trading_state = get_user_trading_state(user_id)
+                history_changed = trading_state.transaction_seq > 0 and trading_state.transaction_seq != last_seq
+                status = trading_state.snapshot(include_history=history_changed)
+                last_seq = trading_state.transaction_seq
+
+                yield f"id: {version}\nevent: status\ndata: {json.dumps(status)}\n\n"
+        finally:
+            status_broadcaster.stream_closed()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/api/pending-approvals')
 @require_login
@@ -634,10 +929,8 @@ def get_pending_approvals():
     """Get pending trade approvals for the logged-in user"""
     user_id = session['user_id']
     try:
-        approvals, lock, queue = get_user_pending_approvals(user_id)
-        with lock:
-            # Return a copy of the list to avoid race conditions
-            user_approvals = [approval.copy() for approval in approvals if approval.get('result') == 'pending']
+        # Copies of the requests still waiting, to avoid race conditions
+        user_approvals = trade_approvals.pending(user_id)
         return jsonify({"approvals": user_approvals})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -651,24 +944,9 @@ def approve_trade():
         data = request.get_json()
         trade_id = data.get('trade_id')
 
-        approvals, lock, queue_obj = get_user_pending_approvals(user_id)
-        
-        # Update both the list and queue
-        with lock:
-            # Update in the list
-            for approval in approvals:
-                if approval['id'] == trade_id:
-                    approval['approved'] = True
-                    approval['result'] = 'approved'
-                    break
-
-        # Also put approval result in the queue for the trading algorithm
-        approval_result = {
-            'id': trade_id,
-            'approved': True,
-            'result': 'approved'
-        }
-        queue_obj.put(approval_result)
+        # Resolves the trade's future, waking the waiting bot immediately
+        if not trade_approvals.resolve(user_id, trade_id, True):
+            return jsonify({"error": "Trade is not pending approval"}), 404
 
         return jsonify({"success": True, "message": "Trade approved"})
     except Exception as e:
@@ -683,24 +961,9 @@ def reject_trade():
         data = request.get_json()
         trade_id = data.get('trade_id')
 
-        approvals, lock, queue_obj = get_user_pending_approvals(user_id)
-        
-        # Update both the list and queue
-        with lock:
-            # Update in the list
-            for approval in approvals:
-                if approval['id'] == trade_id:
-                    approval['approved'] = False
-                    approval['result'] = 'rejected'
-                    break
-
-        # Also put rejection result in the queue for the trading algorithm
-        approval_result = {
-            'id': trade_id,
-            'approved': False,
-            'result': 'rejected'
-        }
-        queue_obj.put(approval_result)
+        # Resolves the trade's future, waking the waiting bot immediately
+        if not trade_approvals.resolve(user_id, trade_id, False):
+            return jsonify({"error": "Trade is not pending approval"}), 404
 
         return jsonify({"success": True, "message": "Trade rejected"})
     except Exception as e:
@@ -724,26 +987,15 @@ def get_trade_history():
         return jsonify({"success": False, "message": "Date is required"}), 400
         
     try:
-        trades = Trade.find_by_user_and_date(user_id, date_str)
-        
+        # Index-backed query that fetches only the fields returned here
+        trade_list = Trade.find_history_by_user_and_date(user_id, date_str)
+
         # Calculate totals
         total_pnl = 0
-        trade_list = []
-        
-        for trade in trades:
-            if trade.pnl is not None:
-                total_pnl += trade.pnl
-                
-            trade_list.append({
-                "timestamp": trade.timestamp,
-                "action": trade.action,
-                "token_symbol": trade.token_symbol,
-                "price": trade.price,
-                "amount": trade.amount,
-                "pnl": trade.pnl,
-                "status": trade.status
-            })
-            
+        for trade in trade_list:
+            if trade.get("pnl") is not None:
+                total_pnl += trade["pnl"]
+
         return jsonify({
             "success": True,
             "trades": trade_list,
@@ -751,116 +1003,498 @@ def get_trade_history():
             "count": len(trade_list)
         })
     except Exception as e:
-        print(f"Error fetching trade history: {e}")
+        log.error("Error fetching trade history", error=str(e))
+        return jsonify({"success": False, "message": str(e)}), 500
+
+# Largest page the paginated history endpoint returns
+TRADES_PAGE_MAX = 500
+
+def parse_history_filters(args):
+    """
+    start/end (YYYY-MM-DD, both inclusive, or ISO datetimes), token and action filters
+    from query parameters; raises ValueError on bad input
+    """
+    def parse_bound(value, inclusive_end=False):
+        if not value:
+            return None
+        if len(value) == 10:
+            day_start, day_end = Trade.day_range(value)
+            return day_end if inclusive_end else day_start
+        return datetime.fromisoformat(value)
+
+    action = args.get('action') or None
+    if action not in (None, 'buy', 'sell'):
+        raise ValueError("action must be 'buy' or 'sell'")
+
+    return {
+        "start": parse_bound(args.get('start')),
+        "end": parse_bound(args.get('end'), inclusive_end=True),
+        "token": args.get('token') or None,
+        "action": action
+    }
+
+@app.route('/api/trades')
+@require_login
+def list_trades():
+    """
+    Cursor-paginated trade history for the logged-in user over any date range.
+    Query: start, end, token, action, limit (max TRADES_PAGE_MAX), cursor (next_cursor from the previous page)
+    """
+    user_id = session['user_id']
+    try:
+        filters = parse_history_filters(request.args)
+        limit = min(max(int(request.args.get('limit', 100)), 1), TRADES_PAGE_MAX)
+        trades, next_cursor = Trade.find_history_page(user_id, cursor=request.args.get('cursor'), limit=limit, **filters)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        log.error("Error fetching trades", error=str(e))
+        return jsonify({"success": False, "message": str(e)}), 500
+
+    return jsonify({
+        "success": True,
+        "trades": trades,
+        "count": len(trades),
+        "next_cursor": next_cursor
+    })
+
+@app.route('/api/trades/export')
+@require_login
+def export_trades():
+    """
+    Download the logged-in user's trade history as NDJSON (default) or CSV, streamed
+    from the database cursor. Query: format, start, end, token, action
+    """
+    user_id = session['user_id']
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"success": False, "message": "format must be 'ndjson' or 'csv'"}), 400
+    try:
+        filters = parse_history_filters(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    rows = Trade.iter_history(user_id, **filters)
+
+    def generate_ndjson():
+        for row in rows:
+            yield json.dumps(row) + "\n"
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            # Hand the chunk to the server every few hundred rows
+            if count % 500 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    if export_format == 'csv':
+        body, mimetype = generate_csv(), 'text/csv'
+    else:
+        body, mimetype = generate_ndjson(), 'application/x-ndjson'
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=trades.{export_format}'}
+    )
+
+@app.route('/api/pnl')
+@require_login
+def get_pnl():
+    """
+    Realized PnL, fees, volume and trade counts for the logged-in user from the daily
+    rollups. Query: start, end (YYYY-MM-DD, inclusive; default the last 30 days),
+    token (mint), group (day, week or month)
+    """
+    user_id = session['user_id']
+    group = request.args.get('group', 'day')
+    if group not in ('day', 'week', 'month'):
+        return jsonify({"success": False, "message": "group must be 'day', 'week' or 'month'"}), 400
+    try:
+        filters = parse_history_filters(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    end = filters['end'] or Trade.day_range(datetime.utcnow().strftime("%Y-%m-%d"))[1]
+    start = filters['start'] or end - timedelta(days=30)
+    try:
+        rollups = TradeRollup.find_range(user_id, start, end, token_mint=filters['token'])
+    except Exception as e:
+        log.error("Error fetching PnL rollups", error=str(e))
         return jsonify({"success": False, "message": str(e)}), 500
 
-def trading_algorithm(user_id, base_price, up_percentage, down_percentage, selected_token, trade_amount, parts, network="mainnet", trading_mode="automatic"):
-    """Main trading algorithm with correct laddering logic - each transaction updates the base price"""
-    # Ensure application context is active for this thread
+    totals, buckets = TradeRollup.summarize(rollups, group)
+    return jsonify({
+        "success": True,
+        "start": start.strftime("%Y-%m-%d"),
+        "end": (end - timedelta(days=1)).strftime("%Y-%m-%d"),
+        "group": group,
+        "totals": totals,
+        "buckets": buckets
+    })
+
+def price_pair(selected_token):
+    """(input_mint, output_mint) whose quote prices a traded token"""
+    if selected_token == "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v":  # USDC
+        return "So11111111111111111111111111111111111111112", selected_token  # SOL (to get USDC price in SOL)
+    if selected_token == "So11111111111111111111111111111111111111112":  # SOL/wSOL same mint
+        return selected_token, "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC
+    # For any other token, try to get price in USDC first
+    return selected_token, "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC
+
+def recorded_ticks(token, start=None, end=None):
+    """Recorded price ticks for a traded token (memory-mapped; see TickStore)"""
+    input_mint, output_mint = price_pair(token)
+    return tick_store.read(input_mint, output_mint, PRICE_QUOTE_AMOUNT, start, end)
+
+@app.route('/api/price-history')
+@require_login
+def get_price_history():
+    """
+    Recorded prices for a token, for charts. Query: token (mint), start, end
+    (YYYY-MM-DD inclusive or ISO datetimes, UTC; default the last day), max_points
+    (default 1000; longer ranges are downsampled by taking every nth tick)
+    """
+    token = request.args.get('token')
+    if not token:
+        return jsonify({"success": False, "message": "token is required"}), 400
+    try:
+        filters = parse_history_filters(request.args)
+        max_points = min(max(int(request.args.get('max_points', 1000)), 2), 100000)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    end = filters['end'] or datetime.utcnow()
+    start = filters['start'] or end - timedelta(days=1)
+    ticks = recorded_ticks(token, start, end)
+    step = max(1, -(-len(ticks) // max_points))
+    sampled = ticks[::step]
+    return jsonify({
+        "success": True,
+        "token": token,
+        "count": len(ticks),
+        "step": step,
+        "timestamps": sampled['timestamp'].tolist(),
+        "prices": sampled['price'].tolist()
+    })
+
+@app.route('/api/sweeps', methods=['POST'])
+@require_login
+def start_sweep():
+    """
+    Start a background backtest sweep of ladder settings over a price history.
+    Body: prices (list) or token with optional start/end (recorded ticks), up_percentage, down_percentage, parts (each a list of values
+    or {min, max, step}), trade_amount, optional samples (random settings instead of
+    the full grid), seed and top (rows kept, default 50)
+    """
+    user_id = session['user_id']
+    data = request.get_json() or {}
+    try:
+        if data.get('prices') is None and data.get('token'):
+            filters = parse_history_filters(data)
+            prices = recorded_ticks(data['token'], filters['start'], filters['end'])['price']
+        else:
+            prices = [float(price) for price in data.get('prices', [])]
+        up_spec = data.get('up_percentage', {"min": 0.5, "max": 5, "step": 0.5})
+        down_spec = data.get('down_percentage', {"min": 0.5, "max": 5, "step": 0.5})
+        parts_spec = data.get('parts', {"min": 1, "max": 10, "step": 1})
+        samples = data.get('samples')
+        if len(prices) < 2:
+            raise ValueError("need at least 2 prices")
+        check_parameters(up_spec, down_spec, parts_spec)
+        # Reject an oversized sweep from the spec sizes, before any list of settings is built
+        sweep_jobs.check_size(count_combinations(up_spec, down_spec, parts_spec, samples))
+        if samples:
+            params = sample_parameters(up_spec, down_spec, parts_spec, int(samples), seed=data.get('seed'))
+        else:
+            params = parameter_grid(up_spec, down_spec, parts_spec)
+        job_id = sweep_jobs.submit(user_id, prices, params, float(data.get('trade_amount', 100)), top=int(data.get('top', 50)))
+    except (TypeError, KeyError, ValueError) as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return jsonify({"success": True, "job_id": job_id, "combinations": len(params)}), 202
+
+@app.route('/api/sweeps/<job_id>')
+@require_login
+def get_sweep(job_id):
+    """Progress of a sweep, and its ranked results once done"""
+    job = sweep_jobs.get(session['user_id'], job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Sweep not found"}), 404
+    job.pop('user_id')
+    return jsonify({"success": True, "sweep": job})
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint (requires 'Authorization: Bearer <METRICS_TOKEN>' when METRICS_TOKEN is set)"""
+    if METRICS_TOKEN and not secrets.compare_digest(request.headers.get('Authorization', ''), f"Bearer {METRICS_TOKEN}"):
+        return Response("Unauthorized\n", status=401, mimetype='text/plain')
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+async def trading_algorithm(user_id, base_price, up_percentage, down_percentage, selected_token, trade_amount, parts, network="mainnet", trading_mode="automatic", generation=None):
+    """
+    Main trading algorithm with correct laddering logic - each transaction updates the base price.
+    Runs as a task on the bot engine loop; generation identifies this run so a restarted bot retires the old one.
+    """
+    # Ensure application context is active for this task
     app.app_context().push()
 
-    trading_state = get_user_trading_state(user_id)
-    trading_state['is_running'] = True
-    trading_state['last_action'] = None
-    trading_state['total_profit'] = 0  # Track total profit
-    trading_state['position'] = 0  # Track number of tokens held
-    trading_state['avg_purchase_price'] = 0  # Track average purchase price
+    # Every line from this bot carries who, what and which run
+    bot_log = structured_log.get_logger("bot", user_id=user_id, token=get_token_symbol(selected_token), mint=selected_token,
+                                        generation=generation, network=network)
 
     # Calculate amount per part
     part_size = trade_amount / parts
-    trading_state['parts'] = parts
-    trading_state['part_size'] = part_size
 
-    # Initialize buy and sell arrays with the specified number of parts
-    # Initially, both arrays have all parts (ready for either buy or sell)
-    trading_state['buy_parts'] = list(range(parts))  # All parts available for buying initially
-    trading_state['sell_parts'] = list(range(parts))  # All parts available for selling initially
+    # Reset profit and position, and make every part available for either buy or sell
+    trading_state = get_user_trading_state(user_id)
+    trading_state.start(parts, part_size, trading_mode, network)
 
-    # Store trading mode and network
-    trading_state['trading_mode'] = trading_mode
-    trading_state['network'] = network
+    # Determine the pair to watch based on the selected token
+    input_mint, output_mint = price_pair(selected_token)
 
-    # Fetch initial price when starting and update base_price to current market price
-    try:
-        # Determine the output mint based on the selected token for initial price
-        if selected_token == "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v":  # USDC
-            output_mint = selected_token
-            input_mint = "So11111111111111111111111111111111111111112"  # SOL
-        elif selected_token == "So11111111111111111111111111111111111111112":  # SOL or wSOL
-            input_mint = "So11111111111111111111111111111111111111112"  # SOL
-            output_mint = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC
-        else:
-            input_mint = selected_token
-            output_mint = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC
+    # Subscribe to the shared price feed instead of polling Jupiter from this bot
+    price_subscription = price_hub.subscribe(input_mint, output_mint, PRICE_QUOTE_AMOUNT)
 
-        initial_price_response = get_jupiter_price_direct(input_mint, output_mint, 1000000000)
-        if initial_price_response["success"]:
+    # Wait for the first price when starting and update base_price to current market price
+    try:
+        initial_price_response = await price_subscription.next(timeout=max(15, PRICE_POLL_INTERVAL * 3))
+        if initial_price_response and initial_price_response["success"]:
             initial_current_price = initial_price_response["price"]
             # Set the base price to current market price when starting
-            trading_state['base_price'] = initial_current_price
-            trading_state['current_price'] = initial_current_price
-            print(f"Set base price to initial current market price: {initial_current_price}")
+            trading_state.base_price = initial_current_price
+            trading_state.current_price = initial_current_price
+            bot_log.info("Set base price to initial current market price", base_price=initial_current_price)
         else:
             # If initial price fetch fails, use a default value
             default_price = 100  # Default fallback
-            trading_state['base_price'] = default_price
-            trading_state['current_price'] = default_price
-            print(f"Using default base price: {default_price}")
+            trading_state.base_price = default_price
+            trading_state.current_price = default_price
+            bot_log.warning("Using default base price", base_price=default_price)
     except Exception as e:
-        print(f"Error getting initial price: {e}")
+        bot_log.error("Error getting initial price", error=str(e))
         default_price = 100  # Default fallback
-        trading_state['base_price'] = default_price
-        trading_state['current_price'] = default_price
+        trading_state.base_price = default_price
+        trading_state.current_price = default_price
 
-    while trading_state['is_running']:
-        try:
-            # Get current price from Jupiter API
-            # Determine the output mint based on the selected token
-            if selected_token == "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v":  # USDC
-                output_mint = selected_token
-                input_mint = "So11111111111111111111111111111111111111112"  # SOL (to get USDC price in SOL)
-            elif selected_token == "So11111111111111111111111111111111111111112":  # SOL/wSOL same mint
-                input_mint = "So11111111111111111111111111111111111111112"  # SOL/wSOL
-                output_mint = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC
-            # For any other token, try to get price in USDC first
+    # Bot is up with its starting base price - tell open dashboards
+    status_broadcaster.publish(user_id)
+
+    # Ladder updates for completed trades. Mainnet swaps are confirmed by the confirmation
+    # tracker, so these run from on_confirmation while the loop keeps following prices.
+    def fill_record(action, current_price, current_base_price, amount, pnl, fee, part_number, transaction_result):
+        """Transaction record of a completed buy/sell (part_number and part counts are None outside the ladder)"""
+        in_ladder = part_number is not None
+        return {
+            'timestamp': datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+            'action': action,
+            'token': selected_token,
+            'token_symbol': get_token_symbol(selected_token),
+            'price': current_price,
+            'amount': amount,  # Sells: dollar value converted to tokens
+            'base_price_at_execution': current_base_price,
+            'pnl': pnl,  # None for buys; sells after fee deduction
+            'total_parts': parts,
+            'part_number': part_number,  # Number of operations of this kind completed + 1 (captured before the counters move)
+            'execution_price': current_price,
+            'status': 'completed',  # New field to track transaction status
+            'buy_parts_count': trading_state.buy_parts if in_ladder else None,
+            'sell_parts_count': trading_state.sell_parts if in_ladder else None,
+            'fee_deducted': fee,  # Fee affects profit on sell only
+            'dollar_value': part_size,  # Dollar value of the transaction
+            'quote_source': transaction_result.get('quote_source'),  # 'tick' or 'requote' (None when simulated)
+            'decision_to_submit_ms': transaction_result.get('decision_to_submit_ms'),
+            'confirm_ms': transaction_result.get('confirm_ms'),  # Submission to confirmation (None when simulated)
+            'approval_wait_ms': transaction_result.get('approval_wait_ms')  # User mode: intent to approval
+        }
+
+    def sell_pnl(current_price, current_base_price):
+        """Profit of one sold part: sell price - base price at the time of the sell, per token, less the fee"""
+        # In a real system, we'd track the purchase price for each part, but in this simplified system:
+        # profit per token = sell price - base price at time of sell
+        # Account for transaction fees (estimated at $0.02 per transaction as requested)
+        return (current_price - current_base_price) * part_size - SELL_FEE
+
+    def record_buy(current_price, current_base_price, transaction_result):
+        """Move the ladder for a completed buy"""
+        # Only update state if transaction was successful
+        trading_state.last_action = 'buy'
+
+        # Record the number of buy operations completed before moving the counters
+        buy_operations_completed = parts - trading_state.buy_parts
+
+        # When buying: reduce buy-parts by 1 (use a buy opportunity), increase sell-parts by 1 (create a sell opportunity)
+        trading_state.use_buy_part()
+
+        # Update base price to execution price (only on successful transaction)
+        trading_state.base_price = current_price
+
+        # Update position and average purchase price
+        old_position_value = trading_state.position * trading_state.avg_purchase_price
+        new_purchase_value = part_size * current_price
+        trading_state.position += part_size
+        if trading_state.position > 0:
+            trading_state.avg_purchase_price = (old_position_value + new_purchase_value) / trading_state.position
+
+        bot_log.info("Buy completed", price=current_price, buy_parts=trading_state.buy_parts, sell_parts=trading_state.sell_parts,
+                     base_price=trading_state.base_price)
+
+        tx_record = fill_record('buy', current_price, current_base_price, part_size, None, 0,
+                                buy_operations_completed + 1, transaction_result)
+
+        # Numbered so delta status responses send only new records; the bot keeps the last 20
+        trading_state.add_transaction(tx_record)
+        # Persist it - the in-memory history is only the recent few
+        journal_trade(user_id, tx_record, network)
+        status_broadcaster.publish(user_id)
+
+    def record_sell(current_price, current_base_price, actual_sell_amount, transaction_result):
+        """Move the ladder for a completed sell"""
+        # Only update state if transaction was successful
+        trading_state.last_action = 'sell'
+
+        # Record the number of sell operations completed before moving the counters
+        sell_operations_completed = parts - trading_state.sell_parts
+
+        # When selling: reduce sell-parts by 1 (use a sell opportunity), increase buy-parts by 1 (create a buy opportunity)
+        trading_state.use_sell_part()
+
+        # Update base price to execution price (only on successful transaction)
+        trading_state.base_price = current_price
+
+        total_profit = sell_pnl(current_price, current_base_price)
+        trading_state.total_profit += total_profit
+
+        # Reduce position when selling
+        trading_state.position -= min(part_size, trading_state.position)
+        if trading_state.position <= 0:
+            trading_state.position = 0
+            trading_state.avg_purchase_price = 0
+
+        bot_log.info("Sell completed", price=current_price, buy_parts=trading_state.buy_parts, sell_parts=trading_state.sell_parts,
+                     base_price=trading_state.base_price, total_profit=trading_state.total_profit)
+
+        tx_record = fill_record('sell', current_price, current_base_price, actual_sell_amount, total_profit, SELL_FEE,
+                                sell_operations_completed + 1, transaction_result)
+
+        # Numbered so delta status responses send only new records; the bot keeps the last 20
+        trading_state.add_transaction(tx_record)
+        # Persist it - the in-memory history is only the recent few
+        journal_trade(user_id, tx_record, network)
+        status_broadcaster.publish(user_id)
+
+    loop = asyncio.get_running_loop()
+
+    def on_confirmation(action, transaction_result, confirmation, execution_price, base_price_at_execution, amount):
+        """Runs on the engine loop when a submitted trade's signature confirms, fails or cannot be tracked"""
+        signature = transaction_result.get('signature')
+        current = bot_engine.is_current(user_id, generation)
+        # The pending trade is only this run's to clear: a restarted bot has reset it or holds its own
+        if trading_state.pending_trade is not None and trading_state.pending_trade.get('signature') == signature:
+            trading_state.pending_trade = None
+        if confirmation.get('confirm_ms') is not None:
+            TICK_PHASE_SECONDS.observe(confirmation['confirm_ms'] / 1000, "confirm")
+        if confirmation['success']:
+            transaction_result = dict(transaction_result, confirm_ms=confirmation['confirm_ms'])
+            if not current:
+                # The swap landed after this bot was stopped or restarted. It is a real fill, so it is
+                # journaled, but the ladder now belongs to the new run (or to nobody) and is left alone.
+                pnl = sell_pnl(execution_price, base_price_at_execution) if action == 'sell' else None
+                journal_trade(user_id, fill_record(action, execution_price, base_price_at_execution, amount, pnl,
+                                                   SELL_FEE if action == 'sell' else 0, None, transaction_result), network)
+                bot_log.warning("Trade confirmed after the bot stopped; journaled without moving the ladder",
+                                action=action, signature=signature, price=execution_price)
+                status_broadcaster.publish(user_id)
+            elif action == 'buy':
+                record_buy(execution_price, base_price_at_execution, transaction_result)
             else:
-                input_mint = selected_token
-                output_mint = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC
+                record_sell(execution_price, base_price_at_execution, amount, transaction_result)
+        else:
+            bot_log.warning("Trade not confirmed, base price unchanged", action=action, signature=signature,
+                            error=confirmation['err'], base_price=trading_state.base_price)
+            status_broadcaster.publish(user_id)
+
+    def confirmation_done(action, transaction_result, execution_price, base_price_at_execution, amount, done):
+        """Future callback (tracker thread): hand the outcome to the engine loop, even if the future failed"""
+        if done.cancelled():
+            confirmation = {'success': False, 'signature': transaction_result.get('signature'), 'err': 'cancelled',
+                            'confirm_ms': None}
+        elif done.exception() is not None:
+            confirmation = {'success': False, 'signature': transaction_result.get('signature'),
+                            'err': str(done.exception()), 'confirm_ms': None}
+        else:
+            confirmation = done.result()
+        loop.call_soon_threadsafe(
+            on_confirmation, action, transaction_result, confirmation, execution_price, base_price_at_execution, amount
+        )
 
-            # Get price from Jupiter API directly without using request context
-            # Call the price API using direct Jupiter API call instead of internal Flask call
-            price_response = get_jupiter_price_direct(input_mint, output_mint, 1000000000)
+    def track_confirmation(action, transaction_result, execution_price, base_price_at_execution, amount):
+        """Hold further trades until the submitted signature settles, then update the ladder"""
+        trading_state.pending_trade = {
+            'action': action,
+            'signature': transaction_result.get('signature'),
+            'price': execution_price,
+            'submitted_at': datetime.utcnow().isoformat()
+        }
+        bot_log.info("Trade submitted, waiting for confirmation", action=action, price=execution_price,
+                     signature=transaction_result.get('signature'))
+        status_broadcaster.publish(user_id)
+        transaction_result['confirmation'].add_done_callback(
+            functools.partial(confirmation_done, action, transaction_result, execution_price, base_price_at_execution, amount)
+        )
+
+    # Ticks until the next one whose decision time goes into the metrics
+    ticks_to_sample = METRICS_TICK_SAMPLE
+
+    while trading_state.is_running and bot_engine.is_current(user_id, generation):
+        try:
+            # Wait for the next tick from the shared feed; this also paces the loop
+            price_response = await price_subscription.next(timeout=PRICE_POLL_INTERVAL * 2)
+            if not bot_engine.is_current(user_id, generation):
+                # Stopped or restarted while waiting - the ladder state may already be the new run's
+                break
+            ticks_to_sample -= 1
+            if not ticks_to_sample:
+                tick_received = time.monotonic()
+            if price_response is None:
+                price_response = {"price": 0.0, "success": False, "message": "No update from price feed"}
 
             current_price = None
 
             if price_response["success"]:
                 current_price = price_response["price"]
-                trading_state['current_price'] = current_price
+                price_changed = current_price != trading_state.current_price
+                trading_state.current_price = current_price
                 # Update the dynamic base price in the trading state (for UI display)
-                trading_state['dynamic_base_price'] = trading_state['base_price']  # Keep this for UI display
-                print(f"Got price: {current_price} for token {selected_token}, base price: {trading_state['base_price']}")
+                trading_state.dynamic_base_price = trading_state.base_price  # Keep this for UI display
+                if price_changed:
+                    status_broadcaster.publish(user_id)
+                bot_log.tick("Got price", price=current_price, base_price=trading_state.base_price)
             else:
-                print(f"Failed to get price for main pair: {price_response.get('message', 'Unknown error')}")
-
                 # For tokens that don't have price data in Jupiter,
                 # we need to handle this case properly. We can either:
                 # 1. Skip this iteration and wait for price availability
                 # Since we can't trade what we can't price, we'll log the issue and continue
-                print(f"No price available for token: {selected_token}, skipping this iteration")
+                bot_log.tick("No price for main pair, skipping this iteration", level=logging.WARNING,
+                             message=price_response.get('message', 'Unknown error'))
                 # Use previous price if available, otherwise skip
-                if trading_state['current_price'] is not None:
-                    current_price = trading_state['current_price']  # Keep previous price
+                if trading_state.current_price is not None:
+                    current_price = trading_state.current_price  # Keep previous price
                 else:
-                    time.sleep(5)  # Wait before next iteration
-                    continue  # Skip to the next iteration if no previous price
+                    continue  # Skip to the next tick if no previous price
 
             # If we have a valid price (not 0 or None), proceed with trading logic
             if current_price is None or current_price <= 0:
-                time.sleep(5)  # Wait before next iteration
                 continue  # Skip trading logic if price is invalid
 
             # Get current base price for comparison
-            current_base_price = trading_state['base_price']
+            current_base_price = trading_state.base_price
 
             # Calculate thresholds based on the current base price
             sell_threshold = current_base_price * (1 + up_percentage / 100)
@@ -868,8 +1502,16 @@ def trading_algorithm(user_id, base_price, up_percentage, down_percentage, selec
 
             # We can buy if there are buy opportunities available (buy_parts > 0)
             # We can sell if there are sell opportunities available (sell_parts > 0)
-            should_buy = current_price <= buy_threshold and len(trading_state['buy_parts']) > 0
-            should_sell = current_price >= sell_threshold and len(trading_state['sell_parts']) > 0
+            # While a submitted trade is unconfirmed the ladder holds (no double use of a part)
+            trade_pending = trading_state.pending_trade is not None
+            should_buy = current_price <= buy_threshold and trading_state.buy_parts > 0 and not trade_pending
+            should_sell = current_price >= sell_threshold and trading_state.sell_parts > 0 and not trade_pending
+            # The tick's quote and decision time travel with the trade so execution can skip a re-quote
+            decided_at = time.monotonic()
+            if not ticks_to_sample:
+                TICK_PHASE_SECONDS.observe(decided_at - tick_received, "decision")
+                ticks_to_sample = METRICS_TICK_SAMPLE
+            transaction_result = {}
 
             # Execute buy/sell based on conditions - note that we can switch between buy and sell at any time
             if should_buy:
@@ -881,7 +1523,7 @@ def trading_algorithm(user_id, base_price, up_percentage, down_percentage, selec
                     # Check trading mode
                     if trading_mode == "user":
                         # In user mode, we need to wait for user confirmation
-                        print(f"[USER MODE] Buy intent: {part_size} of {get_token_symbol(selected_token)} at ${current_price}")
+                        bot_log.info("Trade intent awaiting approval", action="buy", amount=part_size, price=current_price)
 
                         # Create a trade approval request
                         trade_id = str(uuid.uuid4())
@@ -891,107 +1533,52 @@ def trading_algorithm(user_id, base_price, up_percentage, down_percentage, selec
                             'amount': part_size,
                             'token': get_token_symbol(selected_token),
                             'price': current_price,
-                            'timestamp': datetime.now().isoformat(),
+                            'timestamp': datetime.utcnow().isoformat(),
                             'approved': None,  # None means pending
                             'result': 'pending'
                         }
 
-                        # Add to both the list (for frontend) and queue (for trading algorithm)
-                        approvals, lock, queue_obj = get_user_pending_approvals(user_id)
-                        with lock:
-                            approvals.append(approval_request)
+                        # Register the request; approve/reject resolve its future directly
+                        trade_approvals.request(user_id, approval_request)
 
-                        # Wait for user approval with timeout
+                        # Wait for user approval with timeout (the task sleeps until the user decides)
                         approval_timeout = 30  # 30 seconds timeout
-                        start_time = time.time()
-                        approved = False
-
-                        while time.time() - start_time < approval_timeout and not approved:
-                            # Check if this trade has been approved/rejected from the queue
-                            try:
-                                check_approval = queue_obj.get_nowait()
-                                if check_approval['id'] == trade_id:
-                                    if check_approval['result'] == 'approved':
-                                        approved = True
-                                        transaction_result = execute_buy_transaction(user_id, current_price, selected_token, part_size, network)
-                                        transaction_successful = transaction_result["success"]
-                                    elif check_approval['result'] == 'rejected':
-                                        transaction_successful = False
-                                        print(f"[USER MODE] User rejected buy intent for {part_size} of {get_token_symbol(selected_token)} at ${current_price}")
-                            except queue.Empty:
-                                pass
-
-                            if not approved:
-                                time.sleep(0.5)  # Check more frequently
-
-                        if not approved:
+                        approved, approved_at = await trade_approvals.wait(user_id, trade_id, approval_timeout)
+                        APPROVAL_WAIT_SECONDS.observe((approved_at or time.monotonic()) - decided_at,
+                                                      "approved" if approved else "rejected" if approved is False else "timeout")
+
+                        if approved:
+                            # Latency from here on is measured from the approval, not the original tick
+                            approval_wait_ms = round((approved_at - decided_at) * 1000, 3)
+                            transaction_result = await bot_engine.run_blocking(execute_buy_transaction, user_id, current_price, selected_token, part_size, network, quote_tick=price_response, decided_at=approved_at)
+                            transaction_result = dict(transaction_result, approval_wait_ms=approval_wait_ms)
+                            transaction_successful = transaction_result["success"]
+                            bot_log.info("Trade approved", action="buy", approval_wait_ms=approval_wait_ms,
+                                         decision_to_submit_ms=transaction_result.get('decision_to_submit_ms'))
+                        elif approved is False:
+                            transaction_successful = False
+                            bot_log.info("User rejected trade intent", action="buy", amount=part_size, price=current_price)
+                        else:
                             # Timeout - reject the trade
                             transaction_successful = False
-                            print(f"[USER MODE] Timeout waiting for approval for buy intent")
+                            bot_log.warning("Timed out waiting for approval", action="buy")
                     else:  # automatic mode
-                        transaction_result = execute_buy_transaction(user_id, current_price, selected_token, part_size, network)
+                        transaction_result = await bot_engine.run_blocking(execute_buy_transaction, user_id, current_price, selected_token, part_size, network, quote_tick=price_response, decided_at=decided_at)
                         transaction_successful = transaction_result["success"]
                 else:
                     # For devnet/testnet, just simulate
                     simulate_buy(current_price, selected_token, part_size)
                     transaction_successful = True  # Simulation is always "successful"
 
-                if transaction_successful:
-                    # Only update state if transaction was successful
-                    trading_state['last_action'] = 'buy'
-
-                    # Record the number of buy operations completed before modifying arrays
-                    buy_operations_completed = parts - len(trading_state['buy_parts'])
-
-                    # When buying: reduce buy-parts by 1 (use a buy opportunity), increase sell-parts by 1 (create a sell opportunity)
-                    if len(trading_state['buy_parts']) > 0:
-                        # Remove a part from buy array (use up a buy opportunity)
-                        trading_state['buy_parts'].pop()  # Remove from buy array
-                        # Add a part to sell array (create a new sell opportunity)
-                        if len(trading_state['sell_parts']) < parts:
-                            trading_state['sell_parts'].append(len(trading_state['sell_parts']))  # Add to sell array
-
-                    # Update base price to execution price (only on successful transaction)
-                    trading_state['base_price'] = current_price
-
-                    # Update position and average purchase price
-                    old_position_value = trading_state['position'] * trading_state['avg_purchase_price']
-                    new_purchase_value = part_size * current_price
-                    trading_state['position'] += part_size
-                    if trading_state['position'] > 0:
-                        trading_state['avg_purchase_price'] = (old_position_value + new_purchase_value) / trading_state['position']
-
-                    print(f"[TRADING] BUY: Used buy opportunity. Remaining buy opportunities: {len(trading_state['buy_parts'])}, Remaining sell opportunities: {len(trading_state['sell_parts'])} at {current_price}. New base price: {trading_state['base_price']}")
-
-                    # Record transaction
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    tx_record = {
-                        'timestamp': timestamp,
-                        'action': 'buy',
-                        'token': selected_token,
-                        'token_symbol': get_token_symbol(selected_token),
-                        'price': current_price,
-                        'amount': part_size,
-                        'base_price_at_execution': current_base_price,
-                        'pnl': None,  # No P&L for buy transactions
-                        'total_parts': parts,
-                        'part_number': buy_operations_completed + 1,  # Number of buy operations completed + 1 to start from 1 (captured before array modification)
-                        'execution_price': current_price,
-                        'status': 'completed',  # New field to track transaction status
-                        'buy_parts_count': len(trading_state['buy_parts']),
-                        'sell_parts_count': len(trading_state['sell_parts']),
-                        'fee_deducted': 0,  # No fee deducted for buy transactions (fee affects profit on sell)
-                        'dollar_value': part_size  # Dollar value of the transaction
-                    }
-
-                    trading_state['transaction_history'].append(tx_record)
-
-                    # Keep only last 20 transactions
-                    if len(trading_state['transaction_history']) > 20:
-                        trading_state['transaction_history'] = trading_state['transaction_history'][-20:]
+                if transaction_successful and transaction_result.get('confirmation') is not None:
+                    # Submitted - keep tracking prices; the ladder moves once the signature confirms
+                    track_confirmation('buy', transaction_result, current_price, current_base_price, part_size)
+                elif transaction_successful:
+                    record_buy(current_price, current_base_price, transaction_result)
                 else:
                     # Transaction failed, don't update base price or other state
-                    print(f"[TRADING] BUY failed: Could not use buy opportunity. Remaining buy opportunities: {len(trading_state['buy_parts'])}, Remaining sell opportunities: {len(trading_state['sell_parts'])} at {current_price}. Base price unchanged: {trading_state['base_price']}")
+                    bot_log.warning("Buy failed, base price unchanged", price=current_price, buy_parts=trading_state.buy_parts,
+                                     sell_parts=trading_state.sell_parts, base_price=trading_state.base_price)
                     # Don't move parts or update base price on failure
 
             elif should_sell:
@@ -1007,7 +1594,8 @@ def trading_algorithm(user_id, base_price, up_percentage, down_percentage, selec
                     # Check trading mode
                     if trading_mode == "user":
                         # In user mode, we need to wait for user confirmation
-                        print(f"[USER MODE] Sell intent: {actual_sell_amount} of {get_token_symbol(selected_token)} at ${current_price} (worth ${part_size:.2f})")
+                        bot_log.info("Trade intent awaiting approval", action="sell", amount=actual_sell_amount, price=current_price,
+                                     dollar_value=part_size)
 
                         # Create a trade approval request
                         trade_id = str(uuid.uuid4())
@@ -1017,258 +1605,255 @@ def trading_algorithm(user_id, base_price, up_percentage, down_percentage, selec
                             'amount': part_size,
                             'token': get_token_symbol(selected_token),
                             'price': current_price,
-                            'timestamp': datetime.now().isoformat(),
+                            'timestamp': datetime.utcnow().isoformat(),
                             'approved': None,  # None means pending
                             'result': 'pending'
                         }
 
-                        # Add to both the list (for frontend) and queue (for trading algorithm)
-                        approvals, lock, queue_obj = get_user_pending_approvals(user_id)
-                        with lock:
-                            approvals.append(approval_request)
+                        # Register the request; approve/reject resolve its future directly
+                        trade_approvals.request(user_id, approval_request)
 
-                        # Wait for user approval with timeout
+                        # Wait for user approval with timeout (the task sleeps until the user decides)
                         approval_timeout = 30  # 30 seconds timeout
-                        start_time = time.time()
-                        approved = False
-
-                        while time.time() - start_time < approval_timeout and not approved:
-                            # Check if this trade has been approved/rejected from the queue
-                            try:
-                                check_approval = queue_obj.get_nowait()
-                                if check_approval['id'] == trade_id:
-                                    if check_approval['result'] == 'approved':
-                                        approved = True
-                                        transaction_result = execute_sell_transaction(user_id, current_price, selected_token, part_size, network)
-                                        transaction_successful = transaction_result["success"]
-                                    elif check_approval['result'] == 'rejected':
-                                        transaction_successful = False
-                                        print(f"[USER MODE] User rejected sell intent for {part_size} of {get_token_symbol(selected_token)} at ${current_price}")
-                            except queue.Empty:
-                                pass
-
-                            if not approved:
-                                time.sleep(0.5)  # Check more frequently
-
-                        if not approved:
+                        approved, approved_at = await trade_approvals.wait(user_id, trade_id, approval_timeout)
+                        APPROVAL_WAIT_SECONDS.observe((approved_at or time.monotonic()) - decided_at,
+                                                      "approved" if approved else "rejected" if approved is False else "timeout")
+
+                        if approved:
+                            # Latency from here on is measured from the approval, not the original tick
+                            approval_wait_ms = round((approved_at - decided_at) * 1000, 3)
+                            transaction_result = await bot_engine.run_blocking(execute_sell_transaction, user_id, current_price, selected_token, part_size, network, quote_tick=price_response, decided_at=approved_at)
+                            transaction_result = dict(transaction_result, approval_wait_ms=approval_wait_ms)
+                            transaction_successful = transaction_result["success"]
+                            bot_log.info("Trade approved", action="sell", approval_wait_ms=approval_wait_ms,
+                                         decision_to_submit_ms=transaction_result.get('decision_to_submit_ms'))
+                        elif approved is False:
+                            transaction_successful = False
+                            bot_log.info("User rejected trade intent", action="sell", amount=part_size, price=current_price)
+                        else:
                             # Timeout - reject the trade
                             transaction_successful = False
-                            print(f"[USER MODE] Timeout waiting for approval for sell intent")
+                            bot_log.warning("Timed out waiting for approval", action="sell")
                     else:  # automatic mode
-                        transaction_result = execute_sell_transaction(user_id, current_price, selected_token, actual_sell_amount, network)
+                        transaction_result = await bot_engine.run_blocking(execute_sell_transaction, user_id, current_price, selected_token, actual_sell_amount, network, quote_tick=price_response, decided_at=decided_at)
                         transaction_successful = transaction_result["success"]
                 else:
                     # For devnet/testnet, just simulate
                     simulate_sell(current_price, selected_token, actual_sell_amount)
                     transaction_successful = True  # Simulation is always "successful"
 
-                if transaction_successful:
-                    # Only update state if transaction was successful
-                    trading_state['last_action'] = 'sell'
-
-                    # Record the number of sell operations completed before modifying arrays
-                    sell_operations_completed = parts - len(trading_state['sell_parts'])
-
-                    # When selling: reduce sell-parts by 1 (use a sell opportunity), increase buy-parts by 1 (create a buy opportunity)
-                    if len(trading_state['sell_parts']) > 0:
-                        # Remove a part from sell array (use up a sell opportunity)
-                        trading_state['sell_parts'].pop()  # Remove from sell array
-                        # Add a part to buy array (create a new buy opportunity)
-                        if len(trading_state['buy_parts']) < parts:
-                            trading_state['buy_parts'].append(len(trading_state['buy_parts']))  # Add to buy array
-
-                    # Update base price to execution price (only on successful transaction)
-                    trading_state['base_price'] = current_price
-
-                    # Calculate profit from this sell
-                    # In a real system, we'd track the purchase price for each part, but in this simplified system:
-                    # profit per token = sell price - base price at time of sell
-                    profit_per_token = current_price - current_base_price
-                    total_profit = profit_per_token * part_size
-
-                    # Account for transaction fees (estimated at $0.02 per transaction as requested)
-                    estimated_fee = 0.02  # This is the requested fee amount
-                    total_profit -= estimated_fee  # Subtract fee from profit
-                    trading_state['total_profit'] += total_profit
-
-                    # Reduce position when selling
-                    trading_state['position'] -= min(part_size, trading_state['position'])
-                    if trading_state['position'] <= 0:
-                        trading_state['position'] = 0
-                        trading_state['avg_purchase_price'] = 0
-
-                    print(f"[TRADING] SELL: Used sell opportunity. Remaining buy opportunities: {len(trading_state['buy_parts'])}, Remaining sell opportunities: {len(trading_state['sell_parts'])} at {current_price}. New base price: {trading_state['base_price']}, Total profit: {trading_state['total_profit']}")
-
-                    # Record transaction
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    tx_record = {
-                        'timestamp': timestamp,
-                        'action': 'sell',
-                        'token': selected_token,
-                        'token_symbol': get_token_symbol(selected_token),
-                        'price': current_price,
-                        'amount': actual_sell_amount,  # Use actual amount sold (dollar value converted to tokens)
-                        'base_price_at_execution': current_base_price,
-                        'pnl': total_profit,  # P&L for sell transactions (after fee deduction)
-                        'total_parts': parts,
-                        'part_number': sell_operations_completed + 1,  # Number of sell operations completed + 1 to start from 1 (captured before array modification)
-                        'execution_price': current_price,
-                        'status': 'completed',  # New field to track transaction status
-                        'buy_parts_count': len(trading_state['buy_parts']),
-                        'sell_parts_count': len(trading_state['sell_parts']),
-                        'fee_deducted': 0.02,  # Fee deducted from profit
-                        'dollar_value': part_size  # Dollar value of the transaction
-                    }
-
-                    trading_state['transaction_history'].append(tx_record)
-
-                    # Keep only last 20 transactions
-                    if len(trading_state['transaction_history']) > 20:
-                        trading_state['transaction_history'] = trading_state['transaction_history'][-20:]
+                if transaction_successful and transaction_result.get('confirmation') is not None:
+                    # Submitted - keep tracking prices; the ladder moves once the signature confirms
+                    track_confirmation('sell', transaction_result, current_price, current_base_price, actual_sell_amount)
+                elif transaction_successful:
+                    record_sell(current_price, current_base_price, actual_sell_amount, transaction_result)
                 else:
                     # Transaction failed, don't update base price or other state
-                    print(f"[TRADING] SELL failed: Could not use sell opportunity. Remaining buy opportunities: {len(trading_state['buy_parts'])}, Remaining sell opportunities: {len(trading_state['sell_parts'])} at {current_price}. Base price unchanged: {trading_state['base_price']}")
+                    bot_log.warning("Sell failed, base price unchanged", price=current_price, buy_parts=trading_state.buy_parts,
+                                     sell_parts=trading_state.sell_parts, base_price=trading_state.base_price)
                     # Don't move parts or update base price on failure
 
         except Exception as e:
-            print(f"Error in trading algorithm: {e}")
-
-        # Wait before next iteration (simulate real-time updates)
-        time.sleep(5)
-
-def get_jupiter_price_direct(input_mint, output_mint, amount):
-    """Direct call to Jupiter API without using Flask request context"""
-    import requests
-    import urllib3
-
-    # Disable SSL warnings if needed (for debugging purposes only)
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            bot_log.error("Error in trading algorithm", error=str(e))
 
+    # Bot stopped - release the price feed so its poller can retire, and drop the cached keypair
+    price_subscription.close()
+    keypair_cache.evict(user_id)
 
-    # Set appropriate headers for Jupiter API
-    headers = {
-        "x-api-key": JUPITER_API_KEY
-    }
-
-    # First try the original pair with correct parameters
-    params = {
+def jupiter_quote_params(input_mint, output_mint, amount, slippage_bps=50):
+    """Query parameters for a Jupiter quote request"""
+    return {
         'inputMint': input_mint,
         'outputMint': output_mint,
         'amount': str(amount),  # Convert to string as required
         'swapMode': 'ExactIn',
-        'slippageBps': 50,
+        'slippageBps': slippage_bps,
         'restrictIntermediateTokens': 'true',
         'maxAccounts': 64,
         'instructionVersion': 'V1'
     }
 
-    try:
-        # Make the request with correct parameters
-        response = requests.get(
-            JUPITER_QUOTE_API,
-            params=params,
-            timeout=15,
-            headers=headers,
-            verify=True,  # Keep SSL verification enabled for security
-            allow_redirects=True
-        )
-
-        if response.status_code == 200:
-            quote_data = response.json()
-            # Check if quote contains necessary data
-            if 'outAmount' in quote_data and 'inAmount' in quote_data:
-                out_amount = int(quote_data['outAmount'])
-                in_amount = int(quote_data['inAmount'])
-
-                # Price calculation with proper decimal adjustment
-                if in_amount == 0:
-                    return {"price": 0.0, "success": False, "message": "Input amount is zero"}
-
-                # SOL (9 decimals) → USDC (6 decimals) price calculation
-                price = (out_amount / 10**6) / (in_amount / 10**9)
-
-                return {"price": price, "success": True, "quote_data": quote_data}
-            else:
-                return {"price": 0.0, "success": False, "message": f"Quote data missing: {quote_data}"}
+def rescale_jupiter_quote(quote_data, amount):
+    """
+    Copy of an ExactIn quote scaled linearly to a new input amount: inAmount,
+    outAmount, otherAmountThreshold and the per-hop route amounts all move by the
+    same ratio. Slippage protection stays proportional, so a fill that drifts
+    further than slippageBps still fails on chain.
+    """
+    ratio = int(amount) / int(quote_data['inAmount'])
+    scaled = dict(quote_data)
+    scaled['inAmount'] = str(int(amount))
+    scaled['outAmount'] = str(int(int(quote_data['outAmount']) * ratio))
+    scaled['otherAmountThreshold'] = str(int(int(quote_data['otherAmountThreshold']) * ratio))
+
+    route_plan = []
+    for step in quote_data.get('routePlan', []):
+        swap_info = dict(step.get('swapInfo', {}))
+        for field in ('inAmount', 'outAmount', 'feeAmount'):
+            if field in swap_info:
+                swap_info[field] = str(int(int(swap_info[field]) * ratio))
+        route_plan.append(dict(step, swapInfo=swap_info))
+    scaled['routePlan'] = route_plan
+    return scaled
+
+def quote_from_tick(tick, input_mint, output_mint, amount, slippage_bps=50, max_age=None):
+    """
+    Reuse the quote behind a price tick for a swap if it is for the same pair and
+    slippage, no older than max_age (default QUOTE_MAX_AGE) and does not need to be
+    scaled up by more than QUOTE_MAX_RESCALE. Returns (quote_data, age_seconds), or
+    (None, age_seconds) when the caller has to re-quote.
+    """
+    max_age = QUOTE_MAX_AGE if max_age is None else max_age
+    if not tick or not tick.get('success') or 'fetched_at' not in tick:
+        return None, None
+
+    age = time.monotonic() - tick['fetched_at']
+    quote_data = tick.get('quote_data') or {}
+    if age > max_age:
+        return None, age
+    if quote_data.get('inputMint') != input_mint or quote_data.get('outputMint') != output_mint:
+        return None, age
+    if quote_data.get('swapMode', 'ExactIn') != 'ExactIn' or int(quote_data.get('slippageBps', slippage_bps)) != slippage_bps:
+        return None, age
+    if 'otherAmountThreshold' not in quote_data or not int(quote_data.get('inAmount', 0)):
+        return None, age
+
+    if int(amount) == int(quote_data['inAmount']):
+        return quote_data, age
+    if int(amount) > int(quote_data['inAmount']) * QUOTE_MAX_RESCALE:
+        # Far larger than the quoted size - price impact won't scale linearly
+        return None, age
+    return rescale_jupiter_quote(quote_data, amount), age
+
+def parse_jupiter_quote_response(response):
+    """Turn a Jupiter quote HTTP response (requests or httpx) into the price dict used by the bots"""
+    if response.status_code == 200:
+        quote_data = response.json()
+        # Check if quote contains necessary data
+        if 'outAmount' in quote_data and 'inAmount' in quote_data:
+            out_amount = int(quote_data['outAmount'])
+            in_amount = int(quote_data['inAmount'])
+
+            # Price calculation with proper decimal adjustment
+            if in_amount == 0:
+                return {"price": 0.0, "success": False, "message": "Input amount is zero"}
+
+            # SOL (9 decimals) → USDC (6 decimals) price calculation
+            price = (out_amount / 10**6) / (in_amount / 10**9)
+
+            return {"price": price, "success": True, "quote_data": quote_data}
         else:
-            # If the API returns an error status, try to provide more useful error info
-            error_text = response.text if response.text else f"HTTP {response.status_code}"
-            return {"price": 0.0, "success": False, "message": f"API Error: {response.status_code} - {error_text}"}
-    except requests.exceptions.ConnectionError as e:
-        print(f"ConnectionError: {e}")
+            return {"price": 0.0, "success": False, "message": f"Quote data missing: {quote_data}"}
+    else:
+        # If the API returns an error status, try to provide more useful error info
+        error_text = response.text if response.text else f"HTTP {response.status_code}"
+        return {"price": 0.0, "success": False, "message": f"API Error: {response.status_code} - {error_text}"}
+
+async def get_jupiter_price_async(input_mint, output_mint, amount):
+    """Non-blocking Jupiter quote for the bot engine; result from parse_jupiter_quote_response"""
+    # httpx rejects None header values, unlike requests which drops them
+    headers = {"x-api-key": JUPITER_API_KEY} if JUPITER_API_KEY else {}
+    params = jupiter_quote_params(input_mint, output_mint, amount)
+
+    started = time.perf_counter()
+    ok = False
+    try:
+        response = await http_transport.async_client().get(JUPITER_QUOTE_API, params=params, headers=headers)
+        ok = response.status_code == 200
+        return parse_jupiter_quote_response(response)
+    except httpx.ConnectError as e:
+        log.warning("Jupiter quote connection error", error=str(e))
         return {"price": 0.0, "success": False, "message": f"Connection error - unable to reach Jupiter API: {str(e)}"}
-    except requests.exceptions.Timeout as e:
-        print(f"Timeout: {e}")
+    except httpx.TimeoutException as e:
+        log.warning("Jupiter quote timed out", error=str(e))
         return {"price": 0.0, "success": False, "message": f"Request timed out - Jupiter API is not responding: {str(e)}"}
-    except requests.exceptions.RequestException as e:
-        print(f"RequestException: {e}")
+    except httpx.HTTPError as e:
+        log.warning("Jupiter quote request error", error=str(e))
         return {"price": 0.0, "success": False, "message": f"Request error: {str(e)}"}
     except Exception as e:
-        print(f"Unexpected error fetching price: {e}")
-        # On error, return a default price and indicate failure
+        log.error("Unexpected error fetching price", error=str(e))
         return {"price": 0.0, "success": False, "message": str(e)}
+    finally:
+        elapsed = time.perf_counter() - started
+        observe_upstream("jupiter", "quote", elapsed, ok)
+        # The bots' shared price feeds fetch through here: this is the price-fetch phase of their ticks
+        TICK_PHASE_SECONDS.observe(elapsed, "price_fetch")
 
 def get_token_symbol(token_mint):
     """Get a display name for a token mint"""
     return TOKEN_INFO.get(token_mint, {}).get("symbol", f"Token_{token_mint[:8]}")
 
-def execute_swap(user_id, input_mint, output_mint, amount, slippage_bps=50):
-    """Execute a swap transaction using Jupiter API and private key"""
+def load_wallet_secret(user_id):
+    """Decrypt a user's private key into a bytearray (None if the user has no wallet)"""
+    wallet = Wallet.find_by_user_id(user_id)
+    if not wallet:
+        return None
+    return bytearray(wallet.get_private_key())
+
+def keypair_from_secret(secret):
+    """Build a signing Keypair from a 64-byte secret key or a 32-byte seed"""
     try:
-        # Get user's wallet from database
-        wallet = Wallet.find_by_user_id(user_id)
-        if not wallet:
+        from solana.keypair import Keypair as SolanaKeypair
+        if len(secret) == 64:
+            return SolanaKeypair.from_secret_key(bytes(secret))
+        elif len(secret) == 32:
+            return SolanaKeypair.from_seed(bytes(secret))
+    except (ImportError, AttributeError):
+        try:
+            from solders.keypair import Keypair as SolderKeypair
+            if len(secret) == 64:
+                return SolderKeypair.from_bytes(secret)
+            elif len(secret) == 32:
+                return SolderKeypair.from_seed(secret)
+        except (ImportError, AttributeError):
+            raise ValueError("Could not create keypair from private key bytes")
+    raise ValueError(f"Invalid keypair length: {len(secret)}")
+
+def execute_swap(user_id, input_mint, output_mint, amount, slippage_bps=50, quote_tick=None, decided_at=None):
+    """
+    Execute a swap transaction using Jupiter API and private key.
+    Returns once the transaction is submitted; result["confirmation"] is a Future
+    from the confirmation tracker that resolves when the signature confirms or fails.
+    quote_tick is the price tick that triggered the trade; its quote goes straight
+    to /swap when fresh enough (see quote_from_tick), otherwise a new quote is
+    requested. decided_at (time.monotonic()) is used to report decision-to-submit latency.
+    """
+    try:
+        # Ready-to-sign keypair from the cache (no DB read or decryption once warm)
+        keypair = keypair_cache.get(user_id)
+        if keypair is None:
             return {
                 "success": False,
                 "error": "Wallet not found for user"
             }
 
-        # Get keypair
-        keypair = wallet.get_keypair()
-        if isinstance(keypair, bytes):
-            # If we got raw bytes, we need to create the keypair properly
-            try:
-                from solana.keypair import Keypair as SolanaKeypair
-                if len(keypair) == 64:
-                    keypair = SolanaKeypair.from_secret_key(keypair)
-                elif len(keypair) == 32:
-                    keypair = SolanaKeypair.from_seed(keypair)
-            except (ImportError, AttributeError):
-                try:
-                    from solders.keypair import Keypair as SolderKeypair
-                    if len(keypair) == 64:
-                        keypair = SolderKeypair.from_bytes(keypair)
-                    elif len(keypair) == 32:
-                        keypair = SolderKeypair.from_seed(keypair)
-                except (ImportError, AttributeError):
-                    raise ValueError("Could not create keypair from private key bytes")
-
         user_public_key = str(keypair.pubkey())
 
         if not JUPITER_API_KEY:
             raise ValueError("JUPITER_API_KEY not found in environment variables")
 
-        # Get quote first
-        quote_headers = {
-            "x-api-key": JUPITER_API_KEY
-        }
+        if decided_at is None:
+            decided_at = time.monotonic()
+        phase_started = time.perf_counter()
 
-        quote_params = {
-            'inputMint': input_mint,
-            'outputMint': output_mint,
-            'amount': str(amount),  # Convert to string as required
-            'swapMode': 'ExactIn',
-            'slippageBps': slippage_bps,
-            'restrictIntermediateTokens': 'true',
-            'maxAccounts': 64,
-            'instructionVersion': 'V1'
-        }
+        # Use the quote that triggered the decision when it is still fresh
+        quote_data, quote_age = quote_from_tick(quote_tick, input_mint, output_mint, amount, slippage_bps)
+        quote_source = "tick"
+
+        if quote_data is None:
+            # Stale or unusable - get a new quote first
+            quote_source = "requote"
+            quote_headers = {
+                "x-api-key": JUPITER_API_KEY
+            }
+
+            quote_params = jupiter_quote_params(input_mint, output_mint, amount, slippage_bps)
 
-        quote_response = requests.get(JUPITER_QUOTE_API, params=quote_params, headers=quote_headers)
-        if quote_response.status_code != 200:
-            raise Exception(f"Quote API error: {quote_response.status_code} - {quote_response.text}")
+            quote_response = jupiter_request("quote", "GET", JUPITER_QUOTE_API, params=quote_params, headers=quote_headers)
+            if quote_response.status_code != 200:
+                raise Exception(f"Quote API error: {quote_response.status_code} - {quote_response.text}")
 
-        quote_data = quote_response.json()
+            quote_data = quote_response.json()
 
         # Prepare swap request
         swap_headers = {
@@ -1291,7 +1876,7 @@ def execute_swap(user_id, input_mint, output_mint, amount, slippage_bps=50):
         }
 
         # Get swap transaction
-        swap_response = requests.post(JUPITER_SWAP_API, headers=swap_headers, json=swap_body)
+        swap_response = jupiter_request("swap", "POST", JUPITER_SWAP_API, headers=swap_headers, json=swap_body)
         if swap_response.status_code != 200:
             raise Exception(f"Swap API error: {swap_response.status_code} - {swap_response.text}")
 
@@ -1307,6 +1892,9 @@ def execute_swap(user_id, input_mint, output_mint, amount, slippage_bps=50):
 
         # Create transaction object and sign it (for VersionedTransaction)
         tx = VersionedTransaction.from_bytes(transaction_data)
+        now = time.perf_counter()
+        TICK_PHASE_SECONDS.observe(now - phase_started, "swap_build")
+        phase_started = now
 
         # Sign the message
         from solders.message import to_bytes_versioned
@@ -1321,16 +1909,16 @@ def execute_swap(user_id, input_mint, output_mint, amount, slippage_bps=50):
 
         # Get the signed transaction bytes
         signed_transaction = bytes(signed_tx)
+        TICK_PHASE_SECONDS.observe(time.perf_counter() - phase_started, "sign")
 
-        if HELIUS_API_KEY:
-            # Use Helius RPC endpoint for faster and more reliable transactions
-            helius_rpc_url = f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
-            solana_client = Client(helius_rpc_url)
-        else:
-            # Fallback to standard Solana RPC
-            solana_client = Client("https://api.mainnet-beta.solana.com")
+        # Shared mainnet client (Helius when configured) with a warm connection pool
+        solana_client = rpc_clients.client("mainnet")
 
         from solana.rpc.types import TxOpts
+        decision_to_submit_ms = round((time.monotonic() - decided_at) * 1000, 3)
+        log.info("Submitting swap", user_id=user_id, decision_to_submit_ms=decision_to_submit_ms, quote_source=quote_source,
+                 quote_age_ms=round(quote_age * 1000) if quote_age is not None else None)
+        phase_started = time.perf_counter()
         result = solana_client.send_raw_transaction(
             signed_transaction,
             opts=TxOpts(
@@ -1338,55 +1926,50 @@ def execute_swap(user_id, input_mint, output_mint, amount, slippage_bps=50):
                 preflight_commitment="confirmed"
             )
         )
+        TICK_PHASE_SECONDS.observe(time.perf_counter() - phase_started, "send")
 
-        # Wait for confirmation
+        # Hand the signature to the confirmation tracker instead of blocking here
         signature = result.value
-        confirmation = solana_client.confirm_transaction(signature, "confirmed")
-
-        # Handle both object and list responses
-        confirmation_value = confirmation.value
-        if isinstance(confirmation_value, list):
-            confirmation_value = confirmation_value[0] if confirmation_value else None
+        confirmation = confirmation_tracker.track(signature, "mainnet")
 
-        if confirmation_value and hasattr(confirmation_value, 'err') and confirmation_value.err:
-            raise Exception(f"Transaction failed: {confirmation_value.err}")
-        elif confirmation_value and isinstance(confirmation_value, dict) and confirmation_value.get('err'):
-            raise Exception(f"Transaction failed: {confirmation_value.get('err')}")
-
-        # Transaction executed successfully
+        # Transaction submitted; "confirmation" resolves once it lands or fails
         return {
             "success": True,
+            "status": "submitted",
+            "confirmation": confirmation,
             "signature": str(signature),
             "quote_data": quote_data,
-            "swap_data": swap_data
+            "swap_data": swap_data,
+            "quote_source": quote_source,
+            "decision_to_submit_ms": decision_to_submit_ms
         }
 
     except Exception as e:
-        print(f"Error executing swap: {e}")
+        log.error("Error executing swap", user_id=user_id, error=str(e))
         return {
             "success": False,
             "error": str(e)
         }
 
-def execute_buy_transaction(user_id, price, token, amount, network="mainnet"):
-    """Execute a real buy transaction using private key"""
+def execute_buy_transaction(user_id, price, token, amount, network="mainnet", quote_tick=None, decided_at=None):
+    """Execute a real buy transaction using private key (quote_tick/decided_at: see execute_swap)"""
     if network.lower() != "mainnet":
         # For devnet/testnet, just simulate
-        token_symbol = get_token_symbol(token)
-        print(f"[SIMULATION] Buying {amount} of {token_symbol} (mint: {token[:8]}...) at ${price:.8f} per unit")
+        simulate_buy(price, token, amount)
         return {"success": True, "signature": "simulated", "message": "Simulated transaction"}
 
     # Check wallet balance before executing trade
-    wallet = Wallet.find_by_user_id(user_id)
-    if not wallet:
+    # The cached signing keypair gives us the wallet address without a DB read
+    keypair = keypair_cache.get(user_id)
+    if keypair is None:
         return {"success": False, "error": "Wallet not found for user"}
 
-    wallet_address = wallet.public_key
+    wallet_address = str(keypair.pubkey())
 
-    # Get token balances
-    balance_response = get_wallet_balance(wallet_address, network)
+    # Get token balances (a recent cached balance is good enough for the pre-check)
+    balance_response = balance_cache.get(wallet_address, network)
     if not balance_response.get("success", False):
-        print(f"[FAILED] Could not check wallet balance: {balance_response.get('message', 'Unknown error')}")
+        log.warning("Could not check wallet balance", user_id=user_id, message=balance_response.get('message', 'Unknown error'))
         return {"success": False, "error": "Could not check wallet balance"}
 
     balances = balance_response.get("balances", [])
@@ -1425,11 +2008,11 @@ def execute_buy_transaction(user_id, price, token, amount, network="mainnet"):
 
     # Ensure there's enough SOL to cover transaction fees
     if sol_balance < 0.005:
-        print(f"[FAILED] Insufficient SOL for transaction fees: Have {sol_balance} SOL, need 0.005 SOL")
+        log.warning("Insufficient SOL for transaction fees", user_id=user_id, have=sol_balance, need=0.005)
         return {"success": False, "error": f"Insufficient SOL for fees: Have {sol_balance}, need 0.005"}
 
     if input_balance < required_amount:
-        print(f"[FAILED] Insufficient balance for buy: Have {input_balance} {input_token_symbol}, need {required_amount} {input_token_symbol}")
+        log.warning("Insufficient balance for buy", user_id=user_id, token=input_token_symbol, have=input_balance, need=required_amount)
         return {"success": False, "error": f"Insufficient balance: Have {input_balance}, need {required_amount}"}
 
     # Convert amount to appropriate units based on the input token (USDC)
@@ -1440,38 +2023,39 @@ def execute_buy_transaction(user_id, price, token, amount, network="mainnet"):
     amount_units = int(amount * 10**6)  # Convert to USDC units (6 decimals)
 
     # Execute the swap
-    result = execute_swap(user_id, input_mint, output_mint, amount_units)
+    result = execute_swap(user_id, input_mint, output_mint, amount_units, quote_tick=quote_tick, decided_at=decided_at)
 
     if result["success"]:
-        token_symbol = get_token_symbol(token)
-        print(f"[SUCCESS] Bought {amount} of {token_symbol} at ${price:.8f} per unit")
-        print(f"Transaction signature: {result['signature']}")
+        # Holdings change once the swap lands - the next balance read after that must go to the chain
+        balance_cache.invalidate(wallet_address)
+        result["confirmation"].add_done_callback(lambda _: balance_cache.invalidate(wallet_address))
+        log.info("Buy submitted", user_id=user_id, token=get_token_symbol(token), amount=amount, price=price,
+                 signature=result['signature'])
         return result
     else:
-        token_symbol = get_token_symbol(token)
-        print(f"[FAILED] Failed to buy {amount} of {token_symbol} at ${price:.8f} per unit")
-        print(f"Error: {result['error']}")
+        log.warning("Buy failed", user_id=user_id, token=get_token_symbol(token), amount=amount, price=price,
+                    error=result['error'])
         return result
 
-def execute_sell_transaction(user_id, price, token, amount, network="mainnet"):
-    """Execute a real sell transaction using private key"""
+def execute_sell_transaction(user_id, price, token, amount, network="mainnet", quote_tick=None, decided_at=None):
+    """Execute a real sell transaction using private key (quote_tick/decided_at: see execute_swap)"""
     if network.lower() != "mainnet":
         # For devnet/testnet, just simulate
-        token_symbol = get_token_symbol(token)
-        print(f"[SIMULATION] Selling {amount} of {token_symbol} (mint: {token[:8]}...) at ${price:.8f} per unit")
+        simulate_sell(price, token, amount)
         return {"success": True, "signature": "simulated", "message": "Simulated transaction"}
 
     # Check wallet balance before executing trade
-    wallet = Wallet.find_by_user_id(user_id)
-    if not wallet:
+    # The cached signing keypair gives us the wallet address without a DB read
+    keypair = keypair_cache.get(user_id)
+    if keypair is None:
         return {"success": False, "error": "Wallet not found for user"}
 
-    wallet_address = wallet.public_key
+    wallet_address = str(keypair.pubkey())
 
-    # Get token balances
-    balance_response = get_wallet_balance(wallet_address, network)
+    # Get token balances (a recent cached balance is good enough for the pre-check)
+    balance_response = balance_cache.get(wallet_address, network)
     if not balance_response.get("success", False):
-        print(f"[FAILED] Could not check wallet balance: {balance_response.get('message', 'Unknown error')}")
+        log.warning("Could not check wallet balance", user_id=user_id, message=balance_response.get('message', 'Unknown error'))
         return {"success": False, "error": "Could not check wallet balance"}
 
     balances = balance_response.get("balances", [])
@@ -1510,11 +2094,11 @@ def execute_sell_transaction(user_id, price, token, amount, network="mainnet"):
 
     # Ensure there's enough SOL to cover transaction fees
     if sol_balance < 0.005:
-        print(f"[FAILED] Insufficient SOL for transaction fees: Have {sol_balance} SOL, need 0.005 SOL")
+        log.warning("Insufficient SOL for transaction fees", user_id=user_id, have=sol_balance, need=0.005)
         return {"success": False, "error": f"Insufficient SOL for fees: Have {sol_balance}, need 0.005"}
 
     if input_balance < required_amount:
-        print(f"[FAILED] Insufficient balance for sell: Have {input_balance} {input_token_symbol}, need {required_amount} {input_token_symbol}")
+        log.warning("Insufficient balance for sell", user_id=user_id, token=input_token_symbol, have=input_balance, need=required_amount)
         return {"success": False, "error": f"Insufficient balance: Have {input_balance}, need {required_amount}"}
 
     # Convert amount to appropriate units based on the token being sold (input token)
@@ -1528,30 +2112,29 @@ def execute_sell_transaction(user_id, price, token, amount, network="mainnet"):
         amount_units = int(amount * 10**6)
 
     # Execute the swap
-    result = execute_swap(user_id, input_mint, output_mint, amount_units)
+    result = execute_swap(user_id, input_mint, output_mint, amount_units, quote_tick=quote_tick, decided_at=decided_at)
 
     if result["success"]:
-        token_symbol = get_token_symbol(token)
-        print(f"[SUCCESS] Sold {amount} of {token_symbol} at ${price:.8f} per unit")
-        print(f"Transaction signature: {result['signature']}")
+        # Holdings change once the swap lands - the next balance read after that must go to the chain
+        balance_cache.invalidate(wallet_address)
+        result["confirmation"].add_done_callback(lambda _: balance_cache.invalidate(wallet_address))
+        log.info("Sell submitted", user_id=user_id, token=get_token_symbol(token), amount=amount, price=price,
+                 signature=result['signature'])
         return result
     else:
-        token_symbol = get_token_symbol(token)
-        print(f"[FAILED] Failed to sell {amount} of {token_symbol} at ${price:.8f} per unit")
-        print(f"Error: {result['error']}")
+        log.warning("Sell failed", user_id=user_id, token=get_token_symbol(token), amount=amount, price=price,
+                    error=result['error'])
         return result
 
 def simulate_buy(price, token, amount):
     """Simulate a buy transaction"""
-    token_symbol = get_token_symbol(token)
-    print(f"[SIMULATION] Buying {amount} of {token_symbol} (mint: {token[:8]}...) at ${price:.8f} per unit")
+    log.info("Simulated buy", token=get_token_symbol(token), mint=token, amount=amount, price=price)
     # In a real simulation, we would update wallet balances, track positions, etc.
     # For now, we just log the action as we're not connecting to a real wallet
 
 def simulate_sell(price, token, amount):
     """Simulate a sell transaction"""
-    token_symbol = get_token_symbol(token)
-    print(f"[SIMULATION] Selling {amount} of {token_symbol} (mint: {token[:8]}...) at ${price:.8f} per unit")
+    log.info("Simulated sell", token=get_token_symbol(token), mint=token, amount=amount, price=price)
     # In a real simulation, we would update wallet balances, track positions, etc.
     # For now, we just log the action as we're not connecting to a real wallet")
 
@@ -1580,7 +2163,7 @@ def get_deposit_address():
             "deposit_address": wallet.public_key
         })
     except Exception as e:
-        print(f"Error getting deposit address: {e}")
+        log.error("Error getting deposit address", error=str(e))
         return jsonify({"success": False, "message": f"Error getting deposit address: {str(e)}"}), 500
 
 @app.route('/api/create-deposit-transaction', methods=['POST'])
@@ -1638,7 +2221,7 @@ def create_deposit_transaction():
             })
 
     except Exception as e:
-        print(f"Error creating deposit transaction: {e}")
+        log.error("Error creating deposit transaction", error=str(e))
         return jsonify({"success": False, "message": f"Error creating deposit transaction: {str(e)}"}), 500
 
 @app.route('/api/withdraw-funds', methods=['POST'])
@@ -1661,7 +2244,7 @@ def withdraw_funds():
     if not token_mint:
          return jsonify({"success": False, "message": "Token mint is required"}), 400
 
-    print(f"DEBUG: Withdrawal Request - Dest: {destination_address}, Amount: {amount}, Mint: {token_mint}, Decimals: {decimals}")
+    log.debug("Withdrawal request", user_id=user_id, destination=destination_address, amount=amount, mint=token_mint, decimals=decimals)
 
     try:
         # Get user's wallet
@@ -1677,7 +2260,7 @@ def withdraw_funds():
             
         return jsonify(result)
     except Exception as e:
-        print(f"Error withdrawing funds: {e}")
+        log.error("Error withdrawing funds", user_id=user_id, error=str(e))
         return jsonify({"success": False, "message": f"Error withdrawing funds: {str(e)}"}), 500
 
 def execute_sol_transfer(user_id, destination_address, amount):
@@ -1701,12 +2284,7 @@ def execute_sol_transfer(user_id, destination_address, amount):
         except ImportError:
              return {"success": False, "message": "Could not import solders.keypair. Please ensure solders is installed."}
         
-        if HELIUS_API_KEY:
-            rpc_url = f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
-        else:
-            rpc_url = "https://api.mainnet-beta.solana.com"
-            
-        client = Client(rpc_url)
+        client = rpc_clients.client("mainnet")
         
         # Convert amount to lamports
         lamports = int(amount * 10**9)
@@ -1743,7 +2321,8 @@ def execute_sol_transfer(user_id, destination_address, amount):
             result = client.send_transaction(tx, keypair)
             
             signature = str(result.value)
-            print(f"SOL Withdraw Success: https://solscan.io/tx/{signature}")
+            log.info("SOL withdrawal sent", user_id=user_id, signature=signature, url=f"https://solscan.io/tx/{signature}")
+            balance_cache.invalidate(wallet.public_key)
             
             return {
                 "success": True, 
@@ -1752,7 +2331,7 @@ def execute_sol_transfer(user_id, destination_address, amount):
             }
             
         except Exception as inner_e:
-            print(f"Error building/sending SOL tx: {inner_e}")
+            log.error("Error building/sending SOL transaction", user_id=user_id, error=str(inner_e))
             raise inner_e
 
     except Exception as e:
@@ -1779,18 +2358,13 @@ def execute_spl_transfer(user_id, destination_address, amount, token_mint, decim
         except ImportError:
              return {"success": False, "message": "Could not import solders.keypair. Please ensure solders is installed."}
         
-        if HELIUS_API_KEY:
-            rpc_url = f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
-        else:
-            rpc_url = "https://api.mainnet-beta.solana.com"
-            
-        client = Client(rpc_url)
+        client = rpc_clients.client("mainnet")
         
         # Convert amount to token units
         # Handle float precision issues
         amount_units = int(round(amount * (10**decimals)))
         
-        print(f"DEBUG: SPL Transfer - Amount: {amount}, Decimals: {decimals}, Units: {amount_units}")
+        log.debug("SPL transfer", user_id=user_id, amount=amount, decimals=decimals, units=amount_units)
         
         # Imports for SPL token transfer
         from spl.token.instructions import get_associated_token_address, transfer_checked, TransferCheckedParams, create_associated_token_account
@@ -1832,11 +2406,11 @@ def execute_spl_transfer(user_id, destination_address, amount, token_mint, decim
         if is_dest_token_account:
             # Destination IS the token account. Transfer directly to it.
             dest_ata = dest_pubkey_input
-            print(f"DEBUG: Destination {destination_address} is a Token Account. Transferring directly.")
+            log.debug("Destination is a token account, transferring directly", destination=destination_address)
         else:
             # Destination is a Wallet Address. Derive the ATA.
             dest_ata = get_associated_token_address(dest_pubkey_input, token_mint_pubkey)
-            print(f"DEBUG: Destination {destination_address} is a Wallet. Deriving ATA: {dest_ata}")
+            log.debug("Destination is a wallet, deriving its ATA", destination=destination_address, ata=dest_ata)
 
         # Get latest blockhash
         recent_blockhash_resp = client.get_latest_blockhash()
@@ -1850,7 +2424,7 @@ def execute_spl_transfer(user_id, destination_address, amount, token_mint, decim
             dest_ata_info = client.get_account_info(dest_ata)
             if dest_ata_info.value is None:
                 # Destination ATA does not exist, create it
-                print(f"DEBUG: Creating missing ATA {dest_ata} for owner {dest_pubkey_input}")
+                log.debug("Creating missing ATA", ata=dest_ata, owner=dest_pubkey_input)
                 tx.add(create_associated_token_account(
                     payer=source_owner_pubkey,
                     owner=dest_pubkey_input,
@@ -1871,7 +2445,8 @@ def execute_spl_transfer(user_id, destination_address, amount, token_mint, decim
         # Sign and send
         result = client.send_transaction(tx, keypair)
         signature = str(result.value)
-        print(f"SPL Withdraw Success: https://solscan.io/tx/{signature}")
+        log.info("SPL withdrawal sent", user_id=user_id, mint=token_mint, signature=signature, url=f"https://solscan.io/tx/{signature}")
+        balance_cache.invalidate(wallet.public_key)
         
         return {
             "success": True, 
@@ -1880,11 +2455,43 @@ def execute_spl_transfer(user_id, destination_address, amount, token_mint, decim
         }
 
     except Exception as e:
-        print(f"SPL Transfer Error: {e}")
+        log.error("SPL transfer error", user_id=user_id, mint=token_mint, error=str(e))
         # Check for module not found error to give better feedback
         if "No module named" in str(e):
              return {"success": False, "message": f"Server Configuration Error: {str(e)}"}
         return {"success": False, "message": str(e)}
 
+def init_app():
+    """
+    Start-up side effects: the log writer, MongoDB command metrics, database indexes,
+    the flushes at exit and the wallet balance refresh job. Everything above only
+    defines objects that start lazily.
+    """
+    # JSON log lines on stdout, written by a background thread so bots never wait on output.
+    # Per-tick bot messages are written at most once per LOG_TICK_INTERVAL seconds per bot.
+    structured_log.configure(
+        level=os.getenv('LOG_LEVEL', 'INFO'),
+        tick_interval=float(os.getenv('LOG_TICK_INTERVAL', '10')),
+        queue_size=int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    )
+    # Must be registered before the Mongo client is created
+    monitoring.register(MongoCommandMetrics(MONGO_SECONDS, MONGO_FAILURES))
+    # Initialize database tables
+    init_db()
+    if tick_recorder is not None:
+        atexit.register(tick_recorder.close)
+    # Write out queued trades before the process exits
+    atexit.register(trade_journal.close)
+    if BALANCE_REFRESH_INTERVAL > 0:
+        threading.Thread(target=run_balance_refresh, args=(BALANCE_REFRESH_INTERVAL,),
+                         name="balance-refresh", daemon=True).start()
+
+# Parameter sweep workers (forkserver/spawn) re-run the entry script as __mp_main__ just to
+# unpickle their tasks; run as python app/main.py, that must not start the app in every worker
+if __name__ != '__mp_main__':
+    init_app()
+
 if __name__ == '__main__':
+    # Turn SIGTERM into a normal exit so atexit handlers (trade journal flush) run
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     app.run(debug=True, port=5000)
\ No newline at end of file
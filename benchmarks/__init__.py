@@ -0,0 +1,3 @@
+"""
+Offline benchmarks for the multi-user Solana trading bot
+"""
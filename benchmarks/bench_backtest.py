@@ -0,0 +1,149 @@
+"""
+Ladder backtest benchmark
+
+Times run_backtest on a year of 5-second ticks (6.3M prices) for a few ladder
+settings, next to a plain Python per-tick loop over the same series.
+
+live_replay runs the live trading_algorithm (devnet, so fills are simulated,
+fed tick by tick from a stand-in price subscription) over a series; the parity
+test in tests/test_backtest_parity.py and bench_metrics use it.
+
+Usage:
+    python benchmarks/bench_backtest.py --ticks 6307200 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.backtest import run_backtest
+
+YEAR_OF_5S_TICKS = 365 * 24 * 60 * 12
+SOL_MINT = "So11111111111111111111111111111111111111112"
+SETTINGS = [
+    # (up %, down %, parts, trade amount)
+    (0.5, 0.5, 5, 100.0),
+    (1.0, 2.0, 10, 250.0),
+    (2.0, 1.0, 3, 50.0),
+    (5.0, 5.0, 20, 1000.0),
+]
+
+
+def random_walk(ticks, start=150.0, volatility=0.0003, seed=3):
+    """Geometric random walk of prices (default volatility is about 4% a day at 5-second ticks)"""
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(rng.normal(0, volatility, ticks)))
+
+
+def python_ladder(prices, up_percentage, down_percentage, parts):
+    """Per-tick Python loop over the same rules, for timing only"""
+    base_price = prices[0]
+    buy_parts = sell_parts = parts
+    fills = 0
+    for price in prices[1:]:
+        if price <= base_price * (1 - down_percentage / 100) and buy_parts > 0:
+            buy_parts -= 1
+            sell_parts = min(parts, sell_parts + 1)
+        elif price >= base_price * (1 + up_percentage / 100) and sell_parts > 0:
+            sell_parts -= 1
+            buy_parts = min(parts, buy_parts + 1)
+        else:
+            continue
+        base_price = price
+        fills += 1
+    return fills
+
+
+class ReplaySubscription:
+    """Stand-in for a PriceSubscription that hands out a fixed series, then stops the bot"""
+
+    def __init__(self, prices, trading_state):
+        self.prices = iter(prices)
+        self.trading_state = trading_state
+
+    async def next(self, timeout=None):
+        price = next(self.prices, None)
+        if price is None:
+            self.trading_state.is_running = False
+            return {"success": False, "price": 0.0, "message": "end of series"}
+        return {"success": True, "price": float(price)}
+
+    def close(self):
+        pass
+
+
+def live_replay(main, prices, up_percentage, down_percentage, parts, trade_amount):
+    """Run the live trading_algorithm over prices and return its fills and final state"""
+    user_id = "backtest-parity"
+    main.user_trading_states.pop(user_id, None)
+    trading_state = main.get_user_trading_state(user_id)
+    fills = []
+
+    journal_trade = main.journal_trade
+    subscribe = main.price_hub.subscribe
+    main.journal_trade = lambda uid, tx_record, network: fills.append(tx_record)
+    main.price_hub.subscribe = lambda *args, **kwargs: ReplaySubscription(prices, trading_state)
+    try:
+        asyncio.run(main.trading_algorithm(user_id, 0, up_percentage, down_percentage, SOL_MINT,
+                                           trade_amount, parts, "devnet", "automatic"))
+    finally:
+        main.journal_trade = journal_trade
+        main.price_hub.subscribe = subscribe
+    return fills, trading_state
+
+
+def time_backtest(ticks, repeats=3):
+    prices = random_walk(ticks)
+    results = []
+    for up, down, parts, amount in SETTINGS:
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            result = run_backtest(prices, up, down, parts, amount, record_fills=False)
+            timings.append(time.perf_counter() - started)
+        results.append({
+            "up_percentage": up,
+            "down_percentage": down,
+            "parts": parts,
+            "ticks": ticks,
+            "fills": result['buys'] + result['sells'],
+            "total_profit": round(result['total_profit'], 4),
+            "max_drawdown": round(result['max_drawdown'], 4),
+            "best_seconds": round(min(timings), 4),
+        })
+
+    up, down, parts, _ = SETTINGS[0]
+    started = time.perf_counter()
+    python_ladder(prices.tolist(), up, down, parts)
+    python_seconds = time.perf_counter() - started
+    return results, round(python_seconds, 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized ladder backtest")
+    parser.add_argument("--ticks", type=int, default=YEAR_OF_5S_TICKS, help="prices in the timing series")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results, python_seconds = time_backtest(args.ticks)
+    output = {"speed": {"runs": results, "python_loop_seconds": python_seconds}}
+    for r in results:
+        print(f"up={r['up_percentage']:>4}% down={r['down_percentage']:>4}% parts={r['parts']:>3}  "
+              f"{r['ticks']:,} ticks  fills={r['fills']:>7,}  {r['best_seconds']:>8.4f}s  "
+              f"pnl={r['total_profit']:>12.4f}  max drawdown={r['max_drawdown']:.4f}")
+    print(f"plain Python loop over the same ticks: {python_seconds:.4f}s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
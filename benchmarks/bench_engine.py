@@ -0,0 +1,164 @@
+"""
+Bot engine capacity benchmark
+
+Starts increasing numbers of ladder bots on the asyncio bot engine against a
+local mock Jupiter upstream and reports, per level: live bots, OS threads, RSS,
+event-loop lag, price ticks delivered per second and upstream quote calls per
+second. Bots run on devnet so trades are simulated.
+
+Usage:
+    python benchmarks/bench_engine.py --levels 100,1000,5000,10000 --pairs 10 --duration 15
+
+Importing app.main initializes the database; if mongomock is installed it is
+used as an in-memory backend, otherwise MONGO_URI must point at a live server.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_upstream import MockUpstream
+from services import structured_log
+
+
+def use_in_memory_db():
+    """Point database.get_db at mongomock when it is available"""
+    try:
+        import mongomock
+    except ImportError:
+        return False
+    import database
+    database._db = mongomock.MongoClient()["trading_bot_bench"]
+    return True
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure_loop_lag(engine, duration, probe_interval=0.05):
+    """Sample how late the engine loop wakes up from a short sleep"""
+    import asyncio
+
+    async def probe():
+        lags = []
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            started = time.monotonic()
+            await asyncio.sleep(probe_interval)
+            lags.append((time.monotonic() - started - probe_interval) * 1000)
+        return lags
+
+    return engine.submit(probe()).result(duration + 30)
+
+
+def total_deliveries(main):
+    return sum(feed["deliveries"] for feed in main.price_hub.stats())
+
+
+def run(levels, pairs, duration, interval):
+    upstream = MockUpstream().start()
+    os.environ["JUPITER_QUOTE_API"] = f"{upstream.url}/swap/v1/quote"
+    os.environ["PRICE_POLL_INTERVAL"] = str(interval)
+
+    if not use_in_memory_db():
+        print("mongomock not installed - using MONGO_URI for app initialization", file=sys.stderr)
+
+    # Bots log as they trade; keep that off the terminal and report on the real stdout
+    report = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    from app import main
+
+    mints = [mint for mint in main.TOKEN_INFO if mint != main.USDC_MINT][:pairs]
+    results = []
+    started = 0
+
+    for level in levels:
+        for i in range(started, level):
+            user_id = f"bench-user-{i}"
+            token = mints[i % len(mints)]
+            main.bot_engine.start_bot(
+                user_id,
+                lambda generation, user_id=user_id, token=token: main.trading_algorithm(
+                    user_id, 0, 2.0, 2.0, token, 100.0, 5, "devnet", "automatic", generation=generation
+                )
+            )
+        started = level
+
+        # Let every bot receive its first tick before measuring
+        time.sleep(interval * 2)
+
+        deliveries_before = total_deliveries(main)
+        calls_before = upstream.call_count()
+        window_start = time.monotonic()
+        lags = measure_loop_lag(main.bot_engine, duration)
+        elapsed = time.monotonic() - window_start
+        deliveries = total_deliveries(main) - deliveries_before
+        calls = upstream.call_count() - calls_before
+
+        result = {
+            "bots": level,
+            "live_tasks": main.bot_engine.running_count(),
+            "threads": threading.active_count(),
+            "rss_mb": round(rss_mb(), 1),
+            "loop_lag_p50_ms": round(statistics.median(lags), 2) if lags else 0.0,
+            "loop_lag_p99_ms": round(percentile(lags, 99), 2),
+            "ticks_per_sec": round(deliveries / elapsed, 1),
+            "expected_ticks_per_sec": round(level / interval, 1),
+            "upstream_calls_per_sec": round(calls / elapsed, 2),
+        }
+        results.append(result)
+        print(
+            f"bots={result['bots']:>6} tasks={result['live_tasks']:>6} threads={result['threads']:>3} "
+            f"rss={result['rss_mb']:>8.1f}MB lag p50={result['loop_lag_p50_ms']:>6.2f}ms "
+            f"p99={result['loop_lag_p99_ms']:>7.2f}ms ticks/s={result['ticks_per_sec']:>8.1f} "
+            f"(expected {result['expected_ticks_per_sec']:.1f}) upstream/s={result['upstream_calls_per_sec']:.2f}",
+            file=report, flush=True
+        )
+
+    for user_id in list(main.user_trading_states):
+        main.user_trading_states[user_id].is_running = False
+    upstream.stop()
+    # Bot log lines are written by a background thread; let the queued ones go to devnull too
+    structured_log.flush(timeout=5)
+    sys.stdout = report
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--levels", default="100,1000,5000,10000", help="comma-separated bot counts")
+    parser.add_argument("--pairs", type=int, default=10, help="distinct trading pairs")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds measured per level")
+    parser.add_argument("--interval", type=float, default=1.0, help="price poll interval in seconds")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",")]
+    results = run(levels, args.pairs, args.duration, args.interval)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,355 @@
+"""
+Dashboard HTTP load generator
+
+Simulates many logged-in dashboard sessions, each polling the API the way the
+browser does, and reports throughput and latency percentiles per route:
+
+    trading-status    GET  /api/trading-status every 2s (revalidating with If-None-Match)
+    pending-approvals GET  /api/pending-approvals every 5s
+    wallet-balance    GET  /api/wallet-balance every 30s (top bar)
+    trades-history    POST /api/trades/history for a recent day, every 60s
+    trades-page       GET  /api/trades?limit=100 every 60s
+    pnl               GET  /api/pnl?group=day every 60s
+
+Requests are scheduled open-loop (each session keeps its own cadence whatever the
+server's latency) and sent by a pool of client threads; schedule_lag_p99_ms shows
+when the client itself could not keep up.
+
+By default the app runs in this process on Werkzeug's threaded server (as
+app.run does) with mongomock and the mock upstream as backends: --users users get
+a wallet and --trades-per-user trades over the last 30 days, --running-share of
+them run devnet bots so their status keeps changing, and sessions use signed
+cookies instead of logging in. The client then shares the CPU with the server, so
+to size a deployment run the server separately and point --url at it with
+--accounts (a file of email:password lines; sessions log in round-robin).
+
+Usage:
+    python benchmarks/bench_http.py --sessions 500 --duration 60 --json http.json
+    python benchmarks/bench_http.py --url http://127.0.0.1:5000 --accounts accounts.txt --sessions 200
+"""
+import argparse
+import heapq
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from bson.objectid import ObjectId
+
+from benchmarks.bench_engine import percentile, rss_mb, use_in_memory_db
+from benchmarks.bench_throughput import git_commit
+from benchmarks.mock_upstream import MockUpstream
+from services import structured_log
+
+# (route, seconds between requests per session)
+REQUEST_MIX = (
+    ("trading-status", 2.0),
+    ("pending-approvals", 5.0),
+    ("wallet-balance", 30.0),
+    ("trades-history", 60.0),
+    ("trades-page", 60.0),
+    ("pnl", 60.0),
+)
+HISTORY_DAYS = 30
+# (mint, symbol) of the seeded trades
+SEED_TOKENS = (
+    ("So11111111111111111111111111111111111111112", "SOL"),
+    ("DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263", "BONK"),
+    ("JUPyiwrYJFskUPiHa7hkeR8VUtAeFoSYbKedZNsDvCN", "JUP"),
+)
+
+
+class DashboardSession:
+    """One logged-in browser tab: its cookie and the status ETag it revalidates with"""
+
+    def __init__(self, cookies):
+        self.cookies = cookies
+        self.etag = None
+
+    def request(self, http, base_url, route):
+        if route == "trading-status":
+            headers = {"If-None-Match": self.etag} if self.etag else {}
+            response = http.get(f"{base_url}/api/trading-status", cookies=self.cookies, headers=headers)
+            self.etag = response.headers.get("ETag", self.etag)
+        elif route == "pending-approvals":
+            response = http.get(f"{base_url}/api/pending-approvals", cookies=self.cookies)
+        elif route == "wallet-balance":
+            response = http.get(f"{base_url}/api/wallet-balance", cookies=self.cookies)
+        elif route == "trades-history":
+            day = datetime.utcnow() - timedelta(days=random.randrange(HISTORY_DAYS))
+            response = http.post(f"{base_url}/api/trades/history", cookies=self.cookies, json={"date": day.strftime("%Y-%m-%d")})
+        elif route == "trades-page":
+            response = http.get(f"{base_url}/api/trades", cookies=self.cookies, params={"limit": 100})
+        elif route == "pnl":
+            response = http.get(f"{base_url}/api/pnl", cookies=self.cookies, params={"group": "day"})
+        else:
+            raise ValueError(f"Unknown route {route}")
+        # Read the whole body so latency covers the full response
+        response.content
+        return response.status_code
+
+
+def seed_data(users, trades_per_user):
+    """Users with a wallet and trades_per_user trades (plus their daily rollups) over the last HISTORY_DAYS days"""
+    from database import get_db
+    from models.trade import Trade
+    from models.trade_rollup import ROLLUP_FIELDS, trade_day, trade_increments
+    from solders.keypair import Keypair
+
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    user_ids, wallets, trades, rollups = [], [], [], {}
+    for i in range(users):
+        user_id = f"{i + 1:024x}"
+        user_ids.append(user_id)
+        wallets.append({"user_id": ObjectId(user_id), "public_key": str(Keypair().pubkey()), "encrypted_private_key": "",
+                        "created_at": now.isoformat(), "balance": None})
+        for n in range(trades_per_user):
+            mint, symbol = rng.choice(SEED_TOKENS)
+            action = "buy" if n % 2 == 0 else "sell"
+            trade = Trade(user_id=user_id, timestamp=now - timedelta(seconds=rng.uniform(0, HISTORY_DAYS * 86400)),
+                          action=action, token_mint=mint, token_symbol=symbol, price=150 * (1 + rng.uniform(-0.05, 0.05)),
+                          amount=10.0, pnl=rng.uniform(-1, 2) if action == "sell" else None,
+                          fee=0.02 if action == "sell" else 0, value=10.0).to_document()
+            trades.append(trade)
+            key = (trade["user_id"], mint, trade_day(trade["timestamp"]))
+            totals = rollups.setdefault(key, dict.fromkeys(ROLLUP_FIELDS, 0))
+            for field, increment in trade_increments(trade).items():
+                totals[field] += increment
+
+    # Plain inserts: upserts (and unique indexes) cost a collection scan per document on mongomock
+    db = get_db()
+    db.wallets.insert_many(wallets)
+    if trades:
+        Trade.insert_many(trades)
+        db.trade_rollups.insert_many([dict(totals, user_id=user_id, token_mint=mint, day=day)
+                                      for (user_id, mint, day), totals in rollups.items()])
+    return user_ids
+
+
+def seed_app(users, trades_per_user, running_share, upstream):
+    """Start the app on mongomock + mock upstream with seeded users; returns (main, session cookies per user)"""
+    os.environ.update(upstream.environ())
+    os.environ.setdefault("JUPITER_API_KEY", "bench")
+    os.environ.setdefault("TICK_RECORDING", "0")
+    os.environ.setdefault("PRICE_POLL_INTERVAL", "1")
+
+    if not use_in_memory_db():
+        print("mongomock not installed - using MONGO_URI for app initialization", file=sys.stderr)
+
+    # Seeded before the app starts so its indexes are built once over the data
+    user_ids = seed_data(users, trades_per_user)
+    from app import main
+
+    serializer = main.app.session_interface.get_signing_serializer(main.app)
+    cookie_name = main.app.config["SESSION_COOKIE_NAME"]
+    mints = [mint for mint in main.TOKEN_INFO if mint != main.USDC_MINT][:10]
+    rng = random.Random(9)
+
+    cookies = []
+    for i, user_id in enumerate(user_ids):
+        if rng.random() < running_share:
+            token = mints[i % len(mints)]
+            main.bot_engine.start_bot(
+                user_id,
+                lambda generation, user_id=user_id, token=token: main.trading_algorithm(
+                    user_id, 0, 2.0, 2.0, token, 100.0, 5, "devnet", "automatic", generation=generation
+                )
+            )
+        cookies.append({cookie_name: serializer.dumps({"user_id": user_id})})
+    return main, cookies
+
+
+def login_accounts(base_url, accounts_file):
+    """Log in every email:password account in the file; returns their session cookies"""
+    cookies = []
+    with open(accounts_file) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            email, _, password = line.strip().partition(":")
+            response = requests.post(f"{base_url}/api/login", json={"email": email, "password": password})
+            if response.status_code != 200:
+                raise SystemExit(f"Login failed for {email}: {response.status_code} {response.text}")
+            cookies.append(response.cookies.get_dict())
+    if not cookies:
+        raise SystemExit(f"No accounts in {accounts_file}")
+    return cookies
+
+
+def run_load(base_url, cookies, sessions, duration, concurrency, mix=REQUEST_MIX):
+    """Drive sessions against base_url for duration seconds; returns per-route samples"""
+    dashboard_sessions = [DashboardSession(cookies[i % len(cookies)]) for i in range(sessions)]
+    started = time.monotonic()
+    end = started + duration
+    rng = random.Random(11)
+
+    # Sessions open at random moments within each route's interval so polls don't arrive in lockstep
+    schedule = []
+    for index in range(sessions):
+        for route, interval in mix:
+            schedule.append((started + rng.uniform(0, interval), index, route, interval))
+    heapq.heapify(schedule)
+    schedule_lock = threading.Condition()
+
+    samples = {route: [] for route, _ in mix}
+    statuses = {route: {} for route, _ in mix}
+    lags = []
+    # A session's requests go out one at a time, like a browser tab's
+    busy = set()
+
+    def worker():
+        http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        http.mount("http://", adapter)
+        http.mount("https://", adapter)
+        while True:
+            with schedule_lock:
+                while True:
+                    if not schedule or schedule[0][0] >= end:
+                        return
+                    due, index, route, interval = schedule[0]
+                    now = time.monotonic()
+                    if due <= now and index not in busy:
+                        heapq.heappop(schedule)
+                        busy.add(index)
+                        break
+                    schedule_lock.wait(max(0.0, min(due - now, end - now)) if due > now else 0.005)
+
+            sent = time.monotonic()
+            try:
+                status = dashboard_sessions[index].request(http, base_url, route)
+            except requests.RequestException as e:
+                status = type(e).__name__
+            elapsed = time.monotonic() - sent
+            http.cookies.clear()
+
+            with schedule_lock:
+                busy.discard(index)
+                if sent < end:
+                    samples[route].append(elapsed * 1000)
+                    statuses[route][status] = statuses[route].get(status, 0) + 1
+                    lags.append((sent - due) * 1000)
+                # Next poll on the session's own cadence, or right away if this one ran over
+                heapq.heappush(schedule, (max(due + interval, time.monotonic()), index, route, interval))
+                schedule_lock.notify_all()
+
+    threads = [threading.Thread(target=worker, name=f"load-{n}", daemon=True) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, statuses, lags, time.monotonic() - started
+
+
+def report(samples, statuses, lags, elapsed):
+    routes = {}
+    for route, latencies in samples.items():
+        codes = statuses[route]
+        errors = sum(count for code, count in codes.items() if not (isinstance(code, int) and code < 400))
+        routes[route] = {
+            "requests": len(latencies),
+            "requests_per_sec": round(len(latencies) / elapsed, 2),
+            "errors": errors,
+            "p50_ms": round(statistics.median(latencies), 3) if latencies else 0.0,
+            "p90_ms": round(percentile(latencies, 90), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "max_ms": round(max(latencies), 3) if latencies else 0.0,
+            "status_codes": {str(code): count for code, count in sorted(codes.items(), key=str)},
+        }
+    everything = [latency for latencies in samples.values() for latency in latencies]
+    return {
+        "routes": routes,
+        "total": {
+            "requests": len(everything),
+            "requests_per_sec": round(len(everything) / elapsed, 2),
+            "errors": sum(route["errors"] for route in routes.values()),
+            "p50_ms": round(statistics.median(everything), 3) if everything else 0.0,
+            "p90_ms": round(percentile(everything, 90), 3),
+            "p99_ms": round(percentile(everything, 99), 3),
+            "max_ms": round(max(everything), 3) if everything else 0.0,
+        },
+        "schedule_lag_p99_ms": round(percentile(lags, 99), 3),
+        "seconds": round(elapsed, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=200, help="concurrent dashboard sessions")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run")
+    parser.add_argument("--concurrency", type=int, default=32, help="client threads sending requests")
+    parser.add_argument("--url", help="load an already running app instead of starting one in-process")
+    parser.add_argument("--accounts", help="with --url: file of email:password lines to log in with")
+    parser.add_argument("--users", type=int, help="in-process: users to seed (default: one per session)")
+    parser.add_argument("--trades-per-user", type=int, default=200, help="in-process: seeded trades per user")
+    parser.add_argument("--running-share", type=float, default=0.5, help="in-process: share of users with a running bot")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        if not args.accounts:
+            parser.error("--url needs --accounts")
+        base_url = args.url.rstrip("/")
+        cookies = login_accounts(base_url, args.accounts)
+    else:
+        import logging
+        from werkzeug.serving import make_server
+
+        # One access log line per request would dominate the run
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+        upstream = MockUpstream().start()
+        # Bots and handlers log; keep that off the terminal and report on the real stdout
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        main, cookies = seed_app(args.users or args.sessions, args.trades_per_user, args.running_share, upstream)
+        server = make_server("127.0.0.1", 0, main.app, threaded=True)
+        threading.Thread(target=server.serve_forever, name="bench-http-server", daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        structured_log.flush(timeout=5)
+        sys.stdout = stdout
+        print(f"Seeded {len(cookies)} users; app listening on {base_url}", flush=True)
+        sys.stdout = open(os.devnull, "w")
+
+    samples, statuses, lags, elapsed = run_load(base_url, cookies, args.sessions, args.duration, args.concurrency)
+    results = report(samples, statuses, lags, elapsed)
+    if server is not None:
+        results["server_threads"] = threading.active_count() - args.concurrency
+        results["server_rss_mb"] = round(rss_mb(), 1)
+        server.shutdown()
+        # Stop the bots before giving the terminal back
+        main.bot_engine.shutdown()
+        # Bot log lines are written by a background thread; let the queued ones go to devnull too
+        structured_log.flush(timeout=5)
+        sys.stdout = stdout
+
+    print(f"{'route':<18} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for route, r in list(results["routes"].items()) + [("total", results["total"])]:
+        print(f"{route:<18} {r['requests']:>9} {r['requests_per_sec']:>8.1f} {r['errors']:>7} {r['p50_ms']:>9.2f} "
+              f"{r['p90_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['max_ms']:>9.2f}")
+    print(f"client schedule lag p99 {results['schedule_lag_p99_ms']:.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "meta": {
+                    "benchmark": "bench_http",
+                    "commit": git_commit(),
+                    "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "cpus": os.cpu_count(),
+                    "settings": {key: value for key, value in vars(args).items() if key not in ("json", "accounts")},
+                },
+                "results": results,
+            }, f, indent=2)
@@ -0,0 +1,219 @@
+"""
+Metrics instrumentation overhead benchmark
+
+Runs a mainnet bot (trading_algorithm on the bot engine, automatic trading)
+against the local mock Jupiter API and Solana RPC node with injected latency,
+so a tick is what it is in production: a Jupiter quote for the price, the
+decision, and on a ladder crossing a real quote -> swap -> sign -> send with
+the confirmation tracked in the background. Each tick's quote steps through a
+random walk so the ladder keeps trading.
+
+Runs with the /metrics instrumentation recording and with every metric's
+observe/inc replaced by a no-op are interleaved in pairs (with-without, then
+without-with, ...) so drift in the machine's load hits both alike. Reports:
+
+    tick_ms_with / tick_ms_without   mean time per tick of each
+    overhead_pct                     mean paired difference per tick, with a 95% confidence
+                                     interval (overhead_ci_pct); an interval containing 0
+                                     means the overhead is below what the runs can resolve
+    observe_ns                       cost of one histogram observation
+    render_ms                        time to render /metrics
+
+Usage:
+    python benchmarks/bench_metrics.py --ticks 300 --pairs 8 --quote-latency-ms 10 --rpc-latency-ms 10
+"""
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+import timeit
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_backtest import random_walk
+from benchmarks.bench_engine import use_in_memory_db
+from benchmarks.mock_upstream import MockUpstream
+from services import structured_log
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+# Two-sided 95% Student t quantiles by degrees of freedom; the normal 1.96 beyond the table
+T_95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
+
+def disable(metrics):
+    """Turn every metric's recording methods into no-ops; returns a function that restores them"""
+    patched = []
+    for metric in metrics._metrics:
+        for method in ("observe", "inc"):
+            if hasattr(metric, method):
+                setattr(metric, method, lambda *args, **kwargs: None)
+                patched.append((metric, method))
+
+    def restore():
+        for metric, method in patched:
+            delattr(metric, method)
+    return restore
+
+
+def confidence_interval(values):
+    """(mean, half-width of the 95% confidence interval of the mean)"""
+    mean = statistics.mean(values)
+    if len(values) < 2:
+        return mean, float("inf")
+    df = len(values) - 1
+    t = T_95[df - 1] if df <= len(T_95) else 1.96
+    return mean, t * statistics.stdev(values) / len(values) ** 0.5
+
+
+class FetchingSubscription:
+    """
+    Stand-in for a bot's PriceSubscription that fetches each tick from Jupiter itself
+    (through the app's instrumented quote call) instead of waiting for the shared feed's
+    poll interval, stops the bot after a number of ticks and times them
+    """
+
+    def __init__(self, main, trading_state, ticks):
+        self.main = main
+        self.trading_state = trading_state
+        self.remaining = ticks
+        self.started = None
+        self.elapsed = None
+
+    async def next(self, timeout=None):
+        if self.started is None:
+            # The bot has its base price; time from here
+            self.started = time.perf_counter()
+        elif self.remaining <= 0:
+            self.elapsed = time.perf_counter() - self.started
+            self.trading_state.is_running = False
+            return {"success": False, "price": 0.0, "message": "end of run"}
+        else:
+            self.remaining -= 1
+        input_mint, output_mint = self.main.price_pair(SOL_MINT)
+        return await self.main.get_jupiter_price_async(input_mint, output_mint, self.main.PRICE_QUOTE_AMOUNT)
+
+    def close(self):
+        pass
+
+
+def timed_run(main, upstream, prices, ticks):
+    """Seconds per tick of one bot run over the scripted prices"""
+    # Trades are journaled under the user id, which must be an ObjectId
+    user_id = "0" * 24
+    upstream.set_price_path(prices, step=None)
+    main.user_trading_states.pop(user_id, None)
+    trading_state = main.get_user_trading_state(user_id)
+    subscription = FetchingSubscription(main, trading_state, ticks)
+    main.price_hub.subscribe = lambda *args, **kwargs: subscription
+
+    main.bot_engine.start_bot(
+        user_id,
+        lambda generation: main.trading_algorithm(user_id, 0, 2.0, 2.0, SOL_MINT, 100.0, 10, "mainnet", "automatic",
+                                                  generation=generation)
+    )
+    # Wait for the run to end, then for the bot to exit and its last swap to settle so runs don't overlap
+    while subscription.elapsed is None:
+        time.sleep(0.01)
+    while main.bot_engine.running_count() or main.confirmation_tracker.pending_count():
+        time.sleep(0.01)
+    return subscription.elapsed / ticks
+
+
+def run(ticks, pairs, upstream_options):
+    upstream = MockUpstream(**upstream_options).start()
+    os.environ.update(upstream.environ())
+    os.environ.setdefault("JUPITER_API_KEY", "bench")
+    # Swaps confirm in the background; poll often so a run's last one settles quickly
+    os.environ.setdefault("CONFIRMATION_POLL_INTERVAL", "0.05")
+    # Keep tick files out of the project while benchmarking
+    os.environ.setdefault("TICK_RECORDING", "0")
+
+    report = sys.stdout
+    if not use_in_memory_db():
+        print("mongomock not installed - using MONGO_URI for app initialization", file=sys.stderr)
+    # Bots log as they trade; keep that off the terminal
+    sys.stdout = open(os.devnull, "w")
+    try:
+        from app import main
+        # A wallet per bot, derived from the user id instead of stored encrypted in the database
+        main.keypair_cache.load_secret = lambda user_id: bytearray(hashlib.sha256(user_id.encode()).digest())
+        upstream.token_balances = {mint: 1000000.0 for mint in list(main.TOKEN_INFO)}
+        subscribe = main.price_hub.subscribe
+        # About one ladder crossing every 30 ticks at 2% thresholds
+        prices = random_walk(ticks + 100, volatility=0.004, seed=1)
+
+        # One unmeasured run warms connections, the keypair cache and the code paths
+        timed_run(main, upstream, prices, ticks)
+        timings = {"with": [], "without": []}
+        for pair in range(pairs):
+            modes = ("with", "without") if pair % 2 == 0 else ("without", "with")
+            for mode in modes:
+                restore = disable(main.metrics) if mode == "without" else None
+                try:
+                    timings[mode].append(timed_run(main, upstream, prices, ticks))
+                finally:
+                    if restore:
+                        restore()
+        main.price_hub.subscribe = subscribe
+        swaps = upstream.stats()["transactions_sent"]
+
+        histogram = main.TICK_PHASE_SECONDS
+        number = 200000
+        observe_ns = timeit.timeit(lambda: histogram.observe(0.0004, "decision"), number=number) / number * 1e9
+        started = time.perf_counter()
+        body = main.metrics.render()
+        render_ms = (time.perf_counter() - started) * 1000
+
+        main.bot_engine.shutdown()
+        main.confirmation_tracker.shutdown()
+    finally:
+        upstream.stop()
+        # Bot log lines are written by a background thread; let the queued ones go to devnull too
+        structured_log.flush(timeout=5)
+        sys.stdout = report
+
+    differences = [(with_s - without_s) / without_s * 100 for with_s, without_s in zip(timings["with"], timings["without"])]
+    overhead_pct, half_width = confidence_interval(differences)
+    return {
+        "ticks": ticks,
+        "pairs": pairs,
+        "swaps_per_run": round(swaps / (2 * pairs + 1), 1),
+        "tick_ms_with": round(statistics.mean(timings["with"]) * 1000, 4),
+        "tick_ms_without": round(statistics.mean(timings["without"]) * 1000, 4),
+        "overhead_pct": round(overhead_pct, 3),
+        "overhead_ci_pct": [round(overhead_pct - half_width, 3), round(overhead_pct + half_width, 3)],
+        "observe_ns": round(observe_ns, 1),
+        "render_ms": round(render_ms, 3),
+        "render_lines": body.count("\n"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ticks", type=int, default=300, help="ticks per run")
+    parser.add_argument("--pairs", type=int, default=8, help="interleaved pairs of runs with and without metrics")
+    parser.add_argument("--quote-latency-ms", type=float, default=10.0, help="injected latency per quote")
+    parser.add_argument("--rpc-latency-ms", type=float, default=10.0, help="injected latency per swap and RPC call")
+    parser.add_argument("--confirm-delay", type=float, default=0.1, help="seconds until a sent transaction confirms")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    latency = {"quote": args.quote_latency_ms / 1000, "*": args.rpc_latency_ms / 1000}
+    upstream_options = {"latency": latency, "confirm_delay": args.confirm_delay, "seed": 1}
+    results = run(args.ticks, args.pairs, upstream_options)
+    low, high = results["overhead_ci_pct"]
+    print(f"{results['ticks']:,} ticks x {results['pairs']} pairs of runs, {results['swaps_per_run']} swaps per run: "
+          f"{results['tick_ms_with']:.3f} ms/tick with metrics, {results['tick_ms_without']:.3f} ms/tick without")
+    print(f"overhead {results['overhead_pct']:+.3f}% (95% CI {low:+.3f}% to {high:+.3f}%)")
+    print(f"one histogram observation {results['observe_ns']:.0f} ns")
+    print(f"/metrics renders {results['render_lines']} lines in {results['render_ms']:.2f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), **results}, f, indent=2)
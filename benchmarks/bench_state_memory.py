@@ -0,0 +1,134 @@
+"""
+Per-bot trading state memory benchmark
+
+Builds N bots' worth of trading state (default 10,000) in the old dict layout
+(buy_parts/sell_parts as lists of part indexes, transaction_history re-sliced
+on every trade) and as LadderState objects, each after enough trades to fill
+its recent history, and reports:
+
+    bytes_per_bot    traced memory of the state containers per bot (transaction
+                     records are shared between bots so only containers count)
+    ns_per_trade     time for one ladder move + history update
+    peak_kb          peak traced memory above the baseline while trading
+
+Usage:
+    python benchmarks/bench_state_memory.py --bots 10000 --parts 10 --trades 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ladder_state import LadderState
+
+
+def legacy_state(parts):
+    """A running bot's state as the loose dict user_trading_states used to hold"""
+    return {
+        "is_running": True,
+        "last_action": None,
+        "current_price": 0,
+        "dynamic_base_price": None,
+        "total_profit": 0,
+        "position": 0,
+        "avg_purchase_price": 0,
+        "parts": parts,
+        "part_size": 10.0,
+        "remaining_parts": 0,
+        "transaction_history": [],
+        "buy_parts": list(range(parts)),
+        "sell_parts": list(range(parts)),
+        "pending_trade": None,
+        "transaction_seq": 0,
+        "trading_mode": "automatic",
+        "network": "devnet",
+        "base_price": 100.0,
+    }
+
+
+def legacy_trade(state, record, buy):
+    parts = state["parts"]
+    if buy and state["buy_parts"]:
+        state["buy_parts"].pop()
+        if len(state["sell_parts"]) < parts:
+            state["sell_parts"].append(len(state["sell_parts"]))
+    elif not buy and state["sell_parts"]:
+        state["sell_parts"].pop()
+        if len(state["buy_parts"]) < parts:
+            state["buy_parts"].append(len(state["buy_parts"]))
+    state["transaction_seq"] = state.get("transaction_seq", 0) + 1
+    state["transaction_history"].append(record)
+    if len(state["transaction_history"]) > 20:
+        state["transaction_history"] = state["transaction_history"][-20:]
+
+
+def slotted_state(parts):
+    state = LadderState()
+    state.start(parts, 10.0, "automatic", "devnet")
+    state.base_price = 100.0
+    return state
+
+
+def slotted_trade(state, record, buy):
+    if buy:
+        state.use_buy_part()
+    else:
+        state.use_sell_part()
+    state.add_transaction(record)
+
+
+def measure(make_state, trade, bots, parts, trades):
+    # Records are shared between bots (add_transaction just renumbers them), so only containers are measured
+    records = [{"seq": n, "action": "buy" if n % 2 else "sell"} for n in range(trades)]
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    states = [make_state(parts) for _ in range(bots)]
+    for state in states:
+        for n in range(trades):
+            trade(state, records[n], n % 2 == 0)
+    built = tracemalloc.get_traced_memory()[0] - baseline
+
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    record = {"seq": 0, "action": "buy"}
+    started = time.perf_counter()
+    for n in range(trades):
+        for state in states:
+            trade(state, record, n % 2 == 0)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    return {
+        "bots": bots,
+        "bytes_per_bot": round(built / bots),
+        "total_mb": round(built / 1024 / 1024, 2),
+        "ns_per_trade": round(elapsed / (bots * trades) * 1e9),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bots", type=int, default=10000)
+    parser.add_argument("--parts", type=int, default=10)
+    parser.add_argument("--trades", type=int, default=50, help="trades per bot (history keeps the last 20)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = {
+        "dict": measure(legacy_state, legacy_trade, args.bots, args.parts, args.trades),
+        "slotted": measure(slotted_state, slotted_trade, args.bots, args.parts, args.trades),
+    }
+    for layout, r in results.items():
+        print(f"{layout:8s} {r['bots']:,} bots  {r['bytes_per_bot']:>6,} bytes/bot  ({r['total_mb']:.2f} MB)  "
+              f"{r['ns_per_trade']:>5} ns/trade  peak while trading {r['peak_kb']:.1f} KB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
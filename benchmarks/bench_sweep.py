@@ -0,0 +1,72 @@
+"""
+Parameter sweep scaling benchmark
+
+Runs the same sweep of ladder settings over a year of 5-second ticks with 1, 2,
+4... worker processes (up to the CPU count) and reports settings per second and
+speedup over one worker. The series is shared with workers through shared
+memory, so the per-task cost is only the settings chunk and the result rows.
+
+Usage:
+    python benchmarks/bench_sweep.py --settings 400 --ticks 6307200
+    python benchmarks/bench_sweep.py --workers 1,2,4,8 --json results.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_backtest import YEAR_OF_5S_TICKS, random_walk
+from services.parameter_sweep import run_sweep, sample_parameters
+
+
+def worker_levels(cpus):
+    levels, workers = [], 1
+    while workers < cpus:
+        levels.append(workers)
+        workers *= 2
+    return levels + [cpus]
+
+
+def run(settings, ticks, levels):
+    prices = random_walk(ticks)
+    params = sample_parameters({"min": 0.2, "max": 5}, {"min": 0.2, "max": 5}, {"min": 1, "max": 20}, settings, seed=1)
+    results = []
+    baseline = None
+    for workers in levels:
+        started = time.perf_counter()
+        rows = run_sweep(prices, params, 100.0, workers=workers)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        result = {
+            "workers": workers,
+            "settings": len(params),
+            "ticks": ticks,
+            "seconds": round(elapsed, 3),
+            "settings_per_sec": round(len(params) / elapsed, 1),
+            "speedup": round(baseline / elapsed, 2),
+            "best": {key: rows[0][key] for key in ("up_percentage", "down_percentage", "parts", "total_profit")},
+        }
+        results.append(result)
+        print(f"workers={workers:>3}  {result['seconds']:>8.3f}s  {result['settings_per_sec']:>8.1f} settings/s  "
+              f"speedup x{result['speedup']:.2f}", flush=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--settings", type=int, default=400, help="random ladder settings per sweep")
+    parser.add_argument("--ticks", type=int, default=YEAR_OF_5S_TICKS, help="prices in the series")
+    parser.add_argument("--workers", help="comma-separated worker counts (default 1, 2, 4... up to the CPU count)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.workers.split(",")] if args.workers else worker_levels(os.cpu_count() or 1)
+    results = run(args.settings, args.ticks, levels)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,278 @@
+"""
+End-to-end bot throughput benchmark
+
+Runs increasing numbers of ladder bots (trading_algorithm on the bot engine,
+mainnet mode, automatic trading) against the local mock Jupiter API and Solana
+RPC node, so every trade goes through the real quote -> swap -> sign -> send ->
+confirm path. Each bot gets its own wallet. Per level it reports:
+
+    ticks_per_sec            price ticks handled by bots per second
+    tick_p50_ms/tick_p99_ms  from the feed fetching a price to the bot being done with it
+    delivery_p50/p99_ms      from the feed fetching a price to the bot waking up with it
+    decision_to_submit_*     from the trade decision to sendTransaction (execute_swap)
+    swaps_submitted          trades sent in the window
+    upstream_calls_per_tick  mock upstream requests (quotes, swaps, RPC) per handled tick
+    rss_mb, threads          process memory and live Python threads
+
+Results are written as JSON (--json) together with the git commit, Python version
+and settings of the run; pass an earlier file as --compare to print the change of
+each metric per level.
+
+Usage:
+    python benchmarks/bench_throughput.py --levels 10,100,1000,10000 --duration 20 --json run.json
+    python benchmarks/bench_throughput.py --levels 10,100,1000 --json new.json --compare run.json
+
+Importing app.main initializes the database; if mongomock is installed it is
+used as an in-memory backend, otherwise MONGO_URI must point at a live server.
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_engine import percentile, rss_mb, use_in_memory_db
+from benchmarks.mock_upstream import MockUpstream
+from services import structured_log
+
+# Metrics shown by --compare; lower is better for those ending in LOWER_IS_BETTER
+COMPARED_METRICS = (
+    "ticks_per_sec", "tick_p50_ms", "tick_p99_ms", "delivery_p50_ms", "delivery_p99_ms",
+    "decision_to_submit_p50_ms", "decision_to_submit_p99_ms", "upstream_calls_per_tick", "rss_mb", "threads",
+)
+LOWER_IS_BETTER = ("_ms", "rss_mb", "threads", "upstream_calls_per_tick")
+
+
+class TimedSubscription:
+    """Wraps a bot's PriceSubscription to time how long each tick takes to reach and leave the bot"""
+
+    def __init__(self, subscription, samples):
+        self.subscription = subscription
+        self.samples = samples
+        self.tick = None
+
+    async def next(self, timeout=None):
+        # Coming back for the next tick means the bot is done with the previous one
+        if self.tick is not None:
+            self.samples["tick"].append((time.monotonic() - self.tick["fetched_at"]) * 1000)
+        tick = await self.subscription.next(timeout)
+        self.tick = tick if tick is not None and "fetched_at" in tick else None
+        if self.tick is not None:
+            self.samples["delivery"].append((time.monotonic() - self.tick["fetched_at"]) * 1000)
+        return tick
+
+    def close(self):
+        self.subscription.close()
+
+
+def new_samples():
+    return {"tick": [], "delivery": [], "decision_to_submit": [], "swap_errors": 0}
+
+
+def git_commit():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+    return f"{commit}-dirty" if commit and dirty else commit or None
+
+
+def summarize(values, name):
+    return {
+        f"{name}_p50_ms": round(statistics.median(values), 3) if values else 0.0,
+        f"{name}_p99_ms": round(percentile(values, 99), 3),
+    }
+
+
+def run(levels, pairs, duration, interval, up_percentage, down_percentage, upstream_options):
+    # Swings of +-6% every 30s cross 2% ladder thresholds several times per window
+    upstream = MockUpstream(**upstream_options).start()
+    os.environ.update(upstream.environ())
+    os.environ.setdefault("JUPITER_API_KEY", "bench")
+    os.environ["PRICE_POLL_INTERVAL"] = str(interval)
+    # Keep tick files out of the project while benchmarking
+    os.environ.setdefault("TICK_RECORDING", "0")
+
+    if not use_in_memory_db():
+        print("mongomock not installed - using MONGO_URI for app initialization", file=sys.stderr)
+
+    # Bots log as they trade; keep that off the terminal and report on the real stdout
+    report = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    from app import main
+
+    mints = [mint for mint in main.TOKEN_INFO if mint != main.USDC_MINT][:pairs]
+    # Every wallet holds plenty of every token so balance pre-checks pass
+    upstream.token_balances = {mint: 1000000.0 for mint in list(main.TOKEN_INFO)}
+    # A wallet per bot, derived from the user id instead of stored encrypted in the database
+    main.keypair_cache.load_secret = lambda user_id: bytearray(hashlib.sha256(user_id.encode()).digest())
+
+    samples = new_samples()
+    subscribe = main.price_hub.subscribe
+    main.price_hub.subscribe = lambda *args, **kwargs: TimedSubscription(subscribe(*args, **kwargs), samples)
+
+    execute_swap = main.execute_swap
+
+    def timed_execute_swap(*args, **kwargs):
+        result = execute_swap(*args, **kwargs)
+        if result.get("decision_to_submit_ms") is not None:
+            samples["decision_to_submit"].append(result["decision_to_submit_ms"])
+        else:
+            samples["swap_errors"] += 1
+        return result
+
+    main.execute_swap = timed_execute_swap
+
+    results = []
+    started = 0
+    for level in levels:
+        for i in range(started, level):
+            # Trades are journaled under the user id, which must be an ObjectId
+            user_id = f"{i:024x}"
+            token = mints[i % len(mints)]
+            main.bot_engine.start_bot(
+                user_id,
+                lambda generation, user_id=user_id, token=token: main.trading_algorithm(
+                    user_id, 0, up_percentage, down_percentage, token, 100.0, 5, "mainnet", "automatic", generation=generation
+                )
+            )
+        started = level
+
+        # Let every bot receive its first tick before measuring
+        time.sleep(interval * 2)
+
+        # Swap in fresh sample lists; the loop thread appends to whichever is current
+        for key in ("tick", "delivery", "decision_to_submit"):
+            samples[key] = []
+        samples["swap_errors"] = 0
+        upstream_before = upstream.stats()
+        window_start = time.monotonic()
+        time.sleep(duration)
+        elapsed = time.monotonic() - window_start
+        upstream_after = upstream.stats()
+        ticks, deliveries = list(samples["tick"]), list(samples["delivery"])
+        decisions = list(samples["decision_to_submit"])
+
+        calls = {route: count - upstream_before["calls"].get(route, 0) for route, count in upstream_after["calls"].items()}
+        calls = {route: count for route, count in calls.items() if count}
+        total_calls = sum(calls.values())
+
+        result = {
+            "bots": level,
+            "live_tasks": main.bot_engine.running_count(),
+            "threads": threading.active_count(),
+            "rss_mb": round(rss_mb(), 1),
+            "ticks_per_sec": round(len(ticks) / elapsed, 1),
+            "expected_ticks_per_sec": round(level / interval, 1),
+            **summarize(ticks, "tick"),
+            **summarize(deliveries, "delivery"),
+            **summarize(decisions, "decision_to_submit"),
+            "swaps_submitted": len(decisions),
+            "swap_errors": samples["swap_errors"],
+            "upstream_calls_per_tick": round(total_calls / len(ticks), 4) if ticks else 0.0,
+            "upstream_calls_per_sec": round(total_calls / elapsed, 1),
+            "upstream_calls": calls,
+        }
+        results.append(result)
+        print(
+            f"bots={result['bots']:>6} threads={result['threads']:>3} rss={result['rss_mb']:>8.1f}MB "
+            f"ticks/s={result['ticks_per_sec']:>8.1f} (expected {result['expected_ticks_per_sec']:.1f}) "
+            f"tick p50={result['tick_p50_ms']:.2f}ms p99={result['tick_p99_ms']:.2f}ms "
+            f"decision->submit p50={result['decision_to_submit_p50_ms']:.2f}ms p99={result['decision_to_submit_p99_ms']:.2f}ms "
+            f"swaps={result['swaps_submitted']} upstream/tick={result['upstream_calls_per_tick']:.3f}",
+            file=report, flush=True
+        )
+
+    for user_id in list(main.user_trading_states):
+        main.user_trading_states[user_id].is_running = False
+    # Let bots exit and pending swaps settle before the upstream goes away
+    deadline = time.monotonic() + interval * 2 + upstream.confirm_delay + 5
+    while (main.bot_engine.running_count() or main.confirmation_tracker.pending_count()) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    # Anything still running is cut off here, so nothing writes to the restored stdout
+    main.bot_engine.shutdown()
+    main.confirmation_tracker.shutdown()
+    main.price_hub.subscribe = subscribe
+    main.execute_swap = execute_swap
+    upstream.stop()
+    # Bot log lines are written by a background thread; let the queued ones go to devnull too
+    structured_log.flush(timeout=5)
+    sys.stdout = report
+    return results
+
+
+def compare(results, baseline):
+    """Print each numeric metric's change against a previous run, level by level"""
+    previous = {level["bots"]: level for level in baseline["levels"]}
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('started_at')}):")
+    for level in results:
+        before = previous.get(level["bots"])
+        if before is None:
+            continue
+        changes = []
+        for metric in COMPARED_METRICS:
+            value, old = level.get(metric), before.get(metric)
+            if value is None or not old:
+                continue
+            change = (value - old) / old * 100
+            better = change < 0 if metric.endswith(LOWER_IS_BETTER) else change > 0
+            # Flag moves beyond run-to-run noise: + better, - worse
+            marker = (" " if abs(change) < 5 else "+" if better else "-")
+            changes.append(f"{marker} {metric} {old:g} -> {value:g} ({change:+.1f}%)")
+        print(f"bots={level['bots']}")
+        for change in changes:
+            print(f"    {change}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--levels", default="10,100,1000,10000", help="comma-separated bot counts")
+    parser.add_argument("--pairs", type=int, default=10, help="distinct trading pairs")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds measured per level")
+    parser.add_argument("--interval", type=float, default=1.0, help="price poll interval in seconds")
+    parser.add_argument("--up", type=float, default=2.0, help="ladder up percentage")
+    parser.add_argument("--down", type=float, default=2.0, help="ladder down percentage")
+    parser.add_argument("--quote-latency-ms", type=float, default=0.0, help="injected latency per quote")
+    parser.add_argument("--rpc-latency-ms", type=float, default=0.0, help="injected latency per swap and RPC call")
+    parser.add_argument("--confirm-delay", type=float, default=0.4, help="seconds until a sent transaction confirms")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="an earlier --json file to compare against")
+    args = parser.parse_args()
+
+    latency = {}
+    if args.quote_latency_ms:
+        latency["quote"] = args.quote_latency_ms / 1000
+    if args.rpc_latency_ms:
+        latency["*"] = args.rpc_latency_ms / 1000
+    upstream_options = {"latency": latency, "confirm_delay": args.confirm_delay, "seed": 1}
+
+    meta = {
+        "benchmark": "bench_throughput",
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("json", "compare")},
+    }
+    levels = [int(level) for level in args.levels.split(",")]
+    results = run(levels, args.pairs, args.duration, args.interval, args.up, args.down, upstream_options)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": meta, "levels": results}, f, indent=2)
@@ -0,0 +1,110 @@
+"""
+Tick recorder benchmark
+
+Records N synthetic 5-second ticks for one pair through TickRecorder (spread
+over as many daily segments as they cover), then compares reading them back:
+
+    memmap   TickStore.read of one day (a zero-copy view) and of the whole range
+    json     the same ticks stored as one JSON object per line and parsed back
+
+Reports write throughput, bytes per tick and read time for each.
+
+Usage:
+    python benchmarks/bench_ticks.py --ticks 6307200
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.tick_recorder import TICK_DTYPE, TickRecorder, TickStore
+
+INPUT_MINT = "So11111111111111111111111111111111111111112"
+OUTPUT_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+AMOUNT = 1000000000
+FIRST_TICK = 1735689600.0  # 2025-01-01 00:00 UTC
+
+
+def run(ticks, batch=100000):
+    directory = tempfile.mkdtemp(prefix="bench_ticks_")
+    try:
+        rng = np.random.default_rng(5)
+        prices = 150.0 * np.exp(np.cumsum(rng.normal(0, 0.0003, ticks)))
+        timestamps = FIRST_TICK + 5.0 * np.arange(ticks)
+
+        recorder = TickRecorder(directory, flush_interval=3600)
+        started = time.perf_counter()
+        for start in range(0, ticks, batch):
+            for timestamp, price in zip(timestamps[start:start + batch].tolist(), prices[start:start + batch].tolist()):
+                recorder.record(INPUT_MINT, OUTPUT_MINT, AMOUNT, {"price": price, "quote_data": {
+                    "inAmount": AMOUNT, "outAmount": int(price * 1e6)}}, timestamp=timestamp)
+            recorder.flush()
+        recorder.close()
+        write_seconds = time.perf_counter() - started
+
+        bytes_on_disk = sum(os.path.getsize(os.path.join(root, name))
+                            for root, _, names in os.walk(directory) for name in names if name.endswith(".ticks"))
+
+        store = TickStore(directory)
+        started = time.perf_counter()
+        day = store.read(INPUT_MINT, OUTPUT_MINT, AMOUNT, FIRST_TICK, FIRST_TICK + 86400)
+        day_mean = float(day['price'].mean())
+        day_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        everything = store.read(INPUT_MINT, OUTPUT_MINT, AMOUNT)
+        all_mean = float(everything['price'].mean())
+        all_seconds = time.perf_counter() - started
+        assert len(everything) == ticks and np.array_equal(everything['price'], prices)
+
+        json_path = os.path.join(directory, "ticks.jsonl")
+        with open(json_path, "w") as f:
+            for timestamp, price in zip(timestamps.tolist(), prices.tolist()):
+                f.write(json.dumps({"timestamp": timestamp, "pair": 0, "price": price,
+                                    "in_amount": AMOUNT, "out_amount": int(price * 1e6)}) + "\n")
+        started = time.perf_counter()
+        with open(json_path) as f:
+            parsed = np.array([json.loads(line)["price"] for line in f])
+        json_mean = float(parsed.mean())
+        json_seconds = time.perf_counter() - started
+
+        return {
+            "ticks": ticks,
+            "segments": len(os.listdir(os.path.join(directory, "0"))),
+            "write_ticks_per_sec": round(ticks / write_seconds),
+            "bytes_per_tick": round(bytes_on_disk / ticks, 1),
+            "json_bytes_per_tick": round(os.path.getsize(json_path) / ticks, 1),
+            "memmap_one_day_ms": round(day_seconds * 1000, 3),
+            "memmap_all_ms": round(all_seconds * 1000, 3),
+            "json_all_ms": round(json_seconds * 1000, 3),
+            "check": [round(day_mean, 6), round(all_mean, 6), round(json_mean, 6)],
+            "record_size": TICK_DTYPE.itemsize,
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ticks", type=int, default=365 * 24 * 60 * 12, help="5-second ticks to record")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.ticks)
+    print(f"{results['ticks']:,} ticks in {results['segments']} daily segments, "
+          f"written at {results['write_ticks_per_sec']:,}/s, {results['bytes_per_tick']} bytes/tick "
+          f"(JSON lines: {results['json_bytes_per_tick']})")
+    print(f"read one day (memmap view) {results['memmap_one_day_ms']:.3f} ms, "
+          f"all ticks (memmap) {results['memmap_all_ms']:.3f} ms, all ticks (JSON) {results['json_all_ms']:.3f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,197 @@
+"""
+Trade history query benchmark
+
+Loads N synthetic trades (default 10M) into two collections of a scratch
+database and runs the same per-user, per-day history lookups against both:
+
+    legacy   string timestamps, no index on trades, full documents hydrated
+             into Trade objects (the old Trade.find_by_user_and_date)
+    indexed  BSON datetimes, (user_id, timestamp) index, projected rows
+             (Trade.find_history_by_user_and_date)
+
+Reports latency percentiles and, from explain(), the keys and documents each
+query examines. Needs a real MongoDB: set MONGO_URI (the benchmark uses its own
+database, bench_trade_history, and never touches the app's data).
+
+Usage:
+    python benchmarks/bench_trade_history.py --trades 10000000 --users 1000 --days 365
+    python benchmarks/bench_trade_history.py --reuse --queries 200   # keep loaded data
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient
+
+import database
+from models.trade import Trade, TIMESTAMP_FORMAT
+
+BENCH_DB = "bench_trade_history"
+FIRST_DAY = datetime(2025, 1, 1)
+
+
+def connect():
+    mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/trading_bot')
+    client = MongoClient(mongo_uri)
+    client.admin.command('ping')
+    return client[BENCH_DB]
+
+
+def load(db, trades, users, days, batch_size=10000, seed=7):
+    """Fill trades_legacy (string timestamps) and trades (datetimes + index) with the same trades"""
+    rng = random.Random(seed)
+    user_ids = [ObjectId() for _ in range(users)]
+    db.trades_legacy.drop()
+    db.trades.drop()
+    db.trades.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
+
+    started = time.perf_counter()
+    legacy_batch, indexed_batch = [], []
+    for n in range(trades):
+        timestamp = FIRST_DAY + timedelta(seconds=rng.randrange(days * 86400))
+        action = "buy" if rng.random() < 0.5 else "sell"
+        document = {
+            "user_id": user_ids[n % users],
+            "action": action,
+            "token_mint": "So11111111111111111111111111111111111111112",
+            "token_symbol": "SOL",
+            "price": round(rng.uniform(100, 200), 6),
+            "amount": round(rng.uniform(1, 50), 6),
+            "pnl": round(rng.uniform(-1, 1), 6) if action == "sell" else None,
+            "network": "mainnet",
+            "status": "completed",
+        }
+        legacy_batch.append(dict(document, timestamp=timestamp.strftime(TIMESTAMP_FORMAT)))
+        indexed_batch.append(dict(document, timestamp=timestamp))
+
+        if len(indexed_batch) >= batch_size:
+            db.trades_legacy.insert_many(legacy_batch, ordered=False)
+            db.trades.insert_many(indexed_batch, ordered=False)
+            legacy_batch, indexed_batch = [], []
+            if (n + 1) % (batch_size * 100) == 0:
+                print(f"  loaded {n + 1:,} trades ({time.perf_counter() - started:.0f}s)", file=sys.stderr)
+
+    if indexed_batch:
+        db.trades_legacy.insert_many(legacy_batch, ordered=False)
+        db.trades.insert_many(indexed_batch, ordered=False)
+    return time.perf_counter() - started
+
+
+def legacy_history(db, user_id, date_str):
+    """The pre-index query: string range, no projection, every document hydrated"""
+    cursor = db.trades_legacy.find({
+        "user_id": user_id,
+        "timestamp": {"$gte": f"{date_str} 00:00:00", "$lte": f"{date_str} 23:59:59"}
+    }).sort("timestamp", -1)
+    trades = [Trade(_id=data['_id'], user_id=str(data['user_id']), timestamp=data['timestamp'], action=data['action'],
+                    token_mint=data.get('token_mint'), token_symbol=data.get('token_symbol'), price=data.get('price'),
+                    amount=data.get('amount'), pnl=data.get('pnl'), network=data.get('network', 'mainnet'),
+                    status=data.get('status', 'completed')) for data in cursor]
+    return [{"timestamp": t.timestamp, "action": t.action, "token_symbol": t.token_symbol, "price": t.price,
+             "amount": t.amount, "pnl": t.pnl, "status": t.status} for t in trades]
+
+
+def explain(collection, query, projection=None):
+    try:
+        stats = collection.find(query, projection).sort("timestamp", -1).explain()["executionStats"]
+        return {"keys_examined": stats["totalKeysExamined"], "docs_examined": stats["totalDocsExamined"],
+                "returned": stats["nReturned"]}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(latencies, rows):
+    return {
+        "queries": len(latencies),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "avg_rows": round(rows / len(latencies), 1),
+    }
+
+
+def run(trades, users, days, queries, reuse, skip_legacy):
+    db = connect()
+    # Models read from get_db(); point them at the scratch database
+    database._db = db
+
+    load_seconds = None
+    if not reuse or db.trades.estimated_document_count() == 0:
+        print(f"Loading {trades:,} trades for {users:,} users over {days} days...", file=sys.stderr)
+        load_seconds = round(load(db, trades, users, days), 1)
+
+    user_ids = db.trades.distinct("user_id") if users <= 10000 else [doc["user_id"] for doc in db.trades.find({}, {"user_id": 1}).limit(10000)]
+    rng = random.Random(11)
+    lookups = [(rng.choice(user_ids), (FIRST_DAY + timedelta(days=rng.randrange(days))).strftime("%Y-%m-%d"))
+               for _ in range(queries)]
+
+    results = {"trades": db.trades.estimated_document_count(), "users": len(user_ids), "load_seconds": load_seconds}
+
+    latencies, rows = [], 0
+    for user_id, date_str in lookups:
+        started = time.perf_counter()
+        rows += len(Trade.find_history_by_user_and_date(user_id, date_str))
+        latencies.append(time.perf_counter() - started)
+    results["indexed"] = summarize(latencies, rows)
+    start, end = Trade.day_range(lookups[0][1])
+    results["indexed"]["explain"] = explain(db.trades, {"user_id": lookups[0][0], "timestamp": {"$gte": start, "$lt": end}},
+                                            {"_id": 0, "timestamp": 1, "action": 1, "token_symbol": 1, "price": 1,
+                                             "amount": 1, "pnl": 1, "status": 1})
+
+    if not skip_legacy:
+        # Each legacy lookup scans the whole collection, so run fewer of them
+        legacy_lookups = lookups[:max(1, min(queries, 20))]
+        latencies, rows = [], 0
+        for user_id, date_str in legacy_lookups:
+            started = time.perf_counter()
+            rows += len(legacy_history(db, user_id, date_str))
+            latencies.append(time.perf_counter() - started)
+        results["legacy"] = summarize(latencies, rows)
+        date_str = legacy_lookups[0][1]
+        results["legacy"]["explain"] = explain(db.trades_legacy, {
+            "user_id": legacy_lookups[0][0],
+            "timestamp": {"$gte": f"{date_str} 00:00:00", "$lte": f"{date_str} 23:59:59"}
+        })
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark trade history queries at scale")
+    parser.add_argument("--trades", type=int, default=10000000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--reuse", action="store_true", help="Reuse trades loaded by a previous run")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the indexed layout")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.trades, args.users, args.days, args.queries, args.reuse, args.skip_legacy)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['trades']:,} trades, {results['users']:,} users")
+    for layout in ("legacy", "indexed"):
+        if layout in results:
+            r = results[layout]
+            print(f"{layout:8s} p50 {r['p50_ms']:>10.3f} ms  p99 {r['p99_ms']:>10.3f} ms  rows/query {r['avg_rows']:>6}  {r['explain']}")
+
+
+if __name__ == "__main__":
+    main()
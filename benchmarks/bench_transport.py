@@ -0,0 +1,156 @@
+"""
+HTTP transport benchmark
+
+Compares a fresh connection per call (module-level requests.get / a new
+httpx.AsyncClient) with the pooled keep-alive transport in
+services.http_transport, against a local HTTPS mock of the Jupiter quote API
+running in a separate process. Reports latency percentiles and client CPU time
+per call, i.e. what one price tick costs in each mode.
+
+Usage:
+    python benchmarks/bench_transport.py --calls 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import requests
+
+from benchmarks.mock_upstream import generate_self_signed_cert
+from services.http_transport import HttpTransport
+
+QUOTE_PARAMS = {
+    "inputMint": "So11111111111111111111111111111111111111112",
+    "outputMint": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",
+    "amount": "1000000000",
+    "swapMode": "ExactIn",
+    "slippageBps": 50,
+}
+
+
+def start_mock(certfile, keyfile, port):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_upstream", "--port", str(port), "--certfile", certfile, "--keyfile", keyfile],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = process.stdout.readline()
+    if "listening" not in line:
+        process.kill()
+        raise RuntimeError(f"Mock upstream failed to start: {line!r}")
+    return process
+
+
+def summarize(name, latencies, cpu_seconds):
+    ordered = sorted(latencies)
+    return {
+        "mode": name,
+        "calls": len(latencies),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+        "cpu_ms_per_call": round(cpu_seconds / len(latencies) * 1000, 3),
+    }
+
+
+def bench_sync(name, do_get, calls):
+    latencies = []
+    cpu_start = time.process_time()
+    for _ in range(calls):
+        started = time.perf_counter()
+        response = do_get()
+        response.json()
+        latencies.append(time.perf_counter() - started)
+    return summarize(name, latencies, time.process_time() - cpu_start)
+
+
+def bench_async(name, make_client, close_each, calls, url):
+    async def run():
+        latencies = []
+        cpu_start = time.process_time()
+        for _ in range(calls):
+            started = time.perf_counter()
+            client = make_client()
+            response = await client.get(url, params=QUOTE_PARAMS)
+            response.json()
+            if close_each:
+                await client.aclose()
+            latencies.append(time.perf_counter() - started)
+        return summarize(name, latencies, time.process_time() - cpu_start)
+
+    return asyncio.run(run())
+
+
+def run(calls, port):
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = generate_self_signed_cert(directory)
+        process = start_mock(certfile, keyfile, port)
+        url = f"https://127.0.0.1:{port}/swap/v1/quote"
+        try:
+            transport = HttpTransport(verify=certfile)
+            # Warm both sides up once so the pooled run starts from an open connection like a running bot
+            transport.get(url, params=QUOTE_PARAMS).json()
+
+            results = [
+                bench_sync(
+                    "requests.get (new connection per call)",
+                    lambda: requests.get(url, params=QUOTE_PARAMS, verify=certfile, timeout=15),
+                    calls,
+                ),
+                bench_sync(
+                    "http_transport.session (pooled keep-alive)",
+                    lambda: transport.get(url, params=QUOTE_PARAMS),
+                    calls,
+                ),
+                bench_async(
+                    "httpx.AsyncClient per call",
+                    lambda: httpx.AsyncClient(verify=certfile),
+                    True,
+                    calls,
+                    url,
+                ),
+            ]
+
+            pooled = HttpTransport(verify=certfile)
+            results.append(bench_async(
+                "http_transport.async_client (pooled keep-alive)",
+                pooled.async_client,
+                False,
+                calls,
+                url,
+            ))
+        finally:
+            process.terminate()
+            process.wait()
+
+    for result in results:
+        print(
+            f"{result['mode']:<50} mean={result['mean_ms']:>8.3f}ms p50={result['p50_ms']:>8.3f}ms "
+            f"p99={result['p99_ms']:>8.3f}ms cpu/call={result['cpu_ms_per_call']:>7.3f}ms"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=500, help="quote calls per mode")
+    parser.add_argument("--port", type=int, default=8943, help="port for the mock HTTPS upstream")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.calls, args.port)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
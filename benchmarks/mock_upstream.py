@@ -0,0 +1,527 @@
+"""
+Local stand-in for the Jupiter API and a Solana RPC node, for benchmarks and load tests
+
+Serves everything the app calls upstream, so trading_algorithm, execute_swap and
+the wallet balance endpoints can run at full speed without spending API quota
+or real funds:
+
+    GET  /swap/v1/quote   Jupiter quote at the scripted price of the pair
+    POST /swap/v1/swap    an unsigned v0 transaction for userPublicKey to sign
+    POST / (JSON-RPC, single or batch)
+         getTokenAccountsByOwner, getBalance, sendTransaction,
+         getSignatureStatuses, getLatestBlockhash, getAccountInfo
+
+Sent transactions confirm confirm_delay seconds after sendTransaction (a
+tx_failure_rate share of them fail on chain instead).
+
+Prices follow a slow sine wave per pair unless a price path is scripted: a list
+of prices stepped every path_step seconds (or on every quote when path_step is
+None), for all pairs or per pair. Latency (seconds, or [low, high] for uniform
+jitter) and error rates can be set per route: "quote", "swap", an RPC method
+name, or "*" for everything else. Injected errors are HTTP 500s for Jupiter
+routes and JSON-RPC errors for RPC methods.
+
+All of this can be changed while running via configure()/set_price_path(), or
+over HTTP for a mock in another process:
+
+    POST /_mock/config   {"latency": {...}, "error_rates": {...}, "price_path": [...],
+                          "path_step": 1.0, "confirm_delay": 0.4, "tx_failure_rate": 0.0}
+    GET  /_mock/stats    calls, injected errors and sent transactions per route
+
+Can serve HTTPS with a throwaway self-signed certificate to measure TLS handshake cost.
+"""
+import argparse
+import base64
+import datetime
+import ipaddress
+import json
+import math
+import os
+import random
+import ssl
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+SYSTEM_PROGRAM_ID = "11111111111111111111111111111111"
+# Wall-clock slot time on mainnet
+SLOT_SECONDS = 0.4
+
+
+class MockUpstream:
+    def __init__(self, host="127.0.0.1", port=0, base_price=150.0, amplitude=0.06, period=30.0, certfile=None, keyfile=None,
+                 latency=None, error_rates=None, price_path=None, path_step=1.0, confirm_delay=0.4, tx_failure_rate=0.0,
+                 token_balances=None, sol_lamports=2000000000, seed=None):
+        self.base_price = base_price
+        self.amplitude = amplitude
+        self.period = period
+        self.started_at = time.monotonic()
+        self.calls = {}
+        self.route_calls = {}
+        self.injected_errors = {}
+        self.latency = {}
+        self.error_rates = {}
+        self.confirm_delay = confirm_delay
+        self.tx_failure_rate = tx_failure_rate
+        # mint -> UI amount held by every wallet that asks
+        self.token_balances = dict(token_balances or {"EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v": 1000.0})
+        self.sol_lamports = sol_lamports
+        self._paths = {}           # pair key ("input:output", or None for every pair) -> (prices, step, started_at)
+        self._path_positions = {}  # pair key -> next index when stepping per quote
+        self._transactions = {}    # signature -> (sent_at, failed)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.configure(latency=latency, error_rates=error_rates)
+        if price_path is not None:
+            self.set_price_path(price_path, step=path_step)
+
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; don't let Nagle delay the body
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                upstream._handle_get(self)
+
+            def do_POST(self):
+                upstream._handle_post(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.tls = certfile is not None
+        if self.tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            # Handshake lazily in the handler thread rather than in the accept loop
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True, do_handshake_on_connect=False)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://{host}:{port}"
+
+    def environ(self):
+        """Environment variables that point the app at this mock"""
+        return {
+            "JUPITER_QUOTE_API": f"{self.url}/swap/v1/quote",
+            "JUPITER_SWAP_API": f"{self.url}/swap/v1/swap",
+            "SOLANA_RPC_URL_MAINNET": self.url,
+            "SOLANA_RPC_URL_DEVNET": self.url,
+            "SOLANA_RPC_URL_TESTNET": self.url,
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-upstream")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def configure(self, latency=None, error_rates=None, confirm_delay=None, tx_failure_rate=None):
+        """Change injected latency/error rates (merged per route) or confirmation behaviour"""
+        with self._lock:
+            if latency:
+                self.latency.update(latency)
+            if error_rates:
+                self.error_rates.update(error_rates)
+            if confirm_delay is not None:
+                self.confirm_delay = confirm_delay
+            if tx_failure_rate is not None:
+                self.tx_failure_rate = tx_failure_rate
+
+    def set_price_path(self, prices, step=1.0, input_mint=None, output_mint=None):
+        """
+        Script prices: each quote returns prices[n] with n = seconds since now / step, or the
+        quote count when step is None; the last price holds once the path runs out. With
+        no mints the path applies to every pair without a path of its own.
+        """
+        key = f"{input_mint}:{output_mint}" if input_mint else None
+        with self._lock:
+            self._paths[key] = ([float(price) for price in prices], step, time.monotonic())
+            self._path_positions[key] = 0
+
+    def call_count(self, path=None):
+        with self._lock:
+            if path is None:
+                return sum(self.calls.values())
+            return self.calls.get(path, 0)
+
+    def stats(self):
+        """Calls and injected errors per route, and sent/confirmed/failed transactions"""
+        now = time.monotonic()
+        with self._lock:
+            confirmed = sum(1 for sent_at, failed in self._transactions.values()
+                            if not failed and now - sent_at >= self.confirm_delay)
+            return {
+                "calls": dict(self.route_calls),
+                "injected_errors": dict(self.injected_errors),
+                "transactions_sent": len(self._transactions),
+                "transactions_confirmed": confirmed,
+                "transactions_failed": sum(1 for _, failed in self._transactions.values() if failed),
+            }
+
+    def price_for(self, input_mint, output_mint):
+        pair = f"{input_mint}:{output_mint}"
+        with self._lock:
+            key = pair if pair in self._paths else None if None in self._paths else False
+            if key is not False:
+                prices, step, started_at = self._paths[key]
+                if step is None:
+                    index = self._path_positions[key]
+                    self._path_positions[key] = index + 1
+                else:
+                    index = int((time.monotonic() - started_at) / step)
+                return prices[min(index, len(prices) - 1)]
+
+        # Each pair gets its own phase so pairs don't move in lockstep
+        phase = (zlib.crc32(pair.encode()) % 1000) / 1000 * 2 * math.pi
+        elapsed = time.monotonic() - self.started_at
+        return self.base_price * (1 + self.amplitude * math.sin(2 * math.pi * elapsed / self.period + phase))
+
+    def slot(self):
+        return 250000000 + int((time.monotonic() - self.started_at) / SLOT_SECONDS)
+
+    def _count(self, path, route):
+        with self._lock:
+            self.calls[path] = self.calls.get(path, 0) + 1
+            self.route_calls[route] = self.route_calls.get(route, 0) + 1
+
+    def _route_setting(self, settings, route):
+        return settings.get(route, settings.get("*"))
+
+    def _delay(self, routes):
+        """Sleep for the largest latency configured for any of routes"""
+        delays = []
+        with self._lock:
+            for route in routes:
+                latency = self._route_setting(self.latency, route)
+                if isinstance(latency, (list, tuple)):
+                    latency = self._random.uniform(latency[0], latency[1])
+                if latency:
+                    delays.append(latency)
+        if delays:
+            time.sleep(max(delays))
+
+    def _inject_error(self, route):
+        with self._lock:
+            rate = self._route_setting(self.error_rates, route)
+            if rate and self._random.random() < rate:
+                self.injected_errors[route] = self.injected_errors.get(route, 0) + 1
+                return True
+        return False
+
+    def _handle_get(self, handler):
+        parsed = urlparse(handler.path)
+
+        if parsed.path == "/_mock/stats":
+            self._send_json(handler, 200, self.stats())
+        elif parsed.path.endswith("/quote"):
+            self._count(parsed.path, "quote")
+            self._delay(["quote"])
+            if self._inject_error("quote"):
+                self._send_json(handler, 500, {"error": "Injected quote error"})
+                return
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            in_amount = int(params.get("amount", "1000000000"))
+            price = self.price_for(params.get("inputMint"), params.get("outputMint"))
+            # Inverse of the price formula in parse_jupiter_quote_response (9 -> 6 decimals)
+            out_amount = int(price * in_amount / 10**3)
+            slippage_bps = int(params.get("slippageBps", 50))
+            self._send_json(handler, 200, {
+                "inputMint": params.get("inputMint"),
+                "outputMint": params.get("outputMint"),
+                "inAmount": str(in_amount),
+                "outAmount": str(out_amount),
+                "otherAmountThreshold": str(out_amount * (10000 - slippage_bps) // 10000),
+                "swapMode": params.get("swapMode", "ExactIn"),
+                "slippageBps": slippage_bps,
+                "routePlan": [],
+            })
+        else:
+            self._count(parsed.path, "unknown")
+            self._send_json(handler, 404, {"error": f"Unknown path {parsed.path}"})
+
+    def _handle_post(self, handler):
+        parsed = urlparse(handler.path)
+        length = int(handler.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(handler.rfile.read(length) or b"null")
+        except ValueError:
+            self._send_json(handler, 400, {"error": "Invalid JSON"})
+            return
+
+        if parsed.path == "/_mock/config":
+            body = body or {}
+            self.configure(latency=body.get("latency"), error_rates=body.get("error_rates"),
+                           confirm_delay=body.get("confirm_delay"), tx_failure_rate=body.get("tx_failure_rate"))
+            if body.get("price_path"):
+                self.set_price_path(body["price_path"], step=body.get("path_step", 1.0),
+                                    input_mint=body.get("input_mint"), output_mint=body.get("output_mint"))
+            self._send_json(handler, 200, {"ok": True})
+        elif parsed.path.endswith("/swap"):
+            self._count(parsed.path, "swap")
+            self._delay(["swap"])
+            if self._inject_error("swap"):
+                self._send_json(handler, 500, {"error": "Injected swap error"})
+                return
+            try:
+                self._send_json(handler, 200, self._swap_transaction(body["userPublicKey"]))
+            except (KeyError, TypeError, ValueError) as e:
+                self._send_json(handler, 400, {"error": f"Bad swap request: {e}"})
+        else:
+            requests = body if isinstance(body, list) else [body]
+            methods = [request.get("method", "unknown") if isinstance(request, dict) else "unknown" for request in requests]
+            for method in methods:
+                self._count(parsed.path, method)
+            self._delay(methods)
+            responses = [self._rpc(request) for request in requests]
+            self._send_json(handler, 200, responses if isinstance(body, list) else responses[0])
+
+    def _swap_transaction(self, user_public_key):
+        """An unsigned v0 transaction paid by the user (a 0-lamport self-transfer)"""
+        from solders.hash import Hash
+        from solders.message import MessageV0
+        from solders.pubkey import Pubkey
+        from solders.signature import Signature
+        from solders.system_program import TransferParams, transfer
+        from solders.transaction import VersionedTransaction
+
+        payer = Pubkey.from_string(user_public_key)
+        instruction = transfer(TransferParams(from_pubkey=payer, to_pubkey=payer, lamports=0))
+        # A fresh blockhash per swap keeps every transaction (and signature) distinct
+        message = MessageV0.try_compile(payer, [instruction], [], Hash.new_unique())
+        transaction = VersionedTransaction.populate(message, [Signature.default()])
+        return {
+            "swapTransaction": base64.b64encode(bytes(transaction)).decode(),
+            "lastValidBlockHeight": self.slot() + 150,
+            "prioritizationFeeLamports": 5000,
+        }
+
+    def _rpc(self, request):
+        if not isinstance(request, dict):
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid request"}}
+        request_id = request.get("id")
+        method = request.get("method")
+        params = request.get("params") or []
+
+        if self._inject_error(method):
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32005, "message": f"Injected {method} error"}}
+
+        handler = getattr(self, f"_rpc_{method}", None)
+        if handler is None:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32601, "message": f"Method not found: {method}"}}
+        try:
+            result = handler(params)
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32602, "message": f"Invalid params: {e}"}}
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def _context(self):
+        return {"slot": self.slot(), "apiVersion": "1.18.0"}
+
+    def _rpc_getBalance(self, params):
+        return {"context": self._context(), "value": self.sol_lamports}
+
+    def _rpc_getTokenAccountsByOwner(self, params):
+        owner = params[0]
+        accounts = []
+        with self._lock:
+            balances = list(self.token_balances.items())
+        for mint, ui_amount in balances:
+            decimals = 6
+            accounts.append({
+                "pubkey": _fake_address(f"{owner}:{mint}"),
+                "account": {
+                    "data": {
+                        "parsed": {
+                            "info": {
+                                "isNative": False,
+                                "mint": mint,
+                                "owner": owner,
+                                "state": "initialized",
+                                "tokenAmount": {
+                                    "amount": str(int(ui_amount * 10**decimals)),
+                                    "decimals": decimals,
+                                    "uiAmount": ui_amount,
+                                    "uiAmountString": str(ui_amount),
+                                },
+                            },
+                            "type": "account",
+                        },
+                        "program": "spl-token",
+                        "space": 165,
+                    },
+                    "executable": False,
+                    "lamports": 2039280,
+                    "owner": TOKEN_PROGRAM_ID,
+                    "rentEpoch": 0,
+                    "space": 165,
+                },
+            })
+        return {"context": self._context(), "value": accounts}
+
+    def _rpc_getLatestBlockhash(self, params):
+        from solders.hash import Hash
+        return {"context": self._context(), "value": {"blockhash": str(Hash.new_unique()), "lastValidBlockHeight": self.slot() + 150}}
+
+    def _rpc_getAccountInfo(self, params):
+        # Every address is a funded system account
+        return {"context": self._context(), "value": {
+            "data": ["", "base64"],
+            "executable": False,
+            "lamports": self.sol_lamports,
+            "owner": SYSTEM_PROGRAM_ID,
+            "rentEpoch": 0,
+            "space": 0,
+        }}
+
+    def _rpc_sendTransaction(self, params):
+        from solders.transaction import VersionedTransaction
+
+        encoded = params[0]
+        encoding = (params[1] if len(params) > 1 and isinstance(params[1], dict) else {}).get("encoding", "base58")
+        if encoding == "base64":
+            raw = base64.b64decode(encoded)
+        else:
+            from base58 import b58decode
+            raw = b58decode(encoded)
+        signature = str(VersionedTransaction.from_bytes(raw).signatures[0])
+        with self._lock:
+            failed = self._random.random() < self.tx_failure_rate
+            self._transactions[signature] = (time.monotonic(), failed)
+        return signature
+
+    def _rpc_getSignatureStatuses(self, params):
+        now = time.monotonic()
+        statuses = []
+        with self._lock:
+            for signature in params[0]:
+                sent = self._transactions.get(signature)
+                if sent is None or now - sent[0] < self.confirm_delay:
+                    statuses.append(None)
+                    continue
+                statuses.append({
+                    "slot": self.slot(),
+                    "confirmations": None,
+                    "err": {"InstructionError": [0, {"Custom": 6001}]} if sent[1] else None,
+                    "confirmationStatus": "confirmed",
+                    "status": {"Err": {"InstructionError": [0, {"Custom": 6001}]}} if sent[1] else {"Ok": None},
+                })
+        return {"context": self._context(), "value": statuses}
+
+    @staticmethod
+    def _send_json(handler, status, body):
+        payload = json.dumps(body).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+
+def _fake_address(seed):
+    """A stable base58 address derived from a string"""
+    import hashlib
+    from solders.pubkey import Pubkey
+    return str(Pubkey(hashlib.sha256(seed.encode()).digest()))
+
+
+def generate_self_signed_cert(directory, host="127.0.0.1"):
+    """Write a self-signed certificate and key for host into directory; returns (certfile, keyfile)"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)])
+    now = datetime.datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(host))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+
+    certfile = os.path.join(directory, "mock-upstream.crt")
+    keyfile = os.path.join(directory, "mock-upstream.key")
+    with open(certfile, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return certfile, keyfile
+
+
+def parse_route_values(items, scale=1.0):
+    """['quote=50', 'sendTransaction=20:80'] -> {'quote': 0.05, 'sendTransaction': [0.02, 0.08]} with scale=0.001"""
+    values = {}
+    for item in items or []:
+        route, _, value = item.partition("=")
+        if ":" in value:
+            low, high = value.split(":")
+            values[route] = [float(low) * scale, float(high) * scale]
+        else:
+            values[route] = float(value) * scale
+    return values
+
+
+def load_price_path(path):
+    """Prices from a .npy array or a text file with one price per line"""
+    if path.endswith(".npy"):
+        import numpy as np
+        return np.load(path).tolist()
+    with open(path) as f:
+        return [float(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock Jupiter API and Solana RPC node")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--certfile", help="serve HTTPS with this certificate")
+    parser.add_argument("--keyfile", help="private key for --certfile")
+    parser.add_argument("--latency", action="append", metavar="ROUTE=MS[:MS]",
+                        help="injected latency per route (quote, swap, an RPC method or *), repeatable")
+    parser.add_argument("--error-rate", action="append", metavar="ROUTE=P", help="injected error probability per route, repeatable")
+    parser.add_argument("--price-path", help="scripted prices: .npy or one price per line")
+    parser.add_argument("--path-step", type=float, default=1.0, help="seconds per price path step (0: one step per quote)")
+    parser.add_argument("--confirm-delay", type=float, default=0.4, help="seconds from sendTransaction to confirmed")
+    parser.add_argument("--tx-failure-rate", type=float, default=0.0, help="share of sent transactions that fail")
+    parser.add_argument("--seed", type=int, help="random seed for jitter and injected errors")
+    args = parser.parse_args()
+
+    upstream = MockUpstream(
+        host=args.host, port=args.port, certfile=args.certfile, keyfile=args.keyfile,
+        latency=parse_route_values(args.latency, scale=0.001), error_rates=parse_route_values(args.error_rate),
+        price_path=load_price_path(args.price_path) if args.price_path else None, path_step=args.path_step or None,
+        confirm_delay=args.confirm_delay, tx_failure_rate=args.tx_failure_rate, seed=args.seed
+    ).start()
+    print(f"Mock upstream listening on {upstream.url}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        upstream.stop()
@@ -1,9 +1,12 @@
 import os
 from pymongo import MongoClient
 from dotenv import load_dotenv
+from services.structured_log import get_logger
 
 load_dotenv()
 
+log = get_logger("database")
+
 _db = None
 
 def get_db():
@@ -14,9 +17,9 @@ def get_db():
         # Verify connection
         try:
             client.admin.command('ping')
-            print("Connected to MongoDB successfully")
+            log.info("Connected to MongoDB")
         except Exception as e:
-            print(f"Error connecting to MongoDB: {e}")
+            log.error("Error connecting to MongoDB", error=str(e))
             raise e
             
         db_name = mongo_uri.split('/')[-1].split('?')[0]  # Extract db name from URI
@@ -41,4 +44,11 @@ def init_db():
     # TradingBot indexes
     db.trading_bots.create_index("user_id") # Foreign key equivalent
 
-    print("Database indexes initialized")
+    # Trade indexes - history queries filter by user and sort/range on timestamp;
+    # _id breaks timestamp ties for keyset pagination
+    db.trades.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
+
+    # Daily PnL rollups - one document per user, day and token
+    db.trade_rollups.create_index([("user_id", 1), ("day", 1), ("token_mint", 1)], unique=True)
+
+    log.info("Database indexes initialized")
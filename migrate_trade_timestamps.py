@@ -0,0 +1,47 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from database import get_db, init_db
+    from models.trade import Trade
+except ImportError as e:
+    print(f"Import failed: {e}")
+    sys.exit(1)
+
+def migrate():
+    """Convert string trade timestamps to BSON datetimes and create the (user_id, timestamp) index"""
+    print("Connecting to MongoDB...")
+    try:
+        db = get_db()
+        print(f"Connected to database: {db.name}")
+    except Exception as e:
+        print(f"Connection failed: {e}")
+        return False
+
+    remaining = db.trades.count_documents({"timestamp": {"$type": "string"}})
+    print(f"Trades with string timestamps: {remaining}")
+
+    if remaining:
+        converted = Trade.migrate_string_timestamps()
+        print(f"Converted {converted} trades to datetime timestamps.")
+
+    print("Initializing indexes...")
+    try:
+        init_db()
+    except Exception as e:
+        print(f"Index initialization failed: {e}")
+        return False
+
+    left = db.trades.count_documents({"timestamp": {"$type": "string"}})
+    if left:
+        print(f"{left} trades still have string timestamps (unparseable values were skipped).")
+        return False
+
+    print("Trade timestamp migration complete.")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if migrate() else 1)
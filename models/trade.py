@@ -1,15 +1,59 @@
 """
 Trade model for the multi-user Solana trading bot
 """
-from datetime import datetime
+import base64
+from datetime import datetime, timedelta
 from database import get_db
 from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from services.structured_log import get_logger
+
+log = get_logger("trade")
+
+# Display/API format of trade timestamps (the bots' transaction record format)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Fields returned by the trade history API; queries project only these
+HISTORY_PROJECTION = {
+    "_id": 0,
+    "timestamp": 1,
+    "action": 1,
+    "token_symbol": 1,
+    "price": 1,
+    "amount": 1,
+    "pnl": 1,
+    "status": 1
+}
+
+# Fields in paged history and exports (history fields plus mint and network)
+EXPORT_FIELDS = ["timestamp", "action", "token_symbol", "token_mint", "price", "amount", "pnl", "network", "status"]
+
+def parse_timestamp(value):
+    """Datetime for a stored or given timestamp (datetime, 'YYYY-MM-DD HH:MM:SS' or ISO string)"""
+    if isinstance(value, datetime) or value is None:
+        return value
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT)
+    except ValueError:
+        return datetime.fromisoformat(value)
+
+def format_timestamp(value):
+    """
+    API string for a timestamp. Strings from before the datetime migration are
+    normalized to the same format; one that does not parse passes through as is.
+    """
+    if isinstance(value, str):
+        try:
+            value = parse_timestamp(value)
+        except ValueError:
+            return value
+    return value.strftime(TIMESTAMP_FORMAT) if isinstance(value, datetime) else value
 
 class Trade:
-    def __init__(self, id=None, user_id=None, timestamp=None, action=None, token_mint=None, token_symbol=None, price=None, amount=None, pnl=None, network='mainnet', status='completed', _id=None):
+    def __init__(self, id=None, user_id=None, timestamp=None, action=None, token_mint=None, token_symbol=None, price=None, amount=None, pnl=None, network='mainnet', status='completed', fee=None, value=None, _id=None):
         self._id = _id if _id else (ObjectId(id) if id else None)
         self.user_id = user_id
-        self.timestamp = timestamp or datetime.utcnow().isoformat()
+        self.timestamp = parse_timestamp(timestamp) or datetime.utcnow()
         self.action = action
         self.token_mint = token_mint
         self.token_symbol = token_symbol
@@ -18,6 +62,8 @@ class Trade:
         self.pnl = pnl
         self.network = network
         self.status = status
+        self.fee = fee  # Estimated fee deducted from this trade's PnL
+        self.value = value  # Dollar value of the trade
 
     @property
     def id(self):
@@ -30,14 +76,12 @@ class Trade:
         else:
             self._id = None
 
-    def save(self):
-        """Save trade to database"""
-        db = get_db()
-        
+    def to_document(self):
+        """Trade as a Mongo document (without _id)"""
         # Ensure user_id is ObjectId
         user_id_obj = ObjectId(self.user_id) if isinstance(self.user_id, str) else self.user_id
-        
-        trade_data = {
+
+        return {
             "user_id": user_id_obj,
             "timestamp": self.timestamp,
             "action": self.action,
@@ -47,9 +91,16 @@ class Trade:
             "amount": self.amount,
             "pnl": self.pnl,
             "network": self.network,
-            "status": self.status
+            "status": self.status,
+            "fee": self.fee,
+            "value": self.value
         }
 
+    def save(self):
+        """Save trade to database"""
+        db = get_db()
+        trade_data = self.to_document()
+
         if self._id:
             db.trades.update_one({"_id": self._id}, {"$set": trade_data})
         else:
@@ -58,6 +109,135 @@ class Trade:
         
         return self
 
+    @staticmethod
+    def insert_many(documents):
+        """Insert a batch of trade documents in one round trip (used by the trade journal)"""
+        db = get_db()
+        db.trades.insert_many(documents, ordered=False)
+
+    @staticmethod
+    def day_range(date_str):
+        """[start, end) datetimes of a YYYY-MM-DD day"""
+        start = datetime.strptime(date_str, "%Y-%m-%d")
+        return start, start + timedelta(days=1)
+
+    @classmethod
+    def find_history_by_user_and_date(cls, user_id, date_str):
+        """
+        Trade history rows (dicts with the HISTORY_PROJECTION fields) for a user on a
+        specific date, newest first. Served from the (user_id, timestamp) index with
+        only the needed fields fetched and no Trade objects built.
+        date_str format: YYYY-MM-DD
+        """
+        db = get_db()
+        user_id_obj = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        start, end = cls.day_range(date_str)
+
+        cursor = db.trades.find(
+            {"user_id": user_id_obj, "timestamp": {"$gte": start, "$lt": end}},
+            HISTORY_PROJECTION
+        ).sort("timestamp", -1)
+
+        rows = []
+        for data in cursor:
+            data["timestamp"] = format_timestamp(data["timestamp"])
+            rows.append(data)
+        return rows
+
+    @staticmethod
+    def history_query(user_id, start=None, end=None, token=None, action=None):
+        """
+        Mongo filter for a user's trades in [start, end) with optional token (mint or
+        symbol) and action filters
+        """
+        user_id_obj = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        query = {"user_id": user_id_obj}
+
+        if start or end:
+            query["timestamp"] = {}
+            if start:
+                query["timestamp"]["$gte"] = start
+            if end:
+                query["timestamp"]["$lt"] = end
+        if token:
+            # Mint addresses are 32-44 base58 characters; anything shorter is a symbol
+            query["token_mint" if len(token) >= 32 else "token_symbol"] = token
+        if action:
+            query["action"] = action
+        return query
+
+    @staticmethod
+    def encode_cursor(timestamp, trade_id):
+        """Opaque page cursor for the position just after (timestamp, _id)"""
+        raw = f"{parse_timestamp(timestamp).isoformat()}|{trade_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """(timestamp, ObjectId) from a page cursor; raises ValueError if it is malformed"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            timestamp, trade_id = raw.split("|")
+            return datetime.fromisoformat(timestamp), ObjectId(trade_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    @classmethod
+    def find_history_page(cls, user_id, start=None, end=None, token=None, action=None, cursor=None, limit=100):
+        """
+        One page of a user's trade history, newest first, using keyset pagination on
+        (timestamp, _id) so every page is an index range scan however deep it is.
+        Returns (rows, next_cursor); next_cursor is None on the last page.
+        Only datetime timestamps are paged: Mongo sorts legacy string timestamps
+        apart from datetimes, so they have no place in the keyset order (run
+        migrate_trade_timestamps.py to convert them).
+        """
+        db = get_db()
+        query = cls.history_query(user_id, start, end, token, action)
+        query.setdefault("timestamp", {})["$type"] = "date"
+        if cursor:
+            after_timestamp, after_id = cls.decode_cursor(cursor)
+            query["$or"] = [
+                {"timestamp": {"$lt": after_timestamp}},
+                {"timestamp": after_timestamp, "_id": {"$lt": after_id}}
+            ]
+
+        projection = {field: 1 for field in EXPORT_FIELDS}
+        documents = list(
+            db.trades.find(query, projection).sort([("timestamp", -1), ("_id", -1)]).limit(limit + 1)
+        )
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = cls.encode_cursor(last["timestamp"], last["_id"])
+
+        rows = []
+        for data in documents:
+            data.pop("_id")
+            data["timestamp"] = format_timestamp(data["timestamp"])
+            rows.append(data)
+        return rows, next_cursor
+
+    @classmethod
+    def iter_history(cls, user_id, start=None, end=None, token=None, action=None, batch_size=1000):
+        """
+        Yield a user's trade history rows (EXPORT_FIELDS), newest first, straight from
+        the Mongo cursor so memory stays bounded however many trades there are.
+        Legacy string timestamps are included, formatted like the rest.
+        """
+        db = get_db()
+        query = cls.history_query(user_id, start, end, token, action)
+        projection = dict({field: 1 for field in EXPORT_FIELDS}, _id=0)
+        cursor = db.trades.find(query, projection).sort([("timestamp", -1), ("_id", -1)]).batch_size(batch_size)
+        try:
+            for data in cursor:
+                data["timestamp"] = format_timestamp(data["timestamp"])
+                yield data
+        finally:
+            cursor.close()
+
     @classmethod
     def find_by_user_and_date(cls, user_id, date_str):
         """
@@ -66,14 +246,13 @@ class Trade:
         """
         db = get_db()
         user_id_obj = ObjectId(user_id) if isinstance(user_id, str) else user_id
-        
+
         # Create date range for query
-        start_date = f"{date_str} 00:00:00"
-        end_date = f"{date_str} 23:59:59"
-        
+        start, end = cls.day_range(date_str)
+
         cursor = db.trades.find({
             "user_id": user_id_obj,
-            "timestamp": {"$gte": start_date, "$lte": end_date}
+            "timestamp": {"$gte": start, "$lt": end}
         }).sort("timestamp", -1) # Sort by newest first
         
         trades = []
@@ -93,3 +272,33 @@ class Trade:
             ))
             
         return trades
+
+    @staticmethod
+    def migrate_string_timestamps(batch_size=1000):
+        """
+        Convert trades stored with string timestamps to BSON datetimes.
+        Safe to re-run; returns the number of documents converted.
+        """
+        db = get_db()
+        converted = 0
+        skipped = []
+        while True:
+            batch = list(db.trades.find(
+                {"timestamp": {"$type": "string"}, "_id": {"$nin": skipped}}, {"timestamp": 1}
+            ).limit(batch_size))
+            if not batch:
+                return converted
+
+            updates = []
+            for data in batch:
+                try:
+                    timestamp = parse_timestamp(data["timestamp"])
+                except ValueError:
+                    log.warning("Skipping trade with unparseable timestamp", trade_id=data['_id'], timestamp=data['timestamp'])
+                    skipped.append(data["_id"])
+                    continue
+                updates.append(UpdateOne({"_id": data["_id"], "timestamp": data["timestamp"]}, {"$set": {"timestamp": timestamp}}))
+
+            if updates:
+                db.trades.bulk_write(updates, ordered=False)
+                converted += len(updates)
@@ -0,0 +1,164 @@
+"""
+Daily trade rollup model for the multi-user Solana trading bot
+
+One document per (user, token, day) with the day's trade count, buys, sells,
+dollar volume, realized PnL and fees. As the trade journal writes a batch of
+trades, the rollups of the days it touches are recomputed from the trades
+(never incremented, so a retried batch is not counted twice), and all of them
+can be rebuilt at any time. Range totals cost one small document per token per
+day instead of a scan of every trade.
+"""
+from datetime import datetime, timedelta
+from database import get_db
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+
+# Summed fields of a rollup document
+ROLLUP_FIELDS = ["count", "buys", "sells", "volume", "realized_pnl", "fees"]
+
+def trade_day(timestamp):
+    """Midnight of the day a trade timestamp falls on"""
+    return datetime(timestamp.year, timestamp.month, timestamp.day)
+
+def trade_increments(document):
+    """Rollup increments contributed by one trade document"""
+    price = document.get("price") or 0
+    amount = document.get("amount") or 0
+    value = document.get("value")
+    return {
+        "count": 1,
+        "buys": 1 if document.get("action") == "buy" else 0,
+        "sells": 1 if document.get("action") == "sell" else 0,
+        "volume": value if value is not None else price * amount,
+        "realized_pnl": document.get("pnl") or 0,
+        "fees": document.get("fee") or 0
+    }
+
+def rollup_pipeline(match):
+    """Aggregation summing the matched trades into one group per (user, token, day)"""
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "user_id": "$user_id",
+                "token_mint": "$token_mint",
+                "year": {"$year": "$timestamp"},
+                "month": {"$month": "$timestamp"},
+                "day": {"$dayOfMonth": "$timestamp"}
+            },
+            "count": {"$sum": 1},
+            "buys": {"$sum": {"$cond": [{"$eq": ["$action", "buy"]}, 1, 0]}},
+            "sells": {"$sum": {"$cond": [{"$eq": ["$action", "sell"]}, 1, 0]}},
+            "volume": {"$sum": {"$ifNull": ["$value", {"$multiply": [{"$ifNull": ["$price", 0]}, {"$ifNull": ["$amount", 0]}]}]}},
+            "realized_pnl": {"$sum": {"$ifNull": ["$pnl", 0]}},
+            "fees": {"$sum": {"$ifNull": ["$fee", 0]}}
+        }}
+    ]
+
+def write_rollups(db, match, batch_size=1000):
+    """Recompute the rollups of the matched trades and overwrite them; returns the number written"""
+    written = 0
+    batch = []
+    for group in db.trades.aggregate(rollup_pipeline(match), allowDiskUse=True):
+        key = group.pop("_id")
+        batch.append(UpdateOne(
+            {
+                "user_id": key["user_id"],
+                "token_mint": key["token_mint"],
+                "day": datetime(key["year"], key["month"], key["day"])
+            },
+            {"$set": group},
+            upsert=True
+        ))
+        if len(batch) >= batch_size:
+            db.trade_rollups.bulk_write(batch, ordered=False)
+            written += len(batch)
+            batch = []
+    if batch:
+        db.trade_rollups.bulk_write(batch, ordered=False)
+        written += len(batch)
+    return written
+
+class TradeRollup:
+    @staticmethod
+    def apply_trades(documents, days_per_query=200):
+        """
+        Bring the rollups up to date with a batch of newly written trade documents.
+
+        Every (user, day) the batch touches is recomputed from the trades collection
+        rather than incremented, so applying the same batch again (the journal retries
+        a whole batch after any failure) cannot count a trade twice.
+        """
+        user_days = sorted({
+            (document["user_id"], trade_day(document["timestamp"]))
+            for document in documents
+            if isinstance(document.get("timestamp"), datetime)
+        })
+        if not user_days:
+            return 0
+
+        db = get_db()
+        written = 0
+        for start in range(0, len(user_days), days_per_query):
+            # Served by the (user_id, timestamp) index
+            match = {"$or": [
+                {"user_id": user_id, "timestamp": {"$gte": day, "$lt": day + timedelta(days=1)}}
+                for user_id, day in user_days[start:start + days_per_query]
+            ]}
+            written += write_rollups(db, match)
+        return written
+
+    @staticmethod
+    def rebuild(user_id=None, batch_size=1000):
+        """
+        Recompute rollups from the raw trades (for one user, or everyone) and replace
+        the existing ones. Returns the number of rollup documents written.
+        """
+        db = get_db()
+        match = {"timestamp": {"$type": "date"}}
+        scope = {}
+        if user_id is not None:
+            scope["user_id"] = ObjectId(user_id) if isinstance(user_id, str) else user_id
+            match.update(scope)
+
+        db.trade_rollups.delete_many(scope)
+        return write_rollups(db, match, batch_size)
+
+    @staticmethod
+    def find_range(user_id, start, end, token_mint=None):
+        """Rollup documents for a user with start <= day < end, oldest first"""
+        db = get_db()
+        query = {
+            "user_id": ObjectId(user_id) if isinstance(user_id, str) else user_id,
+            "day": {"$gte": trade_day(start), "$lt": end}
+        }
+        if token_mint:
+            query["token_mint"] = token_mint
+        return list(db.trade_rollups.find(query, {"_id": 0, "user_id": 0}).sort("day", 1))
+
+    @staticmethod
+    def summarize(rollups, period="day"):
+        """
+        Totals over rollup documents plus per-period buckets; period is 'day', 'week'
+        (starting Monday) or 'month'
+        """
+        totals = dict.fromkeys(ROLLUP_FIELDS, 0)
+        buckets = {}
+        for rollup in rollups:
+            day = rollup["day"]
+            if period == "week":
+                bucket_start = day - timedelta(days=day.weekday())
+            elif period == "month":
+                bucket_start = day.replace(day=1)
+            else:
+                bucket_start = day
+            bucket = buckets.setdefault(bucket_start, dict.fromkeys(ROLLUP_FIELDS, 0))
+            for field in ROLLUP_FIELDS:
+                value = rollup.get(field, 0)
+                bucket[field] += value
+                totals[field] += value
+
+        return totals, [
+            dict(bucket, start=bucket_start.strftime("%Y-%m-%d"))
+            for bucket_start, bucket in sorted(buckets.items())
+        ]
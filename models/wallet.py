@@ -7,6 +7,9 @@ import json
 import os
 from database import get_db
 from bson.objectid import ObjectId
+from services.structured_log import get_logger
+
+log = get_logger("wallet")
 
 try:
     from solana.keypair import Keypair
@@ -33,6 +36,22 @@ except ImportError:
                 return "mock_public_key"
 
 
+_fernet = None
+_fernet_key = None
+
+def get_fernet():
+    """Fernet for ENCRYPTION_KEY, rebuilt only when the key changes"""
+    global _fernet, _fernet_key
+    encryption_key = os.getenv('ENCRYPTION_KEY')
+    if not encryption_key:
+        raise ValueError("ENCRYPTION_KEY not set in environment")
+
+    if _fernet is None or encryption_key != _fernet_key:
+        _fernet = Fernet(encryption_key.encode() if isinstance(encryption_key, str) else encryption_key)
+        _fernet_key = encryption_key
+    return _fernet
+
+
 class Wallet:
     def __init__(self, id=None, user_id=None, public_key=None, encrypted_private_key=None, created_at=None, balance=None, _id=None):
         self._id = _id if _id else (ObjectId(id) if id else None)
@@ -119,6 +138,22 @@ class Wallet:
             )
         return None
 
+    @staticmethod
+    def find_all():
+        """Find all wallets"""
+        db = get_db()
+        wallets = []
+        for data in db.wallets.find():
+            wallets.append(Wallet(
+                _id=data['_id'],
+                user_id=str(data['user_id']),
+                public_key=data['public_key'],
+                encrypted_private_key=data['encrypted_private_key'],
+                created_at=data['created_at'],
+                balance=data.get('balance', {})
+            ))
+        return wallets
+
     @staticmethod
     def create_wallet_for_user(user_id):
         """Create a new wallet for a user"""
@@ -149,8 +184,7 @@ class Wallet:
         if not encryption_key:
             # Generate a new key if one doesn't exist
             encryption_key = Fernet.generate_key().decode()
-            print(f"Generated encryption key: {encryption_key}")
-            print("Please set this as ENCRYPTION_KEY in your .env file")
+            log.warning("Generated encryption key; set it as ENCRYPTION_KEY in your .env file", encryption_key=encryption_key)
 
         fernet = Fernet(encryption_key.encode() if isinstance(encryption_key, str) else encryption_key)
         encrypted_private_key = fernet.encrypt(private_key_bytes).decode()
@@ -166,12 +200,7 @@ class Wallet:
 
     def get_private_key(self):
         """Decrypt and return the private key"""
-        encryption_key = os.getenv('ENCRYPTION_KEY')
-        if not encryption_key:
-            raise ValueError("ENCRYPTION_KEY not set in environment")
-
-        fernet = Fernet(encryption_key.encode() if isinstance(encryption_key, str) else encryption_key)
-        decrypted_private_key = fernet.decrypt(self.encrypted_private_key.encode())
+        decrypted_private_key = get_fernet().decrypt(self.encrypted_private_key.encode())
 
         return decrypted_private_key
 
@@ -203,16 +232,18 @@ class Wallet:
                 return decrypted_private_key
 
     def update_balance(self, new_balance):
-        """Update wallet balance"""
+        """Update wallet balance (skips the database write when nothing changed)"""
         # Convert list format to dict format if needed
         if isinstance(new_balance, list):
             balance_dict = {}
             for item in new_balance:
                 if isinstance(item, dict) and 'token' in item and 'balance' in item:
                     balance_dict[item['token']] = item['balance']
-            self.balance = balance_dict
-        else:
-            self.balance = new_balance
+            new_balance = balance_dict
+
+        if new_balance == self.balance:
+            return
+        self.balance = new_balance
 
         db = get_db()
         # Ensure ID is ObjectId
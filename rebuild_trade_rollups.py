@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from database import get_db, init_db
+    from models.trade_rollup import TradeRollup
+except ImportError as e:
+    print(f"Import failed: {e}")
+    sys.exit(1)
+
+def rebuild(user_id=None):
+    """Recompute the daily PnL rollups from the trades collection (for one user, or everyone)"""
+    print("Connecting to MongoDB...")
+    try:
+        db = get_db()
+        print(f"Connected to database: {db.name}")
+    except Exception as e:
+        print(f"Connection failed: {e}")
+        return False
+
+    print("Initializing indexes...")
+    try:
+        init_db()
+    except Exception as e:
+        print(f"Index initialization failed: {e}")
+        return False
+
+    scope = f"user {user_id}" if user_id else "all users"
+    print(f"Rebuilding trade rollups for {scope}...")
+    try:
+        written = TradeRollup.rebuild(user_id)
+    except Exception as e:
+        print(f"Rebuild failed: {e}")
+        return False
+
+    print(f"Wrote {written} daily rollups.")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if rebuild(sys.argv[1] if len(sys.argv) > 1 else None) else 1)
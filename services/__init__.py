@@ -0,0 +1,4 @@
+"""
+Service layer for the multi-user Solana trading bot
+"""
+from .price_hub import PriceHub
@@ -0,0 +1,82 @@
+"""
+Wallet balance cache for the multi-user Solana trading bot
+
+Dashboard polls and pre-trade balance checks used to hit the RPC node on every
+call. The cache keeps each wallet's last successful balance response for a
+configurable TTL; callers choose between a fresh read and a cached-ok read, and
+entries are invalidated when a swap or withdrawal by that wallet succeeds so the
+next read reflects the new holdings.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class BalanceCache:
+    def __init__(self, fetch_balance, ttl=15.0, max_entries=10000):
+        """
+        fetch_balance(wallet_address, network) must return the get_wallet_balance dict:
+        {"success", "balances", ["message"]}. Only successful responses are cached.
+        """
+        self.fetch_balance = fetch_balance
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._networks = set()
+        # Bumped on invalidation so a fetch that started before a trade can't re-cache stale balances
+        self._epochs = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, wallet_address, network="mainnet", fresh=False, max_age=None):
+        """
+        Return the wallet's balance response. fresh=True always goes to the RPC node;
+        otherwise a cached response younger than max_age (default: the TTL) is reused.
+        The returned dict carries "cached": True/False.
+        """
+        key = (wallet_address, (network or "mainnet").lower())
+        max_age = self.ttl if max_age is None else max_age
+
+        with self._lock:
+            if not fresh:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() - entry[1] <= max_age:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return dict(entry[0], cached=True)
+                self.misses += 1
+            epoch = self._epochs.get(wallet_address, 0)
+
+        result = self.fetch_balance(wallet_address, network)
+        if isinstance(result, dict) and result.get("success"):
+            with self._lock:
+                if self._epochs.get(wallet_address, 0) != epoch:
+                    return dict(result, cached=False)
+                self._networks.add(key[1])
+                self._entries[key] = (result, time.monotonic())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return dict(result, cached=False) if isinstance(result, dict) else result
+
+    def invalidate(self, wallet_address, network=None):
+        """Drop cached balances for a wallet (on one network, or all of them)"""
+        with self._lock:
+            self._epochs[wallet_address] = self._epochs.get(wallet_address, 0) + 1
+            networks = [network.lower()] if network else list(self._networks)
+            for key in [(wallet_address, name) for name in networks]:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def stats(self):
+        """Hit, miss and invalidation counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "ttl": self.ttl,
+            }
@@ -0,0 +1,121 @@
+"""
+Bot engine for the multi-user Solana trading bot
+
+Runs every ladder bot as an asyncio task on a single background event loop
+instead of one OS thread per user. Bots spend nearly all their time waiting for
+the next price tick, which costs a task almost nothing; blocking work (Mongo
+lookups, signing and sending swaps) is handed to a bounded worker pool.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+from services.structured_log import get_logger
+
+log = get_logger("bot_engine")
+
+
+class BotEngine:
+    def __init__(self, max_workers=32, name="bot-engine"):
+        self.name = name
+        self.max_workers = max_workers
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._lock = threading.Lock()
+        # user_id -> running task / latest generation number
+        self._tasks = {}
+        self._generations = {}
+
+    @property
+    def loop(self):
+        """The engine's event loop, started on first use"""
+        if self._loop is None:
+            self.start()
+        return self._loop
+
+    def start(self):
+        """Start the event loop thread if it is not already running"""
+        with self._lock:
+            if self._loop is not None:
+                return
+
+            ready = threading.Event()
+
+            def run():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                loop.set_default_executor(self._executor)
+                self._loop = loop
+                ready.set()
+                loop.run_forever()
+
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=f"{self.name}-worker"
+            )
+            self._thread = threading.Thread(target=run, name=self.name)
+            self._thread.daemon = True
+            self._thread.start()
+            ready.wait()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the engine loop from any thread; returns a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """Run a blocking callable in the worker pool without stalling other bots"""
+        return await self.loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def start_bot(self, user_id, bot_factory):
+        """
+        Start a bot for a user, superseding any bot already running for them.
+        bot_factory(generation) must return the bot coroutine; the bot should keep
+        running only while is_current(user_id, generation) holds.
+        Returns the new generation number.
+        """
+        with self._lock:
+            generation = self._generations.get(user_id, 0) + 1
+            self._generations[user_id] = generation
+
+        def spawn():
+            task = self.loop.create_task(self._run_bot(user_id, generation, bot_factory(generation)))
+            self._tasks[(user_id, generation)] = task
+
+        self.loop.call_soon_threadsafe(spawn)
+        return generation
+
+    def stop_bot(self, user_id):
+        """Mark the user's current bot as superseded; it exits at its next tick"""
+        with self._lock:
+            if user_id in self._generations:
+                self._generations[user_id] += 1
+
+    def is_current(self, user_id, generation):
+        """True while generation is still the user's latest bot"""
+        return self._generations.get(user_id) == generation
+
+    def running_count(self):
+        """Number of bot tasks currently alive on the loop"""
+        return len(self._tasks)
+
+    def shutdown(self, timeout=5):
+        """Stop the event loop and worker pool"""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=False)
+        self._loop = None
+        self._thread = None
+
+    async def _run_bot(self, user_id, generation, coro):
+        try:
+            await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.error("Bot crashed", user_id=user_id, generation=generation, error=str(e))
+        finally:
+            self._tasks.pop((user_id, generation), None)
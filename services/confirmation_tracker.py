@@ -0,0 +1,195 @@
+"""
+Transaction confirmation tracker for the multi-user Solana trading bot
+
+execute_swap used to block in confirm_transaction until each signature landed,
+so the bot that submitted it stopped tracking prices for the whole wait. The
+tracker takes submitted signatures from any thread, polls getSignatureStatuses
+for every pending signature across all users in batched RPC calls, and resolves
+a Future (plus optional callback) per signature once it is confirmed, fails,
+or is given up on.
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+from services.structured_log import get_logger
+
+log = get_logger("confirmation_tracker")
+
+# Signatures per getSignatureStatuses call (the RPC limit)
+MAX_SIGNATURES_PER_CALL = 256
+
+# Commitment levels in increasing order of finality
+COMMITMENT_LEVELS = ("processed", "confirmed", "finalized")
+
+
+class _PendingSignature:
+    def __init__(self, signature, network, future, submitted_at, deadline):
+        self.signature = signature
+        self.network = network
+        self.future = future
+        self.submitted_at = submitted_at
+        self.deadline = deadline
+
+
+class ConfirmationTracker:
+    def __init__(self, rpc_call, interval=0.5, timeout=90.0, commitment="confirmed"):
+        """
+        rpc_call(network, payload) sends a raw JSON-RPC request and returns the decoded
+        response (RpcClientRegistry.call). Signatures not seen at the requested
+        commitment within timeout seconds are resolved as unconfirmed.
+        """
+        self.rpc_call = rpc_call
+        self.interval = interval
+        self.timeout = timeout
+        self.commitment = commitment
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._stopped = False
+        self.polls = 0
+        self.confirmed = 0
+        self.failed = 0
+        self.expired = 0
+        self.errors = 0
+
+    def track(self, signature, network="mainnet", callback=None):
+        """
+        Start tracking a submitted signature. Returns a concurrent.futures.Future that
+        resolves to {"signature", "success", "err", "slot", "confirmation_status",
+        "confirm_ms"}; callback(result) is also called (on the tracker thread) if given.
+        """
+        signature = str(signature)
+        network = (network or "mainnet").lower()
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(lambda done: callback(done.result()))
+
+        now = time.monotonic()
+        with self._wakeup:
+            existing = self._pending.get(signature)
+            if existing is not None:
+                # Already tracked - share the outcome
+                existing.future.add_done_callback(lambda done: future.set_result(done.result()))
+                return future
+            self._pending[signature] = _PendingSignature(signature, network, future, now, now + self.timeout)
+            self._ensure_started()
+            self._wakeup.notify()
+        return future
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self):
+        """Pending signatures and poll/outcome counters"""
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "polls": self.polls,
+                "confirmed": self.confirmed,
+                "failed": self.failed,
+                "expired": self.expired,
+                "errors": self.errors,
+            }
+
+    def shutdown(self):
+        """Stop polling; signatures still pending are resolved as unconfirmed"""
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for entry in pending:
+            self._resolve(entry, {"success": False, "err": "Confirmation tracker stopped"})
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="confirmation-tracker", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self._pending and not self._stopped:
+                    self._wakeup.wait()
+                if self._stopped:
+                    return
+                batches = {}
+                for entry in self._pending.values():
+                    batches.setdefault(entry.network, []).append(entry)
+
+            started = time.monotonic()
+            for network, entries in batches.items():
+                for offset in range(0, len(entries), MAX_SIGNATURES_PER_CALL):
+                    self._poll(network, entries[offset:offset + MAX_SIGNATURES_PER_CALL])
+            self._expire(time.monotonic())
+
+            with self._wakeup:
+                if not self._stopped:
+                    self._wakeup.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def _poll(self, network, entries):
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getSignatureStatuses",
+            "params": [[entry.signature for entry in entries], {"searchTransactionHistory": False}],
+        }
+        try:
+            response = self.rpc_call(network, payload)
+            statuses = response["result"]["value"]
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            log.warning("getSignatureStatuses failed", network=network, error=str(e))
+            return
+
+        with self._lock:
+            self.polls += 1
+
+        required = COMMITMENT_LEVELS.index(self.commitment)
+        for entry, status in zip(entries, statuses):
+            if not status:
+                continue  # Not seen by the node yet
+            if status.get("err"):
+                outcome = {"success": False, "err": status["err"]}
+            elif COMMITMENT_LEVELS.index(status.get("confirmationStatus") or "processed") >= required:
+                outcome = {"success": True, "err": None}
+            else:
+                continue
+            outcome["slot"] = status.get("slot")
+            outcome["confirmation_status"] = status.get("confirmationStatus")
+            self._finish(entry, outcome)
+
+    def _expire(self, now):
+        with self._lock:
+            expired = [entry for entry in self._pending.values() if entry.deadline <= now]
+        for entry in expired:
+            self._finish(entry, {"success": False, "err": f"Not confirmed within {self.timeout:.0f}s"})
+
+    def _finish(self, entry, outcome):
+        with self._lock:
+            if self._pending.pop(entry.signature, None) is None:
+                return
+            if outcome["success"]:
+                self.confirmed += 1
+            elif "slot" in outcome:
+                self.failed += 1
+            else:
+                self.expired += 1
+        self._resolve(entry, outcome)
+
+    def _resolve(self, entry, outcome):
+        result = {
+            "signature": entry.signature,
+            "success": outcome["success"],
+            "err": outcome.get("err"),
+            "slot": outcome.get("slot"),
+            "confirmation_status": outcome.get("confirmation_status"),
+            "confirm_ms": round((time.monotonic() - entry.submitted_at) * 1000, 3),
+        }
+        if not entry.future.done():
+            entry.future.set_result(result)
@@ -0,0 +1,117 @@
+"""
+Shared HTTP transport for the multi-user Solana trading bot
+
+Every upstream call (Jupiter quote/swap, Solana JSON-RPC) goes through one
+transport so connections are pooled per host and kept alive between calls
+instead of paying a fresh TCP+TLS handshake each time, and so every call gets a
+default timeout. The synchronous side is a requests.Session used by Flask
+handlers and worker threads; the bot engine loop gets a matching httpx.AsyncClient.
+
+Pool sizes and timeouts come from the environment:
+    HTTP_POOL_CONNECTIONS  number of per-host pools kept (default 10)
+    HTTP_POOL_MAXSIZE      keep-alive connections per host (default 32)
+    HTTP_CONNECT_TIMEOUT   seconds to establish a connection (default 5)
+    HTTP_READ_TIMEOUT      seconds to wait for a response (default 15)
+"""
+import os
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout when the caller doesn't pass one"""
+
+    def __init__(self, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+class HttpTransport:
+    def __init__(self, pool_connections=10, pool_maxsize=32, connect_timeout=5.0, read_timeout=15.0, verify=True):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.verify = verify
+        self._session = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build a transport configured from HTTP_* environment variables"""
+        return cls(
+            pool_connections=int(os.getenv('HTTP_POOL_CONNECTIONS', '10')),
+            pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', '32')),
+            connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+            read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', '15')),
+        )
+
+    @property
+    def timeout(self):
+        """Default (connect, read) timeout tuple for requests"""
+        return (self.connect_timeout, self.read_timeout)
+
+    @property
+    def session(self):
+        """Pooled, keep-alive requests.Session shared by all synchronous callers"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = TimeoutHTTPAdapter(
+                        timeout=self.timeout,
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.verify = self.verify
+                    self._session = session
+        return self._session
+
+    def async_client(self):
+        """
+        Pooled httpx.AsyncClient for the bot engine loop.
+        Must be called from the loop that will use it.
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.pool_connections * self.pool_maxsize,
+                    max_keepalive_connections=self.pool_maxsize,
+                ),
+                verify=self.verify,
+                follow_redirects=True,
+            )
+        return self._async_client
+
+    def request(self, method, url, **kwargs):
+        # Pass verify per call: requests lets REQUESTS_CA_BUNDLE override session.verify
+        kwargs.setdefault("verify", self.verify)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """Close pooled sync connections (the async client is closed on its own loop)"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+# Process-wide transport used by app/main.py
+http_transport = HttpTransport.from_env()
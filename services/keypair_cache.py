@@ -0,0 +1,98 @@
+"""
+Decrypted keypair cache for the multi-user Solana trading bot
+
+Signing a trade used to re-read the wallet document from Mongo, rebuild a
+Fernet from the environment, decrypt the private key and construct a Keypair
+every time. The cache keeps ready-to-sign keypairs for running bots in a
+bounded, TTL-expiring map so the hot path costs neither a DB read nor a
+decryption. Entries are wiped when a bot stops or its user logs out.
+
+Clearing the secret from memory is best effort only. The loader hands over the
+decrypted secret in a bytearray, and that bytearray is zeroed as soon as the
+Keypair has been built. Other copies cannot be wiped: the immutable bytes that
+Fernet.decrypt returns, the bytes(...) copies keypair_from_secret makes for the
+Keypair constructors, and the key inside the Keypair itself. They stay in
+memory until they are garbage collected and their memory is reused. For the
+Keypair, that happens after its cache entry is dropped.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class KeypairCache:
+    def __init__(self, load_secret, build_keypair, ttl=900.0, max_entries=1000):
+        """
+        load_secret(user_id) returns the decrypted private key as a bytearray (or None
+        if the user has no wallet); build_keypair(secret) turns it into a signing Keypair
+        and must not keep a reference to the buffer.
+        """
+        self.load_secret = load_secret
+        self.build_keypair = build_keypair
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id):
+        """Return the user's Keypair, decrypting and caching it on a miss; None if there is no wallet"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                keypair, expires_at = entry
+                if expires_at > now:
+                    self.hits += 1
+                    self._entries.move_to_end(user_id)
+                    return keypair
+                del self._entries[user_id]
+                self.evictions += 1
+            self.misses += 1
+
+        secret = self.load_secret(user_id)
+        if secret is None:
+            return None
+        try:
+            keypair = self.build_keypair(secret)
+        finally:
+            wipe(secret)
+
+        with self._lock:
+            self._entries[user_id] = (keypair, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return keypair
+
+    def evict(self, user_id):
+        """Drop a user's cached keypair (bot stopped, user logged out)"""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached keypair"""
+        with self._lock:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        """Hit, miss and eviction counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "ttl": self.ttl,
+            }
+
+
+def wipe(buffer):
+    """Overwrite a mutable buffer holding secret material with zeros"""
+    if isinstance(buffer, bytearray):
+        buffer[:] = bytes(len(buffer))
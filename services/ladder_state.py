@@ -0,0 +1,128 @@
+"""
+Per-bot ladder state for the multi-user Solana trading bot
+
+Each user's trading state used to be a loose dict: buy_parts/sell_parts were
+lists of part indexes that were only ever measured with len(), and the recent
+transaction history was re-sliced into a new list on every trade. LadderState
+keeps the same fields in __slots__, the part lists as two integer counters and
+the last HISTORY_SIZE transactions in a fixed ring, so a bot costs one small
+object and a trade allocates nothing but its record.
+
+snapshot() builds the status payload for the API and the status stream from
+plain values, so callers can serialize or keep it while the bot moves on.
+"""
+
+# Recent transactions kept per bot for the dashboard (the trades collection has the rest)
+HISTORY_SIZE = 20
+
+
+class LadderState:
+    __slots__ = (
+        "is_running",
+        "last_action",          # 'buy' or 'sell'
+        "current_price",
+        "base_price",
+        "dynamic_base_price",
+        "total_profit",
+        "position",             # Tokens held
+        "avg_purchase_price",
+        "parts",                # Total number of parts
+        "part_size",            # Size of each part
+        "remaining_parts",      # Number of remaining parts to sell
+        "buy_parts",            # Buy opportunities left
+        "sell_parts",           # Sell opportunities left
+        "pending_trade",        # Submitted trade awaiting confirmation
+        "transaction_seq",      # Sequence number of the latest transaction record
+        "trading_mode",
+        "network",
+        "_history",
+    )
+
+    def __init__(self):
+        self.is_running = False
+        self.last_action = None
+        self.current_price = 0
+        self.base_price = None
+        self.dynamic_base_price = None
+        self.total_profit = 0
+        self.position = 0
+        self.avg_purchase_price = 0
+        self.parts = 0
+        self.part_size = 0
+        self.remaining_parts = 0
+        self.buy_parts = 0
+        self.sell_parts = 0
+        self.pending_trade = None
+        self.transaction_seq = 0
+        self.trading_mode = None
+        self.network = None
+        self._history = [None] * HISTORY_SIZE
+
+    def start(self, parts, part_size, trading_mode, network):
+        """Reset the ladder for a new run: every part available for buying and for selling"""
+        self.is_running = True
+        self.last_action = None
+        self.total_profit = 0
+        self.position = 0
+        self.avg_purchase_price = 0
+        self.pending_trade = None
+        self.parts = parts
+        self.part_size = part_size
+        self.buy_parts = parts
+        self.sell_parts = parts
+        self.trading_mode = trading_mode
+        self.network = network
+
+    def use_buy_part(self):
+        """A buy uses a buy opportunity and creates a sell opportunity (up to parts)"""
+        if self.buy_parts > 0:
+            self.buy_parts -= 1
+            if self.sell_parts < self.parts:
+                self.sell_parts += 1
+
+    def use_sell_part(self):
+        """A sell uses a sell opportunity and creates a buy opportunity (up to parts)"""
+        if self.sell_parts > 0:
+            self.sell_parts -= 1
+            if self.buy_parts < self.parts:
+                self.buy_parts += 1
+
+    def add_transaction(self, tx_record):
+        """Number a transaction record (sets its 'seq') and keep it in the recent history"""
+        self.transaction_seq += 1
+        tx_record['seq'] = self.transaction_seq
+        # Slot seq % size always holds the record with that seq; older ones are overwritten
+        self._history[self.transaction_seq % HISTORY_SIZE] = tx_record
+        return tx_record
+
+    @property
+    def transaction_history(self):
+        """Recent transaction records, oldest first (a new list)"""
+        first = max(1, self.transaction_seq - HISTORY_SIZE + 1)
+        return [self._history[seq % HISTORY_SIZE] for seq in range(first, self.transaction_seq + 1)]
+
+    def snapshot(self, include_history=True):
+        """Status payload for the dashboard; shares no mutable containers with the bot"""
+        status = {
+            "is_running": self.is_running,
+            "last_action": self.last_action,
+            "current_price": self.current_price,
+            "base_price": self.base_price,
+            # Before the first tick there is no dynamic base price to show
+            "dynamic_base_price": self.dynamic_base_price if self.dynamic_base_price is not None else 0,
+            "total_profit": self.total_profit,
+            "position": self.position,
+            "avg_purchase_price": self.avg_purchase_price,
+            "parts": self.parts,
+            "part_size": self.part_size,
+            "remaining_parts": self.remaining_parts,
+            "buy_parts_count": self.buy_parts,
+            "sell_parts_count": self.sell_parts,
+            "pending_trade": dict(self.pending_trade) if self.pending_trade is not None else None,
+            "transaction_seq": self.transaction_seq,
+            "trading_mode": self.trading_mode,
+            "network": self.network,
+        }
+        if include_history:
+            status["transaction_history"] = self.transaction_history
+        return status
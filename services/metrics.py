@@ -0,0 +1,167 @@
+"""
+Prometheus metrics for the multi-user Solana trading bot
+
+A small in-process registry of counters, gauges and histograms rendered in the
+Prometheus text exposition format for GET /metrics. It has no dependencies and
+is cheap enough for the bots' hot paths: label values are passed positionally
+and a histogram observation is one dict lookup, one bisect and a few increments
+under an uncontended lock (about a microsecond; benchmarks/bench_metrics.py
+measures it against the cost of a tick).
+
+MongoCommandMetrics is a pymongo command listener that times every database
+command; register it with pymongo.monitoring.register before the client is created.
+"""
+import bisect
+import math
+import threading
+
+try:
+    from pymongo import monitoring
+    CommandListener = monitoring.CommandListener
+except ImportError:
+    CommandListener = object
+
+# Seconds; from sub-millisecond bot work to multi-second confirmations and approvals
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=(), callback=None):
+        """callback(), if given, returns the value (or {label tuple: value}) at scrape time"""
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.callback = callback
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        if self.callback is not None:
+            value = self.callback()
+            with self._lock:
+                self._series = dict(value) if isinstance(value, dict) else {(): value}
+        with self._lock:
+            series = sorted(self._series.items())
+        return [f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}" for labels, value in series]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._series[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        # Per-bucket (not cumulative) counts plus sum and count; cumulated when rendered
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _samples(self):
+        with self._lock:
+            series = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items())
+        lines = []
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labels=(), callback=None):
+        return self._add(Counter(name, help_text, labels, callback))
+
+    def gauge(self, name, help_text, labels=(), callback=None):
+        return self._add(Gauge(name, help_text, labels, callback))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def render(self):
+        """Every metric in the Prometheus text format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MongoCommandMetrics(CommandListener):
+    """Times every MongoDB command (find, insert, update, aggregate...) by command name"""
+
+    def __init__(self, duration, failures):
+        self.duration = duration
+        self.failures = failures
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.duration.observe(event.duration_micros / 1e6, event.command_name)
+
+    def failed(self, event):
+        self.duration.observe(event.duration_micros / 1e6, event.command_name)
+        self.failures.inc(event.command_name)
@@ -0,0 +1,297 @@
+"""
+Ladder parameter sweeps for the multi-user Solana trading bot
+
+Evaluates many (up_percentage, down_percentage, parts) settings over one price
+series with the vectorized backtest and ranks them by realized PnL. The work
+is spread over a pool of forkserver processes. The price series is copied once
+into a shared memory block that every worker maps read-only, so only the small
+parameter chunks and result rows cross process boundaries - not millions of
+prices per task - and throughput grows with the number of cores.
+
+SweepJobs runs sweeps in the background for the API: submit() returns a job id
+straight away and get() reports progress and, when done, the ranked table.
+"""
+import itertools
+import multiprocessing
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from services.backtest import run_backtest
+from services.structured_log import get_logger
+
+log = get_logger("parameter_sweep")
+
+# Result row fields, in table order
+RESULT_FIELDS = ["rank", "up_percentage", "down_percentage", "parts", "buys", "sells",
+                 "total_profit", "fees", "max_drawdown"]
+
+# Worker-process globals set by _attach_prices
+_worker_shm = None
+_worker_prices = None
+
+
+def _range(spec):
+    """(low, step, count) of a {"min", "max", "step"} range (max inclusive)"""
+    low, high, step = spec['min'], spec['max'], spec.get('step', 1)
+    if step <= 0 or high < low:
+        raise ValueError(f"invalid range {spec}")
+    # The tolerance keeps max itself in the range when (max - min) / step lands just below an integer
+    return low, step, int((high - low) / step + 1e-9) + 1
+
+
+def count_values(spec):
+    """Number of values expand_values would give for spec, without building them"""
+    if isinstance(spec, dict):
+        return _range(spec)[2]
+    if isinstance(spec, (list, tuple)):
+        return len(spec)
+    return 1
+
+
+def count_combinations(up_spec, down_spec, parts_spec, samples=None):
+    """Settings a sweep will evaluate: samples, or the size of the full grid"""
+    if samples:
+        return int(samples)
+    return count_values(up_spec) * count_values(down_spec) * count_values(parts_spec)
+
+
+def expand_values(spec, integer=False):
+    """
+    Values to try for one parameter: a list of values, a single number, or a
+    {"min", "max", "step"} range (max inclusive). Check count_values first:
+    a fine step over a wide range is a lot of values.
+    """
+    if isinstance(spec, dict):
+        low, step, count = _range(spec)
+        values = [round(low + step * n, 10) for n in range(count)]
+    elif isinstance(spec, (list, tuple)):
+        values = list(spec)
+    else:
+        values = [spec]
+    if not values:
+        raise ValueError("no values to sweep")
+    return [int(value) for value in values] if integer else [float(value) for value in values]
+
+
+def _bounds(spec):
+    """(lowest, highest) value of a spec, without expanding a range"""
+    if isinstance(spec, dict):
+        low, step, count = _range(spec)
+        return float(low), float(round(low + step * (count - 1), 10))
+    values = expand_values(spec)
+    return min(values), max(values)
+
+
+def _pick(spec, rng):
+    """One of a spec's values at random (as an int), without expanding a range"""
+    if isinstance(spec, dict):
+        low, step, count = _range(spec)
+        return int(round(low + step * rng.randrange(count), 10))
+    return rng.choice(expand_values(spec, integer=True))
+
+
+def check_parameters(up_spec, down_spec, parts_spec):
+    """Raise ValueError unless every swept up/down percentage is positive and every parts value at least 1"""
+    for name, spec in (("up_percentage", up_spec), ("down_percentage", down_spec)):
+        if _bounds(spec)[0] <= 0:
+            raise ValueError(f"{name} values must be greater than 0")
+    if _bounds(parts_spec)[0] < 1:
+        raise ValueError("parts values must be at least 1")
+
+
+def parameter_grid(up_spec, down_spec, parts_spec):
+    """Every combination of the swept values as (up_percentage, down_percentage, parts) tuples"""
+    return list(itertools.product(expand_values(up_spec), expand_values(down_spec),
+                                  expand_values(parts_spec, integer=True)))
+
+
+def sample_parameters(up_spec, down_spec, parts_spec, samples, seed=None):
+    """
+    samples random combinations: up/down drawn uniformly between the lowest and highest
+    value of their spec, parts picked from its values
+    """
+    rng = random.Random(seed)
+    up_low, up_high = _bounds(up_spec)
+    down_low, down_high = _bounds(down_spec)
+    return [
+        (round(rng.uniform(up_low, up_high), 4),
+         round(rng.uniform(down_low, down_high), 4),
+         _pick(parts_spec, rng))
+        for _ in range(samples)
+    ]
+
+
+def _attach_prices(name, length):
+    """Process pool initializer: map the shared price series into this worker"""
+    global _worker_shm, _worker_prices
+    # Attach only; the parent created the block and unlinks it when the sweep ends
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_prices = np.ndarray((length,), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_prices.flags.writeable = False
+
+
+def _evaluate(params, trade_amount, prices=None):
+    """Backtest a chunk of (up, down, parts) settings; runs in a worker (or inline)"""
+    prices = _worker_prices if prices is None else prices
+    rows = []
+    for up_percentage, down_percentage, parts in params:
+        result = run_backtest(prices, up_percentage, down_percentage, parts, trade_amount, record_fills=False)
+        rows.append({
+            "up_percentage": up_percentage,
+            "down_percentage": down_percentage,
+            "parts": parts,
+            "buys": result['buys'],
+            "sells": result['sells'],
+            "total_profit": result['total_profit'],
+            "fees": result['fees'],
+            "max_drawdown": result['max_drawdown'],
+        })
+    return rows
+
+
+def rank_results(rows):
+    """Sort by realized PnL (best first, smaller mark-to-market drawdown breaks ties) and number the rows"""
+    ranked = sorted(rows, key=lambda row: (-row['total_profit'], row['max_drawdown']))
+    for rank, row in enumerate(ranked, 1):
+        row['rank'] = rank
+    return ranked
+
+
+def _worker_context():
+    """
+    Start method for sweep workers. fork is not used: sweeps run from the
+    multithreaded Flask process, and a forked child can inherit a lock (logging,
+    trade journal) held by another thread and deadlock on it. The forkserver
+    (spawn where there is none) starts clean single-threaded processes instead.
+    It preloads only this module, so NumPy and the backtest are imported once.
+    Each worker still runs the entry script as __mp_main__, as with spawn, so
+    that script must not start anything on import under that name (app/main.py
+    skips init_app() there).
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def run_sweep(prices, params, trade_amount, workers=None, chunk_size=None, progress=None):
+    """
+    Backtest every (up_percentage, down_percentage, parts) in params over prices and
+    return the ranked rows. workers defaults to the CPU count; workers=1 runs inline.
+    progress(done, total) is called as chunks finish.
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+    total = len(params)
+    if not total:
+        return []
+    if workers == 1:
+        rows = _evaluate(params, trade_amount, prices)
+        if progress:
+            progress(total, total)
+        return rank_results(rows)
+
+    # A few chunks per worker keeps every core busy without one task per setting
+    chunk_size = chunk_size or max(1, min(64, -(-total // (workers * 4))))
+    chunks = [params[start:start + chunk_size] for start in range(0, total, chunk_size)]
+
+    shm = shared_memory.SharedMemory(create=True, size=max(prices.nbytes, 1))
+    try:
+        np.ndarray(prices.shape, dtype=np.float64, buffer=shm.buf)[:] = prices
+        context = _worker_context()
+        rows = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_attach_prices, initargs=(shm.name, len(prices))) as pool:
+            futures = [pool.submit(_evaluate, chunk, trade_amount) for chunk in chunks]
+            for future in as_completed(futures):
+                rows.extend(future.result())
+                if progress:
+                    progress(len(rows), total)
+    finally:
+        shm.close()
+        shm.unlink()
+    return rank_results(rows)
+
+
+class SweepJobs:
+    def __init__(self, workers=None, max_combinations=100000, max_jobs=50):
+        self.workers = workers
+        self.max_combinations = max_combinations
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()  # job_id -> job dict
+        self._lock = threading.Lock()
+        # One sweep at a time already uses every core; later ones queue behind it
+        self._run_lock = threading.Lock()
+
+    def check_size(self, combinations):
+        """Raise ValueError if a sweep of this many settings is over the limit (check before building them)"""
+        if combinations > self.max_combinations:
+            raise ValueError(f"{combinations} combinations exceeds the limit of {self.max_combinations}")
+
+    def submit(self, user_id, prices, params, trade_amount, top=50):
+        """Start a sweep in the background; returns the job id. Raises ValueError on bad input."""
+        self.check_size(len(params))
+        if len(prices) < 2:
+            raise ValueError("need at least 2 prices")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "user_id": user_id,
+            "status": "queued",
+            "combinations": len(params),
+            "completed": 0,
+            "ticks": len(prices),
+            "trade_amount": trade_amount,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "results": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            # Forget the oldest finished jobs
+            while len(self._jobs) > self.max_jobs:
+                oldest = next((key for key, value in self._jobs.items() if value['status'] in ('done', 'failed')), None)
+                if oldest is None:
+                    break
+                del self._jobs[oldest]
+
+        threading.Thread(target=self._run, args=(job, prices, params, trade_amount, top),
+                         name=f"sweep-{job_id[:8]}", daemon=True).start()
+        return job_id
+
+    def get(self, user_id, job_id):
+        """Copy of a user's job, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['user_id'] != user_id:
+                return None
+            return dict(job)
+
+    def _run(self, job, prices, params, trade_amount, top):
+        def progress(done, total):
+            job['completed'] = done
+
+        with self._run_lock:
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+            try:
+                rows = run_sweep(prices, params, trade_amount, workers=self.workers, progress=progress)
+                job['results'] = rows[:top] if top else rows
+                job['status'] = 'done'
+            except Exception as e:
+                log.error("Parameter sweep failed", job_id=job['id'], error=str(e))
+                job['error'] = str(e)
+                job['status'] = 'failed'
+            job['finished_at'] = time.time()
@@ -0,0 +1,172 @@
+"""
+Shared price feed for the multi-user Solana trading bot
+
+Every running bot used to poll Jupiter on its own, so N bots trading the same
+pair made N identical quote calls per tick. The hub keeps one poller per
+(inputMint, outputMint, amount) and fans each price out to every subscribed bot,
+so upstream call volume grows with the number of distinct pairs instead.
+
+The hub lives on the bot engine's event loop: pollers are asyncio tasks and
+subscribe/unsubscribe/next must be called from that loop.
+"""
+import asyncio
+import time
+
+from services.structured_log import get_logger
+
+log = get_logger("price_hub")
+
+
+class PriceSubscription:
+    """A bot's handle on a shared price feed"""
+
+    def __init__(self, hub, key):
+        self.hub = hub
+        self.key = key
+        self.last_seq = 0
+        self.closed = False
+
+    async def next(self, timeout=None):
+        """
+        Wait until a tick newer than the last one seen is available and return it.
+        Returns None on timeout or once the subscription has been closed.
+        """
+        tick = await self.hub._wait_for_tick(self, timeout)
+        if tick is not None:
+            self.last_seq = tick['seq']
+        return tick
+
+    def close(self):
+        """Unsubscribe from the feed"""
+        self.hub.unsubscribe(self)
+
+
+class _PriceFeed:
+    """Latest tick and subscriber set for a single pair"""
+
+    def __init__(self, key):
+        self.key = key
+        self.subscribers = set()
+        self.latest = None
+        self.seq = 0
+        self.upstream_calls = 0
+        self.deliveries = 0
+        self.task = None
+        self.updated = asyncio.Event()
+
+    def wake(self):
+        """Wake every subscriber currently waiting on this feed"""
+        self.updated.set()
+        self.updated = asyncio.Event()
+
+
+class PriceHub:
+    def __init__(self, fetch_price, interval=5.0, on_tick=None):
+        """
+        fetch_price(input_mint, output_mint, amount) is a coroutine function that must
+        return the same dict shape as app.main.get_jupiter_price_async:
+        {"price", "success", ["quote_data" | "message"]}
+        on_tick(input_mint, output_mint, amount, tick), if given, is called on the loop
+        with every successful tick (e.g. TickRecorder.record); it must not block.
+        """
+        self.fetch_price = fetch_price
+        self.interval = interval
+        self.on_tick = on_tick
+        self._feeds = {}
+
+    def subscribe(self, input_mint, output_mint, amount=1000000000):
+        """Subscribe to a pair, starting its poller if this is the first subscriber"""
+        key = (input_mint, output_mint, int(amount))
+        subscription = PriceSubscription(self, key)
+
+        feed = self._feeds.get(key)
+        if feed is None:
+            feed = _PriceFeed(key)
+            self._feeds[key] = feed
+        feed.subscribers.add(subscription)
+
+        if feed.task is None:
+            feed.task = asyncio.get_running_loop().create_task(self._poll(feed))
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscriber; the pair's poller exits once nobody is listening"""
+        subscription.closed = True
+        feed = self._feeds.get(subscription.key)
+        if feed is not None:
+            feed.subscribers.discard(subscription)
+            # Wake the subscriber if it is waiting in next()
+            feed.wake()
+
+    def latest(self, input_mint, output_mint, amount=1000000000):
+        """Return the most recent tick for a pair without waiting, or None"""
+        feed = self._feeds.get((input_mint, output_mint, int(amount)))
+        return feed.latest if feed else None
+
+    def stats(self):
+        """Per-pair subscriber, upstream call and delivery counts"""
+        return [
+            {
+                "input_mint": key[0],
+                "output_mint": key[1],
+                "amount": key[2],
+                "subscribers": len(feed.subscribers),
+                "upstream_calls": feed.upstream_calls,
+                "deliveries": feed.deliveries,
+                "polling": feed.task is not None,
+            }
+            for key, feed in list(self._feeds.items())
+        ]
+
+    async def _wait_for_tick(self, subscription, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not subscription.closed:
+            feed = self._feeds.get(subscription.key)
+            if feed is None:
+                return None
+            if feed.seq > subscription.last_seq:
+                feed.deliveries += 1
+                return feed.latest
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(feed.updated.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+        return None
+
+    async def _poll(self, feed):
+        input_mint, output_mint, amount = feed.key
+
+        while feed.subscribers:
+            started = time.monotonic()
+            try:
+                result = await self.fetch_price(input_mint, output_mint, amount)
+            except Exception as e:
+                result = {"price": 0.0, "success": False, "message": str(e)}
+
+            tick = dict(result)
+            tick['fetched_at'] = time.monotonic()
+
+            feed.upstream_calls += 1
+            feed.seq += 1
+            tick['seq'] = feed.seq
+            feed.latest = tick
+            feed.wake()
+
+            if self.on_tick is not None and tick.get('success'):
+                try:
+                    self.on_tick(input_mint, output_mint, amount, tick)
+                except Exception as e:
+                    log.error("Price tick hook failed", input_mint=input_mint, output_mint=output_mint, error=str(e))
+
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+        # Nobody is listening any more - retire the poller and the feed
+        feed.task = None
+        if self._feeds.get(feed.key) is feed:
+            del self._feeds[feed.key]
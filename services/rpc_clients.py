@@ -0,0 +1,185 @@
+"""
+Solana RPC client registry for the multi-user Solana trading bot
+
+Swaps and withdrawals used to build a new solana Client (and work out the
+Helius/public URL again) on every call, and the solana library posts each RPC
+request on a brand-new connection. The registry keeps one long-lived Client per
+network whose requests go through the shared pooled HTTP transport, so swap and
+withdrawal latency no longer includes client setup or connection warm-up. It
+also counts calls, errors and time spent per (network, RPC method), and can
+report each call to an on_call hook (the app's /metrics histograms).
+"""
+import json
+import os
+import threading
+import time
+
+import requests
+
+from services.structured_log import get_logger
+
+try:
+    from solana.rpc.api import Client
+    from solana.rpc.providers.http import HTTPProvider
+except ImportError:
+    Client = None
+    HTTPProvider = object
+
+log = get_logger("rpc_clients")
+
+
+PUBLIC_RPC_URLS = {
+    "mainnet": "https://api.mainnet-beta.solana.com",
+    "devnet": "https://api.devnet.solana.com",
+    "testnet": "https://api.testnet.solana.com",
+}
+
+
+class _PooledHTTPProvider(HTTPProvider):
+    """solana HTTPProvider that posts through the registry's shared session instead of a new connection per call"""
+
+    def __init__(self, registry, network, endpoint, timeout):
+        super().__init__(endpoint, timeout=timeout)
+        self.registry = registry
+        self.network = network
+
+    def make_request_unparsed(self, body):
+        request_kwargs = self._before_request(body=body)
+        method = json.loads(request_kwargs["content"]).get("method", "unknown")
+        return self.registry._post(self.network, method, request_kwargs, self.timeout)
+
+    def make_batch_request_unparsed(self, reqs):
+        request_kwargs = self._before_batch_request(reqs)
+        return self.registry._post(self.network, "batch", request_kwargs, self.timeout)
+
+
+class RpcClientRegistry:
+    def __init__(self, transport, helius_api_key=None, timeout=30, on_call=None):
+        """on_call(network, method, seconds, ok), if given, is called after every RPC request"""
+        self.transport = transport
+        self.on_call = on_call
+        self.helius_api_key = helius_api_key
+        self.timeout = timeout
+        self._clients = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def rpc_url(self, network="mainnet"):
+        """
+        RPC endpoint for a network: SOLANA_RPC_URL_<NETWORK> if set, else Helius
+        when an API key is configured, else the public Solana endpoint.
+        """
+        network = (network or "mainnet").lower()
+        if network not in PUBLIC_RPC_URLS:
+            network = "mainnet"
+
+        override = os.getenv(f"SOLANA_RPC_URL_{network.upper()}")
+        if override:
+            return override
+        if self.helius_api_key:
+            return f"https://{network}.helius-rpc.com/?api-key={self.helius_api_key}"
+        return PUBLIC_RPC_URLS[network]
+
+    def client(self, network="mainnet"):
+        """Long-lived solana Client for a network, created on first use"""
+        network = (network or "mainnet").lower()
+        client = self._clients.get(network)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(network)
+                if client is None:
+                    endpoint = self.rpc_url(network)
+                    client = Client(endpoint, timeout=self.timeout)
+                    client._provider = _PooledHTTPProvider(self, network, endpoint, self.timeout)
+                    self._clients[network] = client
+        return client
+
+    def call(self, network, payload):
+        """
+        Send a raw JSON-RPC payload (a single request dict or a batch list) through the
+        shared session and return the decoded JSON response.
+        """
+        if isinstance(payload, list):
+            # Labelled by the methods it carries, e.g. "getBalance+getTokenAccountsByOwner"
+            method = "+".join(sorted({item.get("method", "unknown") for item in payload})) or "batch"
+        else:
+            method = payload.get("method", "unknown")
+
+        request_kwargs = {
+            "url": self.rpc_url(network),
+            "headers": {"Content-Type": "application/json"},
+            "content": json.dumps(payload),
+        }
+        return json.loads(self._post(network, method, request_kwargs, self.timeout))
+
+    def call_batch(self, network, payloads):
+        """
+        Send several JSON-RPC requests in one round trip and return their responses in
+        request order (matched by id). Falls back to one call per request if the node
+        rejects batches.
+        """
+        if not payloads:
+            return []
+
+        try:
+            response = self.call(network, list(payloads))
+        except requests.HTTPError:
+            response = None
+        if not isinstance(response, list):
+            # Batch not supported (or rejected as a whole) - send individually
+            return [self.call(network, payload) for payload in payloads]
+
+        by_id = {item.get("id"): item for item in response if isinstance(item, dict)}
+        missing = {"error": {"code": -32603, "message": "No response for request in batch"}}
+        return [by_id.get(payload.get("id"), missing) for payload in payloads]
+
+    def warm_up(self, network="mainnet"):
+        """Open a pooled connection to the network's RPC node ahead of the first trade"""
+        try:
+            self.call(network, {"jsonrpc": "2.0", "id": 1, "method": "getHealth"})
+        except Exception as e:
+            log.warning("RPC warm-up failed", network=network, error=str(e))
+
+    def stats(self):
+        """Call, error and latency counters per (network, RPC method)"""
+        with self._lock:
+            return [
+                {
+                    "network": network,
+                    "method": method,
+                    "calls": counter["calls"],
+                    "errors": counter["errors"],
+                    "avg_ms": round(counter["seconds"] / counter["calls"] * 1000, 3) if counter["calls"] else 0.0,
+                }
+                for (network, method), counter in sorted(self._counters.items())
+            ]
+
+    def _record(self, network, method, elapsed, ok):
+        with self._lock:
+            counter = self._counters.get((network, method))
+            if counter is None:
+                counter = {"calls": 0, "errors": 0, "seconds": 0.0}
+                self._counters[(network, method)] = counter
+            counter["calls"] += 1
+            counter["seconds"] += elapsed
+            if not ok:
+                counter["errors"] += 1
+        if self.on_call is not None:
+            self.on_call(network, method, elapsed, ok)
+
+    def _post(self, network, method, request_kwargs, timeout):
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = self.transport.post(
+                request_kwargs["url"],
+                headers=request_kwargs["headers"],
+                data=request_kwargs["content"],
+                timeout=(self.transport.connect_timeout, timeout),
+            )
+            response.raise_for_status()
+            # JSON-RPC errors (e.g. a rejected sendTransaction) come back as HTTP 200
+            ok = '"error"' not in response.text
+            return response.text
+        finally:
+            self._record(network, method, time.perf_counter() - started, ok)
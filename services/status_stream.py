@@ -0,0 +1,100 @@
+"""
+Trading status change notifications for the multi-user Solana trading bot
+
+The dashboard used to poll /api/trading-status every 2 seconds whether or not
+anything had changed. Bots now publish when their state actually changes (price
+tick, trade, part counts, start/stop) and every open status stream for that user
+wakes up and sends the new state, so idle dashboards cost no requests and no CPU.
+
+Each user has their own condition so a publish only wakes that user's streams.
+publish() is cheap enough to call from the bot engine loop; wait() blocks a
+Flask worker thread until the user's version moves on.
+
+The version doubles as the status ETag for polling clients. The last few status
+snapshots served per user are kept so a client that sends the version it holds
+can get a 304, or just the fields that changed since then.
+"""
+import threading
+from collections import OrderedDict
+
+
+class _UserChannel:
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+        self.snapshots = OrderedDict()
+
+
+class StatusBroadcaster:
+    def __init__(self, max_snapshots=16):
+        self.max_snapshots = max_snapshots
+        self._channels = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.streams = 0
+
+    def _channel(self, user_id):
+        channel = self._channels.get(user_id)
+        if channel is None:
+            with self._lock:
+                channel = self._channels.setdefault(user_id, _UserChannel())
+        return channel
+
+    def version(self, user_id):
+        """Current status version for a user (0 before the first change)"""
+        return self._channel(user_id).version
+
+    def publish(self, user_id):
+        """Record that a user's trading state changed and wake their streams; returns the new version"""
+        channel = self._channel(user_id)
+        with channel.condition:
+            channel.version += 1
+            version = channel.version
+            channel.condition.notify_all()
+        self.published += 1
+        return version
+
+    def wait(self, user_id, last_version, timeout):
+        """
+        Block until the user's version is newer than last_version or timeout seconds
+        pass. Returns the current version either way.
+        """
+        channel = self._channel(user_id)
+        with channel.condition:
+            channel.condition.wait_for(lambda: channel.version > last_version, timeout)
+            return channel.version
+
+    def remember(self, user_id, version, snapshot):
+        """
+        Keep the status served at a version so later requests can be answered relative
+        to it. If a different snapshot was already served for that version (state changed
+        before it was published), the version is marked ambiguous and never used as a base.
+        """
+        channel = self._channel(user_id)
+        with channel.condition:
+            if version in channel.snapshots:
+                if channel.snapshots[version] != snapshot:
+                    channel.snapshots[version] = None
+                return
+            channel.snapshots[version] = snapshot
+            while len(channel.snapshots) > self.max_snapshots:
+                channel.snapshots.popitem(last=False)
+
+    def snapshot(self, user_id, version):
+        """Snapshot served at a version, or None if unknown, evicted or ambiguous"""
+        channel = self._channel(user_id)
+        with channel.condition:
+            return channel.snapshots.get(version)
+
+    def stream_opened(self):
+        with self._lock:
+            self.streams += 1
+
+    def stream_closed(self):
+        with self._lock:
+            self.streams -= 1
+
+    def stats(self):
+        """Open streams and total published changes"""
+        with self._lock:
+            return {"open_streams": self.streams, "published": self.published, "users": len(self._channels)}
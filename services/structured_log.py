@@ -0,0 +1,182 @@
+"""
+Structured logging for the multi-user Solana trading bot
+
+Every line is one JSON object:
+
+    {"time": "2026-10-17T09:30:00.123+00:00", "level": "info", "logger": "trading_bot.bot",
+     "msg": "Got price", "user_id": "...", "token": "...", "generation": 3, "price": 142.1}
+
+Callers never touch stdout. A log call builds a LogRecord and puts it on a
+bounded queue without blocking; one writer thread formats the JSON and writes
+it. If the writer falls behind and the queue fills up, new lines are dropped
+and counted rather than stalling a bot.
+
+get_logger(name, **context) returns a logger whose keyword arguments become
+fields of the line (log.info("Swap submitted", signature=sig)). bind(**context)
+adds fields to every line of the returned logger; each bot binds its user_id,
+token and generation. tick() is for messages a bot would otherwise write on
+every price tick: each message is written at most once per tick_interval
+seconds per logger, with the number of skipped ones in "skipped".
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+ROOT_LOGGER = "trading_bot"
+
+# Keyword arguments of Logger.log itself; anything else passed to a log call is a field
+_LOG_KWARGS = frozenset(("exc_info", "stack_info", "stacklevel", "extra"))
+
+
+class JsonFormatter(logging.Formatter):
+    """A record as one line of JSON: time, level, logger, msg, then its fields"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is when the line is written, as print did"""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue, on_drop):
+        super().__init__(log_queue)
+        self.on_drop = on_drop
+
+    def prepare(self, record):
+        # Formatting happens on the writer thread, not in the caller
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.on_drop()
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger whose keyword arguments and bound context become JSON fields"""
+
+    def __init__(self, logger, context=None):
+        super().__init__(logger, context or {})
+        # msg -> [monotonic time the next one may be written, number skipped since the last one]
+        self._ticks = {}
+
+    def bind(self, **context):
+        """A logger that adds context to every line on top of this one's"""
+        return StructuredLogger(self.logger, {**self.extra, **context})
+
+    def process(self, msg, kwargs):
+        fields = dict(self.extra)
+        for key in [key for key in kwargs if key not in _LOG_KWARGS]:
+            fields[key] = kwargs.pop(key)
+        kwargs["extra"] = {**kwargs.get("extra", {}), "fields": fields}
+        return msg, kwargs
+
+    def tick(self, msg, level=logging.INFO, **fields):
+        """Log a per-tick message at most once per tick_interval seconds (per message, per logger)"""
+        now = time.monotonic()
+        state = self._ticks.get(msg)
+        if state is None:
+            state = self._ticks[msg] = [0.0, 0]
+        if now < state[0]:
+            state[1] += 1
+            return
+        state[0] = now + _settings["tick_interval"]
+        if state[1]:
+            fields["skipped"] = state[1]
+            state[1] = 0
+        self.log(level, msg, **fields)
+
+
+_settings = {"tick_interval": 10.0}
+_lock = threading.Lock()
+_queue = None
+_listener = None
+_dropped = 0
+
+
+def _count_drop():
+    global _dropped
+    with _lock:
+        _dropped += 1
+
+
+def configure(level="INFO", tick_interval=10.0, queue_size=10000):
+    """Send every trading_bot.* logger through the queue to JSON lines on stdout (call once at startup)"""
+    global _queue, _listener
+    with _lock:
+        first = _listener is None
+        if not first:
+            _listener.stop()
+        _settings["tick_interval"] = tick_interval
+        _queue = queue.Queue(maxsize=queue_size)
+        writer = _StdoutHandler()
+        writer.setFormatter(JsonFormatter())
+        _listener = logging.handlers.QueueListener(_queue, writer)
+        _listener.start()
+
+        root = logging.getLogger(ROOT_LOGGER)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_QueueHandler(_queue, _count_drop))
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+        root.propagate = False
+    if first:
+        atexit.register(shutdown)
+
+
+def get_logger(name, **context):
+    """Logger trading_bot.<name>, with context added to every line"""
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"), context)
+
+
+def flush(timeout=None):
+    """Block until every line queued so far is written; returns False on timeout"""
+    log_queue = _queue
+    if log_queue is None:
+        return True
+    with log_queue.all_tasks_done:
+        return log_queue.all_tasks_done.wait_for(lambda: not log_queue.unfinished_tasks, timeout)
+
+
+def shutdown(timeout=5.0):
+    """Write out queued lines and stop the writer thread"""
+    global _listener
+    flush(timeout)
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def stats():
+    """Lines waiting to be written and lines dropped because the queue was full"""
+    with _lock:
+        return {"queued": _queue.qsize() if _queue is not None else 0, "dropped": _dropped}
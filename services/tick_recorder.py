@@ -0,0 +1,268 @@
+"""
+On-disk price tick recorder for the multi-user Solana trading bot
+
+Every price the hub fetches used to be dropped after the bots' threshold
+checks. The recorder appends each successful tick as a fixed-width binary
+record (TICK_DTYPE: wall-clock timestamp, pair id, price, quote in/out amount)
+to one segment file per pair per UTC day:
+
+    <directory>/index.json                  pair ids and the days each pair has
+    <directory>/<pair_id>/<YYYY-MM-DD>.ticks
+
+record() only appends to an in-memory list, so it is safe to call from the bot
+engine loop; a background thread writes the pending ticks every flush_interval
+seconds.
+
+TickStore reads segments through np.memmap: a day of one pair is a NumPy
+structured array backed by the file itself, and a time range inside a day is a
+slice of it, so backtests and charts get millions of ticks without copying,
+parsing JSON or calling Jupiter again. Only ranges spanning several days are
+concatenated.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from services.structured_log import get_logger
+
+log = get_logger("tick_recorder")
+
+# One tick on disk: 36 bytes, little-endian, no padding
+TICK_DTYPE = np.dtype([
+    ("timestamp", "<f8"),   # Unix seconds
+    ("pair", "<u4"),        # Pair id from index.json
+    ("price", "<f8"),
+    ("in_amount", "<u8"),   # Quote inAmount (0 if unknown)
+    ("out_amount", "<u8"),  # Quote outAmount (0 if unknown)
+])
+
+INDEX_FILE = "index.json"
+SEGMENT_SUFFIX = ".ticks"
+
+
+def segment_day(timestamp):
+    """UTC day (YYYY-MM-DD) a Unix timestamp belongs to"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _pair_name(input_mint, output_mint, amount):
+    return f"{input_mint}/{output_mint}/{int(amount)}"
+
+
+class _Index:
+    """pair name -> id and the segment days of each pair, persisted as index.json"""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, INDEX_FILE)
+        self.pairs = {}     # pair name -> id
+        self.segments = {}  # pair id -> sorted list of days
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.pairs = {pair['name']: int(pair_id) for pair_id, pair in data.get('pairs', {}).items()}
+        self.segments = {int(pair_id): list(days) for pair_id, days in data.get('segments', {}).items()}
+
+    def save(self):
+        data = {
+            "record_size": TICK_DTYPE.itemsize,
+            "fields": list(TICK_DTYPE.names),
+            "pairs": {
+                str(pair_id): dict(zip(("input_mint", "output_mint", "amount"), name.split("/")), name=name)
+                for name, pair_id in self.pairs.items()
+            },
+            "segments": {str(pair_id): days for pair_id, days in sorted(self.segments.items())},
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f, indent=1)
+        # Readers never see a half-written index
+        os.replace(temp_path, self.path)
+
+
+class TickRecorder:
+    def __init__(self, directory, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+        self._index = _Index(directory)
+        self._pending = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.recorded = 0
+        self.written = 0
+        self.write_errors = 0
+
+    def pair_id(self, input_mint, output_mint, amount):
+        """Id of a pair, assigning a new one the first time it is seen"""
+        name = _pair_name(input_mint, output_mint, amount)
+        with self._lock:
+            pair_id = self._index.pairs.get(name)
+            if pair_id is None:
+                pair_id = len(self._index.pairs)
+                self._index.pairs[name] = pair_id
+            return pair_id
+
+    def record(self, input_mint, output_mint, amount, tick, timestamp=None):
+        """Queue a successful price tick (a PriceHub tick dict) for writing; never blocks on disk"""
+        quote = tick.get('quote_data') or {}
+        row = (
+            time.time() if timestamp is None else timestamp,
+            self.pair_id(input_mint, output_mint, amount),
+            float(tick['price']),
+            int(quote.get('inAmount') or 0),
+            int(quote.get('outAmount') or 0),
+        )
+        with self._lock:
+            self._pending.append(row)
+            self.recorded += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="tick-recorder", daemon=True)
+                self._thread.start()
+
+    def flush(self):
+        """Write every pending tick now; returns how many were written"""
+        with self._write_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+
+            records = np.array(rows, dtype=TICK_DTYPE)
+            days = np.array([segment_day(timestamp) for timestamp in records['timestamp']])
+            index_changed = False
+            try:
+                for pair_id in np.unique(records['pair']):
+                    for day in np.unique(days[records['pair'] == pair_id]):
+                        selected = records[(records['pair'] == pair_id) & (days == day)]
+                        pair_dir = os.path.join(self.directory, str(pair_id))
+                        os.makedirs(pair_dir, exist_ok=True)
+                        with open(os.path.join(pair_dir, day + SEGMENT_SUFFIX), "ab") as f:
+                            f.write(selected.tobytes())
+                        with self._lock:
+                            pair_days = self._index.segments.setdefault(int(pair_id), [])
+                            if day not in pair_days:
+                                pair_days.append(day)
+                                pair_days.sort()
+                                index_changed = True
+                with self._lock:
+                    if index_changed:
+                        self._index.save()
+                    self.written += len(records)
+            except OSError as e:
+                with self._lock:
+                    self.write_errors += 1
+                log.error("Tick recorder failed to write ticks", ticks=len(records), error=str(e))
+                return 0
+            return len(records)
+
+    def close(self):
+        """Write what is pending and stop the writer (call at shutdown)"""
+        self._stop.set()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "recorded": self.recorded,
+                "written": self.written,
+                "write_errors": self.write_errors,
+                "pairs": len(self._index.pairs),
+            }
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+class TickStore:
+    """Read-only, memory-mapped access to recorded ticks"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _index(self):
+        # Re-read each time so a long-lived store sees pairs and days the recorder added
+        return _Index(self.directory)
+
+    def pairs(self):
+        """Recorded pairs with their ids and first/last day"""
+        index = self._index()
+        result = []
+        for name, pair_id in sorted(index.pairs.items(), key=lambda item: item[1]):
+            input_mint, output_mint, amount = name.split("/")
+            days = index.segments.get(pair_id, [])
+            result.append({
+                "pair": pair_id,
+                "input_mint": input_mint,
+                "output_mint": output_mint,
+                "amount": int(amount),
+                "first_day": days[0] if days else None,
+                "last_day": days[-1] if days else None,
+            })
+        return result
+
+    def segment(self, pair_id, day):
+        """One pair's ticks for one UTC day as a read-only memory-mapped array (empty if none)"""
+        path = os.path.join(self.directory, str(pair_id), day + SEGMENT_SUFFIX)
+        try:
+            count = os.path.getsize(path) // TICK_DTYPE.itemsize
+        except OSError:
+            count = 0
+        if count == 0:
+            return np.empty(0, dtype=TICK_DTYPE)
+        # A record cut short by a crash mid-write is left out
+        return np.memmap(path, dtype=TICK_DTYPE, mode="r", shape=(count,))
+
+    def iter_segments(self, input_mint, output_mint, amount=1000000000, start=None, end=None):
+        """
+        Yield a pair's ticks with start <= timestamp < end (Unix seconds or datetimes),
+        one memory-mapped slice per day - no copies
+        """
+        index = self._index()
+        pair_id = index.pairs.get(_pair_name(input_mint, output_mint, amount))
+        if pair_id is None:
+            return
+        start, end = _unix(start), _unix(end)
+        first_day = segment_day(start) if start is not None else None
+        last_day = segment_day(end) if end is not None else None
+
+        for day in index.segments.get(pair_id, []):
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            ticks = self.segment(pair_id, day)
+            timestamps = ticks['timestamp']
+            # Ticks are appended in time order, so a range is a slice
+            low = int(np.searchsorted(timestamps, start, 'left')) if start is not None else 0
+            high = int(np.searchsorted(timestamps, end, 'left')) if end is not None else len(ticks)
+            if high > low:
+                yield ticks[low:high]
+
+    def read(self, input_mint, output_mint, amount=1000000000, start=None, end=None):
+        """A pair's ticks in a time range as one array (a zero-copy view when it falls in a single day)"""
+        segments = list(self.iter_segments(input_mint, output_mint, amount, start, end))
+        if not segments:
+            return np.empty(0, dtype=TICK_DTYPE)
+        if len(segments) == 1:
+            return segments[0]
+        return np.concatenate(segments)
+
+
+def _unix(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if value.tzinfo is None:
+        # Naive datetimes are UTC, like the rest of the app
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
@@ -0,0 +1,148 @@
+"""
+Trade approvals for the multi-user Solana trading bot
+
+In user trading mode a bot used to poll a per-user queue every 0.5 s while it
+waited for the user to approve a trade, and any message for a different trade
+was consumed and dropped. Each approval request now owns a future on the bot
+engine loop: approve/reject (called from Flask threads) resolve it directly, so
+the waiting bot wakes immediately, and a decision made before the bot starts
+waiting is kept on the future rather than lost.
+"""
+import asyncio
+import threading
+import time
+
+
+class _PendingApproval:
+    def __init__(self, request, future, requested_at):
+        self.request = request
+        self.future = future
+        self.requested_at = requested_at
+        self.resolved_at = None
+
+
+class TradeApprovals:
+    def __init__(self):
+        self._pending = {}  # user_id -> {trade_id: _PendingApproval}
+        self._lock = threading.Lock()
+        self.approved = 0
+        self.rejected = 0
+        self.expired = 0
+        self.wake_count = 0
+        self.wake_seconds = 0.0
+        self.wake_max = 0.0
+
+    def request(self, user_id, approval_request):
+        """
+        Register an approval request (a dict with at least 'id'). Must be called from
+        the loop that will wait on it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        entry = _PendingApproval(approval_request, future, time.monotonic())
+        with self._lock:
+            self._pending.setdefault(user_id, {})[approval_request['id']] = entry
+        return approval_request['id']
+
+    def pending(self, user_id):
+        """Copies of the user's approval requests still waiting for a decision"""
+        with self._lock:
+            return [
+                entry.request.copy()
+                for entry in self._pending.get(user_id, {}).values()
+                if entry.request.get('result') == 'pending'
+            ]
+
+    def resolve(self, user_id, trade_id, approved):
+        """
+        Approve or reject a pending trade; safe to call from any thread. Returns False if
+        the trade is unknown, already decided, or has timed out.
+        """
+        with self._lock:
+            entry = self._pending.get(user_id, {}).get(trade_id)
+            if entry is None or entry.request.get('result') != 'pending':
+                return False
+            entry.request['approved'] = approved
+            entry.request['result'] = 'approved' if approved else 'rejected'
+            entry.resolved_at = time.monotonic()
+            if approved:
+                self.approved += 1
+            else:
+                self.rejected += 1
+
+        future = entry.future
+        future.get_loop().call_soon_threadsafe(_set_result, future, approved)
+        return True
+
+    async def wait(self, user_id, trade_id, timeout):
+        """
+        Wait for the user's decision. Returns (approved, resolved_at) where approved is
+        True/False, or None if nobody decided within timeout seconds; resolved_at is the
+        time.monotonic() of the decision (None on timeout).
+        """
+        with self._lock:
+            entry = self._pending.get(user_id, {}).get(trade_id)
+        if entry is None:
+            return None, None
+
+        decided_before_wait = entry.resolved_at is not None
+        try:
+            approved = await asyncio.wait_for(asyncio.shield(entry.future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                # A decision may have landed between the timeout firing and taking the lock
+                if entry.request.get('result') == 'pending':
+                    entry.request['result'] = 'expired'
+                    self.expired += 1
+                    self._discard(user_id, trade_id)
+                    return None, None
+            approved = entry.request['approved']
+
+        if approved is None:
+            # Cancelled because the bot stopped
+            return None, None
+
+        woke_after = time.monotonic() - entry.resolved_at
+        with self._lock:
+            if not decided_before_wait:
+                self.wake_count += 1
+                self.wake_seconds += woke_after
+                self.wake_max = max(self.wake_max, woke_after)
+            self._discard(user_id, trade_id)
+        return approved, entry.resolved_at
+
+    def cancel_user(self, user_id):
+        """Expire every pending request for a user (their bot stopped)"""
+        with self._lock:
+            entries = self._pending.pop(user_id, {})
+            for entry in entries.values():
+                if entry.request.get('result') == 'pending':
+                    entry.request['result'] = 'expired'
+                    self.expired += 1
+                    entry.future.get_loop().call_soon_threadsafe(_set_result, entry.future, None)
+
+    def stats(self):
+        """Decision counters and decision-to-wake latency of the waiting bots"""
+        with self._lock:
+            return {
+                "pending": sum(
+                    1 for entries in self._pending.values()
+                    for entry in entries.values() if entry.request.get('result') == 'pending'
+                ),
+                "approved": self.approved,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "avg_wake_ms": round(self.wake_seconds / self.wake_count * 1000, 3) if self.wake_count else 0.0,
+                "max_wake_ms": round(self.wake_max * 1000, 3),
+            }
+
+    def _discard(self, user_id, trade_id):
+        entries = self._pending.get(user_id)
+        if entries is not None:
+            entries.pop(trade_id, None)
+            if not entries:
+                del self._pending[user_id]
+
+
+def _set_result(future, value):
+    if not future.done():
+        future.set_result(value)
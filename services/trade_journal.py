@@ -0,0 +1,213 @@
+"""
+Write-behind trade journal for the multi-user Solana trading bot
+
+Executed trades used to exist only in each bot's in-memory transaction_history
+(the last 20). The journal takes every buy/sell record from the bots without
+ever blocking them, queues it in a bounded buffer and writes the buffer to the
+trades collection in insert_many batches, whenever batch_size documents are
+waiting or flush_interval seconds have passed. flush() waits until everything
+queued so far is written; close() does that and stops the writer at shutdown.
+A trade recorded after close() (a swap confirming during shutdown) is written
+synchronously, and counted and logged as dropped if that fails.
+
+Each document gets its _id before it is queued, so a batch retried after a
+partial failure cannot insert the same trade twice.
+"""
+import queue
+import threading
+import time
+
+from bson.objectid import ObjectId
+
+from services.structured_log import get_logger
+
+log = get_logger("trade_journal")
+
+try:
+    from pymongo.errors import BulkWriteError
+except ImportError:
+    BulkWriteError = None
+
+# Mongo duplicate key error: the document was already written by an earlier attempt
+DUPLICATE_KEY = 11000
+
+
+class TradeJournal:
+    def __init__(self, insert_many, max_queue=100000, batch_size=500, flush_interval=1.0, retry_delay=2.0, on_flush=None):
+        """
+        insert_many(documents) writes a list of trade documents (Trade.insert_many);
+        on_flush(seconds, ok), if given, is called after every write attempt
+        """
+        self.insert_many = insert_many
+        self.on_flush = on_flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._written_cond = threading.Condition(self._lock)
+        self._thread = None
+        self._closing = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.flush_seconds = 0.0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def record(self, document):
+        """
+        Queue a trade document for writing; never blocks. Returns False if it had to be dropped.
+        After close() the writer is gone, so the document is written right away (one attempt).
+        """
+        document.setdefault('_id', ObjectId())
+        with self._lock:
+            # Queued under the lock so close() cannot drain the queue between the check and the put
+            if not self._closing:
+                try:
+                    self._queue.put_nowait(document)
+                except queue.Full:
+                    self.dropped += 1
+                    full = True
+                else:
+                    full = False
+                    self.enqueued += 1
+                    if self._thread is None or not self._thread.is_alive():
+                        self._thread = threading.Thread(target=self._run, name="trade-journal", daemon=True)
+                        self._thread.start()
+                if full:
+                    log.error("Trade journal full, dropped trade", queued=self._queue.maxsize, trade_id=document['_id'])
+                return not full
+            self.enqueued += 1
+        return self._write_now([document])
+
+    def flush(self, timeout=None):
+        """Block until every document queued before this call is written; returns False on timeout"""
+        with self._written_cond:
+            target = self.enqueued
+            return self._written_cond.wait_for(lambda: self.written >= target, timeout)
+
+    def close(self, timeout=10.0):
+        """Write everything still queued and stop the writer (call at shutdown)"""
+        flushed = self.flush(timeout)
+        with self._lock:
+            self._closing = True
+            thread = self._thread
+        if thread is not None:
+            # The writer exits after its current batch (unless it is stuck retrying one)
+            thread.join(self.flush_interval + 1)
+
+        # Trades queued since the flush would otherwise never be written
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if leftover:
+            self._write_now(leftover)
+        if not flushed:
+            log.error("Trades still unwritten at shutdown", trades=self._queue.qsize())
+        return flushed
+
+    def stats(self):
+        """Queue depth, write counters and flush latency"""
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "last_flush_ms": round(self.last_flush_ms, 3),
+                "avg_flush_ms": round(self.flush_seconds / self.flushes * 1000, 3) if self.flushes else 0.0,
+                "max_flush_ms": round(self.max_flush_ms, 3),
+            }
+
+    def _run(self):
+        while not self._closing:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            # Gather more until the batch is full or the interval has passed
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write(batch)
+
+    def _write_now(self, batch):
+        """One synchronous write attempt (after close); a failed batch is counted and logged as dropped"""
+        started = time.perf_counter()
+        try:
+            self.insert_many(batch)
+            ok = True
+        except Exception as e:
+            ok = _only_duplicates(e)
+            if not ok:
+                with self._lock:
+                    self.dropped += len(batch)
+                # The documents go into the log so they can be recovered by hand
+                log.error("Trade journal closed, dropped trades", trades=len(batch), documents=batch, error=str(e))
+        if self.on_flush is not None:
+            self.on_flush(time.perf_counter() - started, ok)
+        if not ok:
+            return False
+        with self._written_cond:
+            self.written += len(batch)
+            self._written_cond.notify_all()
+        return True
+
+    def _write(self, batch):
+        while True:
+            started = time.perf_counter()
+            try:
+                self.insert_many(batch)
+                ok = True
+            except Exception as e:
+                ok = _only_duplicates(e)
+                if not ok:
+                    log.warning("Trade journal flush failed, retrying", trades=len(batch), error=str(e))
+            elapsed = time.perf_counter() - started
+            if self.on_flush is not None:
+                self.on_flush(elapsed, ok)
+
+            with self._written_cond:
+                if ok:
+                    self.flushes += 1
+                    self.flush_seconds += elapsed
+                    self.last_flush_ms = elapsed * 1000
+                    self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+                    self.written += len(batch)
+                    self._written_cond.notify_all()
+                    return
+                self.failed_flushes += 1
+            time.sleep(self.retry_delay)
+
+
+def ignore_duplicates(insert_many, documents):
+    """Run insert_many, treating a failure made only of already-written documents as success"""
+    try:
+        insert_many(documents)
+    except Exception as e:
+        if not _only_duplicates(e):
+            raise
+
+
+def _only_duplicates(error):
+    """True if a bulk insert failed only on documents an earlier attempt already wrote"""
+    if BulkWriteError is None or not isinstance(error, BulkWriteError):
+        return False
+    write_errors = error.details.get('writeErrors', [])
+    return bool(write_errors) and all(item.get('code') == DUPLICATE_KEY for item in write_errors)
@@ -0,0 +1,111 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import numpy as np
+    from services.parameter_sweep import RESULT_FIELDS, check_parameters, parameter_grid, run_sweep, sample_parameters
+    from services.tick_recorder import TickStore
+except ImportError as e:
+    print(f"Import failed: {e}")
+    sys.exit(1)
+
+def parse_spec(value):
+    """'0.5:5:0.5' is a min:max:step range, '1,2,5' a list, '2' a single value"""
+    if ':' in value:
+        low, high, *step = (float(part) for part in value.split(':'))
+        return {"min": low, "max": high, "step": step[0] if step else 1}
+    return [float(part) for part in value.split(',')]
+
+def load_prices(path):
+    """Prices from a .npy array, a CSV with a 'price' column, or a file of one price per line"""
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    with open(path, newline='') as f:
+        first = f.readline()
+        f.seek(0)
+        if 'price' in first.lower():
+            return np.array([float(row['price']) for row in csv.DictReader(f)], dtype=np.float64)
+        return np.loadtxt(f, dtype=np.float64, ndmin=1)
+
+def load_recorded_prices(ticks_dir, pair_id, start=None, end=None):
+    """Prices of one recorded pair (see --list-pairs), memory-mapped from the tick store"""
+    store = TickStore(ticks_dir)
+    pair = next((pair for pair in store.pairs() if pair['pair'] == pair_id), None)
+    if pair is None:
+        raise SystemExit(f"No recorded pair {pair_id} in {ticks_dir}")
+    start = datetime.fromisoformat(start).replace(tzinfo=timezone.utc) if start else None
+    end = datetime.fromisoformat(end).replace(tzinfo=timezone.utc) if end else None
+    return store.read(pair['input_mint'], pair['output_mint'], pair['amount'], start, end)['price']
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank ladder settings by backtested PnL over a price history")
+    parser.add_argument("prices", nargs="?", help="price history: .npy, CSV with a 'price' column, or one price per line")
+    parser.add_argument("--ticks-dir", default=os.getenv('TICK_DATA_DIR', os.path.join('data', 'ticks')),
+                        help="recorded tick store to read --pair from")
+    parser.add_argument("--pair", type=int, help="sweep over this recorded pair instead of a prices file")
+    parser.add_argument("--list-pairs", action="store_true", help="list the recorded pairs and exit")
+    parser.add_argument("--start", help="with --pair: first UTC date/time (ISO)")
+    parser.add_argument("--end", help="with --pair: end UTC date/time (ISO, exclusive)")
+    parser.add_argument("--up", default="0.5:5:0.5", help="up percentages: min:max:step or a comma list")
+    parser.add_argument("--down", default="0.5:5:0.5", help="down percentages: min:max:step or a comma list")
+    parser.add_argument("--parts", default="1:10:1", help="part counts: min:max:step or a comma list")
+    parser.add_argument("--samples", type=int, help="evaluate this many random settings instead of the full grid")
+    parser.add_argument("--seed", type=int, help="random seed for --samples")
+    parser.add_argument("--amount", type=float, default=100.0, help="trade amount (split into parts)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    parser.add_argument("--csv", help="write the full ranked table to this CSV file")
+    parser.add_argument("--json", help="write the full ranked table to this JSON file")
+    args = parser.parse_args()
+
+    if args.list_pairs:
+        for pair in TickStore(args.ticks_dir).pairs():
+            print(f"{pair['pair']:>4}  {pair['input_mint']} -> {pair['output_mint']}  amount {pair['amount']}  "
+                  f"{pair['first_day']} .. {pair['last_day']}")
+        return
+    if args.pair is not None:
+        prices = load_recorded_prices(args.ticks_dir, args.pair, args.start, args.end)
+    elif args.prices:
+        prices = load_prices(args.prices)
+    else:
+        parser.error("give a prices file or --pair")
+    up, down, parts = parse_spec(args.up), parse_spec(args.down), parse_spec(args.parts)
+    try:
+        check_parameters(up, down, parts)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.samples:
+        params = sample_parameters(up, down, parts, args.samples, seed=args.seed)
+    else:
+        params = parameter_grid(up, down, parts)
+
+    print(f"Sweeping {len(params):,} settings over {len(prices):,} prices...")
+    started = time.perf_counter()
+    rows = run_sweep(prices, params, args.amount, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"Done in {elapsed:.2f}s ({len(params) / elapsed:,.0f} settings/s)\n")
+
+    print(f"{'rank':>5} {'up%':>7} {'down%':>7} {'parts':>5} {'buys':>7} {'sells':>7} {'pnl':>14} {'fees':>10} {'drawdown':>12}")
+    for row in rows[:args.top]:
+        print(f"{row['rank']:>5} {row['up_percentage']:>7.3f} {row['down_percentage']:>7.3f} {row['parts']:>5} "
+              f"{row['buys']:>7} {row['sells']:>7} {row['total_profit']:>14.4f} {row['fees']:>10.2f} {row['max_drawdown']:>12.4f}")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
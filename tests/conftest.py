@@ -0,0 +1,23 @@
+"""
+Shared test fixtures
+"""
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def in_memory_db():
+    """
+    Point database.get_db at a mongomock database for the whole session.
+    Request it before importing app.main, whose import initializes the database;
+    tests that need it are skipped when mongomock is not installed.
+    """
+    mongomock = pytest.importorskip("mongomock")
+    import database
+    database._db = mongomock.MongoClient()["trading_bot_test"]
+    return database._db
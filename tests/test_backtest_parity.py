@@ -0,0 +1,89 @@
+"""
+The vectorized backtest must trade exactly like the live bot
+
+Replays random-walk series through the live trading_algorithm (devnet, so fills
+are simulated) and services.backtest.run_backtest and requires the same fills,
+prices, PnL and final ladder state. Also checks the mark-to-market drawdown
+against a per-tick loop.
+
+Importing app.main initializes the database; mongomock is used as an in-memory
+backend, so these tests are skipped when it is not installed.
+"""
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_backtest import SETTINGS, live_replay, random_walk
+from services import structured_log
+from services.backtest import run_backtest
+
+SEEDS = range(5)
+
+
+@pytest.fixture(scope="module")
+def main(in_memory_db):
+    from app import main
+    return main
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("up, down, parts, amount", SETTINGS)
+def test_backtest_matches_live_bot(main, seed, up, down, parts, amount):
+    prices = random_walk(3000, volatility=0.004, seed=seed)
+    live_fills, state = live_replay(main, prices, up, down, parts, amount)
+    # The bot's log lines are written by a background thread; keep them inside this test's captured output
+    structured_log.flush(timeout=5)
+    result = run_backtest(prices, up, down, parts, amount)
+
+    assert len(live_fills) == len(result['fills'])
+    for live, fill in zip(live_fills, result['fills']):
+        assert (live['action'], live['price'], live['base_price_at_execution'], live['pnl']) == \
+            (fill['action'], fill['price'], fill['base_price_at_execution'], fill['pnl']), f"fill {fill['index']}"
+        assert math.isclose(live['amount'], fill['amount'])
+    assert state.total_profit == result['total_profit']
+    assert state.base_price == result['base_price']
+    assert (state.buy_parts, state.sell_parts) == (result['buy_parts'], result['sell_parts'])
+    assert math.isclose(state.position, result['position'], abs_tol=1e-9)
+
+
+def per_tick_drawdown(prices, fills, part_size):
+    """Largest fall of realized PnL plus open position at the tick price minus its cost, tick by tick"""
+    by_index = {fill['index']: fill for fill in fills}
+    position = avg_purchase_price = total_profit = peak = max_drawdown = 0.0
+    for index, price in enumerate(prices):
+        if not price > 0:
+            continue
+        fill = by_index.get(index)
+        if fill is not None and fill['action'] == 'buy':
+            old_position_value = position * avg_purchase_price
+            position += part_size
+            avg_purchase_price = (old_position_value + part_size * price) / position
+        elif fill is not None:
+            total_profit = fill['total_profit']
+            position -= min(part_size, position)
+            if position <= 0:
+                position = avg_purchase_price = 0.0
+        equity = total_profit + position * (price - avg_purchase_price)
+        peak = max(peak, equity)
+        max_drawdown = max(max_drawdown, peak - equity)
+    return max_drawdown
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("up, down, parts, amount", SETTINGS)
+def test_drawdown_is_mark_to_market(seed, up, down, parts, amount):
+    prices = random_walk(20000, volatility=0.004, seed=seed)
+    # Unpriced ticks are skipped, as the bot skips them
+    prices[100] = np.nan
+    prices[5000] = -1
+    result = run_backtest(prices, up, down, parts, amount)
+
+    assert math.isclose(result['max_drawdown'], per_tick_drawdown(prices, result['fills'], amount / parts), abs_tol=1e-9)
+    if result['buys']:
+        assert result['max_drawdown'] > 0
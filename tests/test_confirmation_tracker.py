@@ -0,0 +1,139 @@
+"""
+Swap confirmation tracker: batched getSignatureStatuses polling and timeouts
+
+The RPC node is a stand-in that answers from a per-signature status table.
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.confirmation_tracker import MAX_SIGNATURES_PER_CALL, ConfirmationTracker
+
+
+class FakeRpc:
+    """getSignatureStatuses from a {signature: status} table; records each call's network and signature count"""
+
+    def __init__(self):
+        self.statuses = {}
+        self.calls = []
+        self.fail = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, network, payload):
+        assert payload["method"] == "getSignatureStatuses"
+        signatures = payload["params"][0]
+        with self._lock:
+            self.calls.append((network, len(signatures)))
+            if self.fail:
+                self.fail -= 1
+                raise ConnectionError("node unreachable")
+            return {"result": {"value": [self.statuses.get(signature) for signature in signatures]}}
+
+
+@pytest.fixture
+def rpc():
+    return FakeRpc()
+
+
+@pytest.fixture
+def tracker(rpc):
+    tracker = ConfirmationTracker(rpc, interval=0.01, timeout=5)
+    yield tracker
+    tracker.shutdown()
+
+
+def confirmed(slot=1):
+    return {"slot": slot, "err": None, "confirmationStatus": "confirmed"}
+
+
+def test_pending_signatures_are_polled_in_batches_per_network(rpc, tracker):
+    signatures = [f"sig{n}" for n in range(MAX_SIGNATURES_PER_CALL + 44)]
+    futures = [tracker.track(signature) for signature in signatures]
+    futures += [tracker.track(signature, network="devnet") for signature in ("dev0", "dev1")]
+
+    # Unconfirmed so far: every poll asks about every pending signature, at most the RPC limit per call
+    full_poll = [("mainnet", MAX_SIGNATURES_PER_CALL), ("mainnet", 44), ("devnet", 2)]
+    deadline = time.monotonic() + 5
+    while not all(call in rpc.calls for call in full_poll) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert all(call in rpc.calls for call in full_poll)
+    assert max(count for _, count in rpc.calls) == MAX_SIGNATURES_PER_CALL
+
+    rpc.statuses = {signature: confirmed() for signature in signatures + ["dev0", "dev1"]}
+    results = [future.result(timeout=5) for future in futures]
+    assert all(result["success"] for result in results)
+    assert tracker.stats()["confirmed"] == len(futures)
+    assert tracker.pending_count() == 0
+
+
+def test_waits_for_the_requested_commitment(rpc, tracker):
+    rpc.statuses["sig"] = {"slot": 7, "err": None, "confirmationStatus": "processed"}
+    future = tracker.track("sig")
+    with pytest.raises(TimeoutError):
+        future.result(timeout=0.1)
+
+    rpc.statuses["sig"] = confirmed(slot=8)
+    result = future.result(timeout=5)
+    assert result["success"] and result["slot"] == 8
+    assert result["confirmation_status"] == "confirmed"
+    assert result["confirm_ms"] > 0
+
+
+def test_failed_transaction_resolves_unsuccessful(rpc, tracker):
+    rpc.statuses["sig"] = {"slot": 3, "err": {"InstructionError": [0, "Custom"]}, "confirmationStatus": "confirmed"}
+    result = tracker.track("sig").result(timeout=5)
+    assert not result["success"]
+    assert result["err"] == {"InstructionError": [0, "Custom"]}
+    assert tracker.stats()["failed"] == 1
+
+
+def test_unseen_signature_times_out(rpc):
+    tracker = ConfirmationTracker(rpc, interval=0.01, timeout=0.1)
+    try:
+        result = tracker.track("never-landed").result(timeout=5)
+    finally:
+        tracker.shutdown()
+    assert not result["success"]
+    assert result["err"].startswith("Not confirmed within")
+    assert tracker.stats()["expired"] == 1
+
+
+def test_rpc_errors_are_retried_on_the_next_poll(rpc, tracker):
+    rpc.fail = 2
+    rpc.statuses["sig"] = confirmed()
+    assert tracker.track("sig").result(timeout=5)["success"]
+    assert tracker.stats()["errors"] == 2
+
+
+def test_same_signature_tracked_twice_shares_the_outcome(rpc, tracker):
+    first = tracker.track("sig")
+    second = tracker.track("sig")
+    assert tracker.pending_count() == 1
+
+    rpc.statuses["sig"] = confirmed()
+    assert first.result(timeout=5)["success"]
+    assert second.result(timeout=5)["success"]
+
+
+def test_callback_gets_the_result(rpc, tracker):
+    outcomes = []
+    done = threading.Event()
+    rpc.statuses["sig"] = confirmed()
+    tracker.track("sig", callback=lambda result: (outcomes.append(result), done.set()))
+    assert done.wait(5)
+    assert outcomes[0]["signature"] == "sig" and outcomes[0]["success"]
+
+
+def test_shutdown_resolves_pending_signatures(rpc):
+    tracker = ConfirmationTracker(rpc, interval=0.01, timeout=5)
+    future = tracker.track("sig")
+    tracker.shutdown()
+    result = future.result(timeout=1)
+    assert not result["success"]
+    assert result["err"] == "Confirmation tracker stopped"
@@ -0,0 +1,116 @@
+"""
+Parameter sweeps from the running app
+
+Sweep workers are started with forkserver/spawn, which re-run the entry script
+as __mp_main__. When the app is started as python app/main.py, that must not
+start the app (database, log writer, atexit flushes) in every worker.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loads app/main.py as __main__ the way python app/main.py does (without serving), on an
+# in-memory database, and runs a sweep through POST /api/sweeps. MONGO_URI points nowhere,
+# so a worker that started the app would fail to connect and break the pool.
+RUN_APP_AS_MAIN = textwrap.dedent("""
+    import importlib.util, os, sys, time
+    root = sys.argv[1]
+    sys.path.insert(0, root)
+
+    import flask, mongomock
+    import database
+    database._db = mongomock.MongoClient()["sweep_test"]
+    flask.Flask.run = lambda self, *args, **kwargs: None
+
+    spec = importlib.util.spec_from_file_location("__main__", os.path.join(root, "app", "main.py"))
+    main = importlib.util.module_from_spec(spec)
+    # A script run by path has no module spec; multiprocessing then re-runs it by path
+    main.__spec__ = None
+    sys.modules["__main__"] = main
+    spec.loader.exec_module(main)
+
+    client = main.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = "sweep-test"
+    prices = [150 * (1 + 0.05 * ((n % 40) - 20) / 20) for n in range(2000)]
+    response = client.post("/api/sweeps", json={
+        "prices": prices, "up_percentage": [1, 2], "down_percentage": [1, 2], "parts": [2, 4], "trade_amount": 100,
+    })
+    assert response.status_code == 202, response.get_json()
+    job_id = response.get_json()["job_id"]
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        sweep = client.get(f"/api/sweeps/{job_id}").get_json()["sweep"]
+        if sweep["status"] in ("done", "failed"):
+            break
+        time.sleep(0.1)
+    print("SWEEP", sweep["status"], sweep["error"], len(sweep["results"] or []), file=sys.stderr)
+""")
+
+
+def test_sweep_workers_do_not_start_the_app(tmp_path):
+    pytest.importorskip("mongomock")
+    script = tmp_path / "run_app_as_main.py"
+    script.write_text(RUN_APP_AS_MAIN)
+    env = dict(os.environ,
+               MONGO_URI="mongodb://127.0.0.1:9/unreachable?serverSelectionTimeoutMS=500",
+               SWEEP_WORKERS="2", TICK_RECORDING="0", TICK_DATA_DIR=str(tmp_path / "ticks"))
+
+    result = subprocess.run([sys.executable, str(script), ROOT], env=env, capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    assert "SWEEP done None 8" in result.stderr, result.stderr
+    assert "Error connecting to MongoDB" not in result.stdout + result.stderr
+
+
+@pytest.fixture(scope="module")
+def client(in_memory_db):
+    from app import main
+
+    client = main.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = "sweep-test"
+    return client
+
+
+@pytest.mark.parametrize("body", [
+    {"up_percentage": {"min": 0.1, "max": 5, "step": 1e-9}},
+    {"parts": {"min": 1, "max": 10 ** 12}},
+    {"samples": 10 ** 9},
+])
+def test_oversized_sweeps_are_rejected_before_building_them(client, body):
+    started = time.perf_counter()
+    response = client.post("/api/sweeps", json=dict({"prices": [150.0, 151.0, 149.0]}, **body))
+    assert response.status_code == 400
+    assert "exceeds the limit" in response.get_json()["message"]
+    assert time.perf_counter() - started < 1
+
+
+def test_sampling_does_not_expand_ranges(client):
+    started = time.perf_counter()
+    response = client.post("/api/sweeps", json={
+        "prices": [150.0, 151.0, 149.0], "samples": 10,
+        "up_percentage": {"min": 0.1, "max": 5, "step": 1e-12}, "parts": {"min": 1, "max": 10 ** 12},
+    })
+    assert response.status_code == 202
+    assert time.perf_counter() - started < 1
+
+
+@pytest.mark.parametrize("body, message", [
+    ({"parts": [0]}, "parts"),
+    ({"parts": {"min": -2, "max": 4}}, "parts"),
+    ({"up_percentage": [0, 1]}, "up_percentage"),
+    ({"down_percentage": {"min": -1, "max": 2}}, "down_percentage"),
+    ({"prices": [150.0]}, "2 prices"),
+    ({"prices": []}, "2 prices"),
+])
+def test_invalid_sweeps_are_rejected(client, body, message):
+    response = client.post("/api/sweeps", json=dict({"prices": [150.0, 151.0, 149.0]}, **body))
+    assert response.status_code == 400
+    assert message in response.get_json()["message"]
@@ -0,0 +1,129 @@
+"""
+User-mode trade approvals: each request's future is resolved by approve/reject
+from another thread, by the timeout, or by the bot stopping
+"""
+import asyncio
+import os
+import sys
+import threading
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.trade_approvals import TradeApprovals
+
+USER = "user-1"
+
+
+def request(trade_id="t1"):
+    return {"id": trade_id, "action": "buy", "amount": 1.0, "result": "pending"}
+
+
+def resolve_later(approvals, trade_id, approved, delay=0.05, user_id=USER):
+    """Decide from another thread, as the Flask approve/reject routes do"""
+    timer = threading.Timer(delay, approvals.resolve, args=(user_id, trade_id, approved))
+    timer.start()
+    return timer
+
+
+def test_approval_from_another_thread_wakes_the_bot():
+    approvals = TradeApprovals()
+
+    async def bot():
+        approvals.request(USER, request())
+        assert [pending["id"] for pending in approvals.pending(USER)] == ["t1"]
+        resolve_later(approvals, "t1", True)
+        return await approvals.wait(USER, "t1", timeout=5)
+
+    approved, resolved_at = asyncio.run(bot())
+    assert approved is True and resolved_at is not None
+    assert approvals.pending(USER) == []
+    stats = approvals.stats()
+    assert stats["approved"] == 1 and stats["pending"] == 0
+    assert stats["max_wake_ms"] < 1000
+
+
+def test_rejection():
+    approvals = TradeApprovals()
+
+    async def bot():
+        approvals.request(USER, request())
+        resolve_later(approvals, "t1", False)
+        return await approvals.wait(USER, "t1", timeout=5)
+
+    approved, _ = asyncio.run(bot())
+    assert approved is False
+    assert approvals.stats()["rejected"] == 1
+
+
+def test_decision_made_before_the_bot_waits_is_kept():
+    approvals = TradeApprovals()
+
+    async def bot():
+        approvals.request(USER, request())
+        assert approvals.resolve(USER, "t1", True)
+        await asyncio.sleep(0.01)
+        return await approvals.wait(USER, "t1", timeout=5)
+
+    approved, _ = asyncio.run(bot())
+    assert approved is True
+
+
+def test_unanswered_request_times_out_and_cannot_be_approved_afterwards():
+    approvals = TradeApprovals()
+
+    async def bot():
+        approvals.request(USER, request())
+        return await approvals.wait(USER, "t1", timeout=0.05)
+
+    assert asyncio.run(bot()) == (None, None)
+    assert approvals.stats()["expired"] == 1
+    assert not approvals.resolve(USER, "t1", True)
+
+
+def test_decisions_are_per_trade_and_per_user():
+    approvals = TradeApprovals()
+
+    async def bot():
+        approvals.request(USER, request("t1"))
+        approvals.request(USER, request("t2"))
+        # Another user's decision on the same trade id, and a decision on a different trade, must not wake t1
+        assert not approvals.resolve("someone-else", "t1", True)
+        resolve_later(approvals, "t2", False, delay=0.01)
+        resolve_later(approvals, "t1", True, delay=0.05)
+        first = await approvals.wait(USER, "t1", timeout=5)
+        second = await approvals.wait(USER, "t2", timeout=5)
+        return first[0], second[0]
+
+    assert asyncio.run(bot()) == (True, False)
+
+
+def test_second_decision_is_refused():
+    approvals = TradeApprovals()
+
+    async def bot():
+        approvals.request(USER, request())
+        assert approvals.resolve(USER, "t1", False)
+        assert not approvals.resolve(USER, "t1", True)
+        return await approvals.wait(USER, "t1", timeout=5)
+
+    assert asyncio.run(bot())[0] is False
+
+
+def test_stopping_the_bot_cancels_its_pending_approvals():
+    approvals = TradeApprovals()
+
+    async def bot():
+        approvals.request(USER, request())
+        threading.Timer(0.05, approvals.cancel_user, args=(USER,)).start()
+        return await approvals.wait(USER, "t1", timeout=5)
+
+    assert asyncio.run(bot()) == (None, None)
+    assert approvals.pending(USER) == []
+    assert approvals.stats()["expired"] == 1
+    assert not approvals.resolve(USER, "t1", True)
+
+
+def test_waiting_on_an_unknown_trade_returns_at_once():
+    approvals = TradeApprovals()
+    assert asyncio.run(approvals.wait(USER, "missing", timeout=5)) == (None, None)
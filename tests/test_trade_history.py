@@ -0,0 +1,78 @@
+"""
+Paged trade history and export with trades from before the datetime migration
+
+Databases that have not run migrate_trade_timestamps.py still hold trades with
+string timestamps; /api/trades must page past them and /api/trades/export must
+format them like the rest.
+
+Importing app.main initializes the database; mongomock is used as an in-memory
+backend, so these tests are skipped when it is not installed.
+"""
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from bson.objectid import ObjectId
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+USER_ID = ObjectId()
+
+
+@pytest.fixture(scope="module")
+def client(in_memory_db):
+    from app import main
+
+    trades = in_memory_db.trades
+    trades.delete_many({"user_id": USER_ID})
+    start = datetime(2026, 9, 1, 12, 0, 0)
+    trades.insert_many([
+        {"user_id": USER_ID, "timestamp": start + timedelta(minutes=i), "action": "buy",
+         "token_symbol": "SOL", "price": 150.0 + i, "amount": 1.0, "pnl": 0.0, "status": "completed"}
+        for i in range(5)
+    ] + [
+        {"user_id": USER_ID, "timestamp": "2024-03-01 09:30:00", "action": "sell",
+         "token_symbol": "SOL", "price": 100.0, "amount": 1.0, "pnl": 1.0, "status": "completed"},
+        {"user_id": USER_ID, "timestamp": "2024-03-02T10:15:00", "action": "sell",
+         "token_symbol": "SOL", "price": 101.0, "amount": 1.0, "pnl": 1.0, "status": "completed"},
+    ])
+
+    client = main.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = str(USER_ID)
+    return client
+
+
+@pytest.mark.parametrize("limit", range(1, 8))
+def test_pages_skip_legacy_timestamps(client, limit):
+    timestamps = []
+    cursor = None
+    while True:
+        query = {"limit": limit} if cursor is None else {"limit": limit, "cursor": cursor}
+        response = client.get("/api/trades", query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        timestamps += [trade["timestamp"] for trade in body["trades"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert timestamps == [f"2026-09-01 12:0{i}:00" for i in reversed(range(5))]
+
+
+def test_export_formats_legacy_timestamps(client):
+    response = client.get("/api/trades/export")
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(rows) == 7
+    assert {"2024-03-01 09:30:00", "2024-03-02 10:15:00"} <= {row["timestamp"] for row in rows}
+
+    response = client.get("/api/trades/export", query_string={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 7
+    assert all(datetime.strptime(row["timestamp"], "%Y-%m-%d %H:%M:%S") for row in rows)
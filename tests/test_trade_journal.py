@@ -0,0 +1,181 @@
+"""
+Write-behind trade journal against an in-memory trades collection
+
+Batching, flushing, shutdown, writes after close(), retries after a failed
+batch and tolerance of documents an earlier attempt already wrote. Skipped
+when mongomock is not installed.
+"""
+import os
+import sys
+import threading
+from datetime import datetime
+
+import pytest
+from bson.objectid import ObjectId
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.trade_journal import TradeJournal, _only_duplicates, ignore_duplicates
+
+mongomock = pytest.importorskip("mongomock")
+from pymongo.errors import BulkWriteError
+
+
+@pytest.fixture
+def trades():
+    return mongomock.MongoClient()["journal_test"].trades
+
+
+def trade(n=0):
+    return {"user_id": ObjectId(), "timestamp": datetime(2026, 9, 1), "action": "buy", "price": 150.0 + n, "amount": 1.0}
+
+
+class Writer:
+    """insert_many for the journal that records batch sizes and can fail or block on demand"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.batches = []
+        self.fail_next = 0
+        self.partial = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, documents):
+        self.release.wait(5)
+        self.batches.append(len(documents))
+        if self.fail_next:
+            self.fail_next -= 1
+            if self.partial:
+                # Half the batch reaches the database before the connection drops
+                ignore_duplicates(lambda half: self.collection.insert_many(half, ordered=False), documents[:len(documents) // 2])
+            raise RuntimeError("connection reset")
+        self.collection.insert_many(documents, ordered=False)
+
+
+def test_batches_hold_at_most_batch_size(trades):
+    writer = Writer(trades)
+    writer.release.clear()
+    journal = TradeJournal(writer, batch_size=10, flush_interval=0.05)
+    for n in range(35):
+        assert journal.record(trade(n))
+    writer.release.set()
+
+    assert journal.flush(timeout=5)
+    assert max(writer.batches) <= 10
+    assert sum(writer.batches) == 35
+    assert trades.count_documents({}) == 35
+    assert journal.stats()["written"] == 35
+    journal.close()
+
+
+def test_flush_writes_a_partial_batch_after_the_interval(trades):
+    flushes = []
+    journal = TradeJournal(Writer(trades), batch_size=500, flush_interval=0.05,
+                           on_flush=lambda seconds, ok: flushes.append(ok))
+    for n in range(3):
+        journal.record(trade(n))
+
+    assert journal.flush(timeout=5)
+    assert trades.count_documents({}) == 3
+    assert flushes == [True]
+    journal.close()
+
+
+def test_close_writes_everything_queued(trades):
+    writer = Writer(trades)
+    writer.release.clear()
+    journal = TradeJournal(writer, batch_size=20, flush_interval=0.05)
+    for n in range(100):
+        journal.record(trade(n))
+    threading.Timer(0.1, writer.release.set).start()
+
+    assert journal.close(timeout=5)
+    assert trades.count_documents({}) == 100
+
+
+def test_record_after_close_is_written_right_away(trades):
+    journal = TradeJournal(Writer(trades), flush_interval=0.05)
+    journal.record(trade(0))
+    journal.close(timeout=5)
+
+    assert journal.record(trade(1))
+    assert trades.count_documents({}) == 2
+    assert journal.stats()["written"] == 2
+    assert journal.stats()["dropped"] == 0
+
+
+def test_failed_write_after_close_is_counted_as_dropped(trades):
+    writer = Writer(trades)
+    journal = TradeJournal(writer, flush_interval=0.05)
+    journal.close(timeout=5)
+    writer.fail_next = 1
+
+    assert not journal.record(trade(0))
+    assert journal.stats()["dropped"] == 1
+    assert trades.count_documents({}) == 0
+
+
+def test_full_queue_drops_without_blocking(trades):
+    writer = Writer(trades)
+    writer.release.clear()
+    journal = TradeJournal(writer, max_queue=2, batch_size=1, flush_interval=0.05)
+    results = [journal.record(trade(n)) for n in range(10)]
+    writer.release.set()
+
+    assert not all(results)
+    assert journal.stats()["dropped"] == results.count(False)
+    journal.close(timeout=5)
+    assert trades.count_documents({}) == results.count(True)
+
+
+def test_failed_batch_is_retried_without_duplicating_trades(trades):
+    writer = Writer(trades)
+    writer.fail_next = 2
+    writer.partial = True
+    flushes = []
+    journal = TradeJournal(writer, batch_size=50, flush_interval=0.05, retry_delay=0.01,
+                           on_flush=lambda seconds, ok: flushes.append(ok))
+    for n in range(40):
+        journal.record(trade(n))
+
+    assert journal.flush(timeout=5)
+    # The retries hit the trades the failed attempts already wrote; they are not inserted twice
+    assert trades.count_documents({}) == 40
+    assert len({document["_id"] for document in trades.find()}) == 40
+    assert journal.stats()["failed_flushes"] == 2
+    assert flushes == [False, False, True]
+    journal.close()
+
+
+def test_batch_of_already_written_trades_counts_as_written(trades):
+    documents = [dict(trade(n), _id=ObjectId()) for n in range(5)]
+    trades.insert_many(documents)
+    journal = TradeJournal(Writer(trades), flush_interval=0.05, retry_delay=0.01)
+    for document in documents:
+        journal.record(dict(document))
+
+    assert journal.flush(timeout=5)
+    assert journal.stats()["failed_flushes"] == 0
+    assert trades.count_documents({}) == 5
+    journal.close()
+
+
+def test_only_duplicate_key_failures_are_ignored(trades):
+    trades.insert_one({"_id": 1})
+    with pytest.raises(BulkWriteError) as duplicate:
+        trades.insert_many([{"_id": 1}, {"_id": 2}], ordered=False)
+    assert _only_duplicates(duplicate.value)
+    assert not _only_duplicates(RuntimeError("connection reset"))
+    mixed = BulkWriteError({"writeErrors": [{"code": 11000}, {"code": 121}]})
+    assert not _only_duplicates(mixed)
+
+    ignore_duplicates(lambda documents: trades.insert_many(documents, ordered=False), [{"_id": 1}, {"_id": 3}])
+    assert trades.count_documents({}) == 3
+
+    def insert_failing(documents):
+        raise mixed
+
+    with pytest.raises(BulkWriteError):
+        ignore_duplicates(insert_failing, [{"_id": 4}])
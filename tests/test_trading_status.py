@@ -0,0 +1,122 @@
+"""
+Trading status polling: ETag revalidation and ?since= deltas
+
+Importing app.main initializes the database; mongomock is used as an in-memory
+backend, so these tests are skipped when it is not installed.
+"""
+import itertools
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_users = itertools.count()
+
+
+@pytest.fixture(scope="module")
+def main(in_memory_db):
+    from app import main
+    return main
+
+
+@pytest.fixture
+def user(main):
+    """A fresh user id per test, so versions and snapshots start from scratch"""
+    return f"status-test-{next(_users)}"
+
+
+@pytest.fixture
+def client(main, user):
+    client = main.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = user
+    return client
+
+
+def change_state(main, user, **fields):
+    """Update the user's state the way the bot does: mutate, then publish"""
+    trading_state = main.get_user_trading_state(user)
+    for name, value in fields.items():
+        setattr(trading_state, name, value)
+    main.status_broadcaster.publish(user)
+    return trading_state
+
+
+def test_full_status_carries_its_version_as_etag(main, client, user):
+    change_state(main, user, current_price=150.0)
+    response = client.get("/api/trading-status")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["delta"] is False
+    assert body["current_price"] == 150.0
+    assert body["transaction_history"] == []
+    assert response.headers["ETag"] == f'"{body["version"]}"'
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+def test_unchanged_status_revalidates_with_304(main, client, user):
+    change_state(main, user, current_price=150.0)
+    etag = client.get("/api/trading-status").headers["ETag"]
+
+    response = client.get("/api/trading-status", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+    change_state(main, user, current_price=151.0)
+    response = client.get("/api/trading-status", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()["current_price"] == 151.0
+
+
+def test_since_returns_changed_fields_and_new_transactions(main, client, user):
+    trading_state = change_state(main, user, current_price=150.0)
+    trading_state.add_transaction({"action": "buy", "price": 150.0})
+    main.status_broadcaster.publish(user)
+    version = client.get("/api/trading-status").get_json()["version"]
+
+    trading_state.add_transaction({"action": "sell", "price": 152.0})
+    change_state(main, user, current_price=152.0, total_profit=2.0)
+
+    response = client.get("/api/trading-status", query_string={"since": version})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["delta"] is True
+    assert body["version"] != version
+    assert body["changed"] == {"current_price": 152.0, "total_profit": 2.0, "transaction_seq": 2}
+    assert body["new_transactions"] == [{"action": "sell", "price": 152.0, "seq": 2}]
+
+
+def test_since_with_no_changes_is_an_empty_delta(main, client, user):
+    change_state(main, user, current_price=150.0)
+    version = client.get("/api/trading-status").get_json()["version"]
+
+    body = client.get("/api/trading-status", query_string={"since": version}).get_json()
+    assert body["delta"] is True
+    assert body["version"] == version
+    assert body["changed"] == {} and body["new_transactions"] == []
+
+
+@pytest.mark.parametrize("since", ["unknown-3", "not-a-version", "0000-x", ""])
+def test_unknown_since_falls_back_to_the_full_status(main, client, user, since):
+    change_state(main, user, current_price=150.0)
+    body = client.get("/api/trading-status", query_string={"since": since}).get_json()
+    assert body["delta"] is False
+    assert body["current_price"] == 150.0
+    assert "transaction_history" in body
+
+
+def test_since_from_an_earlier_process_falls_back_to_the_full_status(main, client, user):
+    change_state(main, user, current_price=150.0)
+    version = client.get("/api/trading-status").get_json()["version"]
+    stale = "deadbeef" + version[version.index("-"):]
+    if stale == version:
+        stale = "cafebabe" + version[version.index("-"):]
+
+    body = client.get("/api/trading-status", query_string={"since": stale}).get_json()
+    assert body["delta"] is False
@@ -0,0 +1,90 @@
+"""
+Bulk wallet balance refresh: one bad wallet must not abort the rest
+
+Importing app.main initializes the database; mongomock is used as an in-memory
+backend, so these tests are skipped when it is not installed.
+"""
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from bson.objectid import ObjectId
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+USDC = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+
+@pytest.fixture(scope="module")
+def main(in_memory_db):
+    from app import main
+    return main
+
+
+def token_accounts(*ui_amounts):
+    """getTokenAccountsByOwner result with one USDC account per amount"""
+    return {"result": {"value": [
+        {"account": {"data": {"parsed": {"info": {
+            "mint": USDC, "tokenAmount": {"uiAmount": amount, "decimals": 6}
+        }}}}}
+        for amount in ui_amounts
+    ]}}
+
+
+class FakeRpc:
+    """call_batch answering from {wallet_address: (token_result, sol_result)}; records batch sizes"""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.batches = []
+
+    def __call__(self, network, payloads):
+        self.batches.append(len(payloads))
+        responses = []
+        for payload in payloads:
+            token_result, sol_result = self.answers[payload["params"][0]]
+            responses.append(token_result if payload["method"] == "getTokenAccountsByOwner" else sol_result)
+        return responses
+
+
+@pytest.fixture
+def rpc(main, monkeypatch):
+    rpc = FakeRpc({
+        "good-wallet-1" + "1" * 20: (token_accounts(5.0), {"result": {"value": 2 * 10 ** 9}}),
+        "bad-wallet-" + "2" * 22: (token_accounts(1.0, None), {"result": {"value": 10 ** 9}}),
+        "good-wallet-3" + "3" * 20: (token_accounts(), {"result": {"value": 3 * 10 ** 9}}),
+    })
+    monkeypatch.setattr(main.rpc_clients, "call_batch", rpc)
+    return rpc
+
+
+def test_bad_account_fails_only_its_wallet(main, rpc):
+    addresses = list(rpc.answers)
+    results = main.get_wallet_balances_bulk(addresses, chunk_size=2)
+
+    assert rpc.batches == [4, 2]
+    assert results[addresses[0]]["success"]
+    assert {item["token"]: item["balance"] for item in results[addresses[0]]["balances"]} == {"USDC": 5.0, "SOL": 2.0}
+    assert not results[addresses[1]]["success"]
+    assert results[addresses[1]]["balances"] == []
+    # The wallet after the bad one, in the same chunk and the next, is still read
+    assert results[addresses[2]]["success"]
+    assert results[addresses[2]]["balances"][0]["balance"] == 3.0
+
+
+def test_refresh_stores_every_readable_wallet(main, rpc, in_memory_db):
+    in_memory_db.wallets.delete_many({})
+    in_memory_db.wallets.insert_many([
+        {"user_id": ObjectId(), "public_key": address, "encrypted_private_key": "x",
+         "created_at": datetime(2026, 9, 1), "balance": {}}
+        for address in rpc.answers
+    ])
+
+    assert main.refresh_all_wallet_balances() == 2
+    balances = {wallet["public_key"]: wallet["balance"] for wallet in in_memory_db.wallets.find()}
+    addresses = list(rpc.answers)
+    assert balances[addresses[0]] == {"USDC": 5.0, "SOL": 2.0}
+    assert balances[addresses[1]] == {}
+    assert balances[addresses[2]] == {"SOL": 3.0}